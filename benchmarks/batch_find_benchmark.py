@@ -0,0 +1,40 @@
+"""Compares resolving a Session's movement_ids one find_movement at a time with a single
+find_movements call, against a local server with a fixed latency per request.
+Run from the project root with: python -m benchmarks.batch_find_benchmark"""
+
+from time import perf_counter, sleep
+
+from src.python_rebase.rebase_client import ReBaseClient
+from tests.stub_server import StubServer
+
+LATENCY = 0.02
+COUNTS = [10, 50, 200]
+WIDTH = 16
+
+def responder(request):
+    """Answers every find_movement after LATENCY seconds"""
+
+    sleep(LATENCY)
+    return 200, { 'status': 0, 'movement': { 'id': request.path.split('/')[-1], 'label': 'benchmark' } }
+
+def elapsed(function) -> float:
+    """Returns the time taken by function, in seconds"""
+
+    start = perf_counter()
+    function()
+    return perf_counter() - start
+
+def main() -> None:
+    """Runs the benchmark and prints the results"""
+
+    with StubServer(responder) as server, \
+            ReBaseClient('bench@rebase.com', 'token', server_url=server.url, pool_maxsize=WIDTH) as client:
+        print(f'{LATENCY * 1000:.0f} ms per request, width {WIDTH}')
+        for count in COUNTS:
+            ids = [f'{i:024x}' for i in range(count)]
+            sequential = elapsed(lambda ids=ids: [client.find_movement(movement_id) for movement_id in ids])
+            batch = elapsed(lambda ids=ids: client.find_movements(ids, width=WIDTH))
+            print(f'  {count:4d} ids   sequential {sequential:6.3f}s   find_movements {batch:6.3f}s   ({sequential / batch:.1f}x)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Measures the peak memory allocated while exporting listings of increasing size, with fetch_movements
+followed by writing every Movement and with BulkExporter. Run from the project root with:
+python -m benchmarks.bulk_export_benchmark"""
+
+import os
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+from src.python_rebase.bulk_export import BulkExporter
+from src.python_rebase.rebase_client import ReBaseClient
+from src.python_rebase.serializer import movement_dict_json
+from tests.stub_server import StubServer
+
+MOVEMENTS = [200, 800]
+FRAMES = 200
+PER = 50
+ARTICULATIONS = [f'articulation{i}' for i in range(33)]
+
+def responder(total: int):
+    """Serves a listing of total Movements, paginated with the previous_id cursor"""
+
+    registers = [{ art: [i * 0.1, i * 0.2, i * 0.3] for art in ARTICULATIONS } for i in range(FRAMES)]
+    movement = { 'label': 'benchmark', 'fps': 30, 'articulations': ARTICULATIONS, 'registers': registers }
+    ids = [f'{i:024x}' for i in range(total)]
+
+    def respond(request):
+        per = int(request.query.get('per', ['0'])[0]) or total
+        previous_id = request.query.get('previousId', [''])[0]
+        selected = [i for i in ids if i > previous_id][:per]
+        return 200, { 'status': 0, 'movements': [{ 'id': i, **movement } for i in selected] }
+
+    return respond
+
+def measure(function) -> tuple:
+    """Returns the peak of the memory allocated by function, in bytes, and its duration"""
+
+    tracemalloc.start()
+    start = perf_counter()
+    function()
+    elapsed = perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, elapsed
+
+def fetch_and_write(client: ReBaseClient, path: str) -> None:
+    """Exports as before: the whole listing is fetched and then written"""
+
+    movements = client.fetch_movements().get_data('movements')
+    with open(path, 'w', encoding='utf-8') as file:
+        for movement in movements:
+            file.write(movement_dict_json(movement) + '\n')
+
+def main() -> None:
+    """Runs the benchmark and prints the results"""
+
+    for total in MOVEMENTS:
+        with StubServer(responder(total), keep_bodies=False) as server, tempfile.TemporaryDirectory() as directory, \
+                ReBaseClient('bench@rebase.com', 'token', server_url=server.url) as client:
+            print(f'{total} Movements x {FRAMES} frames x {len(ARTICULATIONS)} articulations')
+            peak, elapsed = measure(lambda client=client, directory=directory: fetch_and_write(client, os.path.join(directory, 'all.jsonl')))
+            print(f'  fetch_movements + write {peak / 2 ** 20:8.1f} MB peak   {elapsed:6.2f}s')
+            peak, elapsed = measure(lambda client=client, directory=directory: BulkExporter(client, os.path.join(directory, 'export'), per=PER).run())
+            print(f'  BulkExporter            {peak / 2 ** 20:8.1f} MB peak   {elapsed:6.2f}s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""Measures the compression ratio and time of Movement insert bodies and the resulting upload time on
+slow links. Run from the project root with: python -m benchmarks.compression_benchmark"""
+
+import random
+
+from src.python_rebase.compression import ENCODINGS, CompressionStats, compress_body
+from src.python_rebase.movement import Movement
+
+FRAMES = [1000, 10000]
+ARTICULATIONS = [f'articulation{i}' for i in range(33)]
+LINKS = { '1 Mbit/s': 1e6 / 8, '10 Mbit/s': 10e6 / 8 }
+
+def captured_movement(frames: int) -> Movement:
+    """Builds a Movement with rotations that drift slowly, as in a real capture"""
+
+    rng = random.Random(frames)
+    rotation = { art: [rng.uniform(-180, 180) for _ in range(3)] for art in ARTICULATIONS }
+    registers = []
+    for _ in range(frames):
+        for values in rotation.values():
+            for axis in range(3): values[axis] += rng.uniform(-0.5, 0.5)
+        registers.append({ art: [round(value, 4) for value in values] for art, values in rotation.items() })
+    return Movement({ 'label': 'benchmark', 'fps': 30, 'registers': registers })
+
+def main() -> None:
+    """Runs the benchmark and prints the results"""
+
+    for frames in FRAMES:
+        body = captured_movement(frames).to_json().encode('utf-8')
+        print(f'{frames} frames x {len(ARTICULATIONS)} articulations, {len(body) / 2 ** 20:.1f} MB')
+
+        for encoding in ENCODINGS:
+            stats = CompressionStats()
+            compressed = compress_body(body, encoding, stats)
+            uploads = ', '.join(f'{name}: {len(body) / speed:6.1f}s -> {stats.compression_time + len(compressed) / speed:6.1f}s'
+                                for name, speed in LINKS.items())
+            print(f'  {encoding:<8} ratio {stats.ratio:5.2f}  time {stats.compression_time:6.3f}s  upload {uploads}')
+
+if __name__ == '__main__':
+    main()
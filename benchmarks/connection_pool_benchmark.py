@@ -0,0 +1,39 @@
+"""Measures requests per second of the pooled ReBaseClient against one-shot requests
+calls, using a local stub server. Run from the project root with:
+python -m benchmarks.connection_pool_benchmark"""
+
+from time import perf_counter
+import requests
+
+from src.python_rebase.rebase_client import ReBaseClient
+from tests.stub_server import StubServer
+
+REQUESTS = 2000
+
+def one_shot_requests(url: str) -> float:
+    """Sends REQUESTS requests with the module-level requests.get, as the client used to do"""
+
+    headers = { 'rebase-user-email': 'bench@rebase.com', 'rebase-user-token': 'token' }
+    start = perf_counter()
+    for _ in range(REQUESTS):
+        requests.get(url + 'movement/1', headers=headers, timeout=30).json()
+    return REQUESTS / (perf_counter() - start)
+
+def pooled_client(url: str) -> float:
+    """Sends REQUESTS requests through a single pooled ReBaseClient"""
+
+    with ReBaseClient('bench@rebase.com', 'token', server_url=url) as client:
+        start = perf_counter()
+        for _ in range(REQUESTS):
+            client.find_movement('1')
+        return REQUESTS / (perf_counter() - start)
+
+def main() -> None:
+    """Runs the benchmark and prints the results"""
+
+    with StubServer(lambda request: (200, { 'status': 0, 'movement': { 'id': '1', 'label': 'bench' } })) as server:
+        print(f'one-shot requests: {one_shot_requests(server.url):8.1f} req/s')
+        print(f'pooled client:     {pooled_client(server.url):8.1f} req/s')
+
+if __name__ == '__main__':
+    main()
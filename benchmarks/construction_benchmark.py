@@ -0,0 +1,87 @@
+"""Measures how many Movements and Sessions are built per second with the original list-based
+validation, with the compiled validator tables and with the trusted path used for server payloads.
+Run from the project root with: python -m benchmarks.construction_benchmark"""
+
+from time import perf_counter
+
+from src.python_rebase import movement as movement_module
+from src.python_rebase import session as session_module
+from src.python_rebase.movement import Movement
+from src.python_rebase.session import Session
+from src.python_rebase.util import MOVEMENT_FIELD_VALIDATORS, SESSION_FIELD_VALIDATORS, validate_initialization_dict
+
+COUNT = 20000
+
+def list_groups(table: dict) -> list:
+    """Groups the fields of a validator table into one list per validator, in table order,
+    to reproduce the original chain of list lookups"""
+
+    groups = {}
+    for field, validator in table.items():
+        groups.setdefault(validator, []).append(field)
+    return [(fields, validator) for validator, fields in groups.items()]
+
+MOVEMENT_GROUPS = list_groups(MOVEMENT_FIELD_VALIDATORS)
+SESSION_GROUPS = list_groups(SESSION_FIELD_VALIDATORS)
+
+def original_field(groups: list, field: str, value: any) -> bool:
+    """The original field check, a chain of list lookups"""
+
+    for fields, validator in groups:
+        if field in fields:
+            return validator(value)
+    return False
+
+def movement_payload(i: int) -> dict:
+    """A Movement as sent by the server, without registers"""
+
+    return { 'id': f'{i:024x}', 'label': 'squat', 'description': 'benchmark', 'device': 'kinect',
+             'fps': 30, 'duration': 10.0, 'numberOfRegisters': 300, 'articulations': ['a1', 'a2'],
+             'sessionId': 'session', 'professionalId': 'professional', 'patientId': 'patient',
+             'insertionDate': '2024-01-01', 'updateDate': '2024-01-02', 'app': { 'code': 7, 'data': 'x' } }
+
+def session_payload(i: int) -> dict:
+    """A Session as sent by the server, with its Movement ids"""
+
+    return { 'id': f'{i:024x}', 'title': 'session', 'description': 'benchmark', 'professionalId': 'professional',
+             'patientSessionNumber': 3, 'insertionDate': '2024-01-01', 'updateDate': '2024-01-02',
+             'patient': { 'id': 'patient', 'age': 30, 'height': 1.8, 'weight': 80 },
+             'medicalData': { 'mainComplaint': 'pain', 'diagnosis': 'none' }, 'movementIds': ['a', 'b'] }
+
+def rate(build, payloads: list) -> float:
+    """Returns the number of objects built per second"""
+
+    start = perf_counter()
+    for payload in payloads:
+        build(payload)
+    return len(payloads) / (perf_counter() - start)
+
+def original_movement(payload: dict) -> Movement:
+    """Validates with the original checks, then builds the Movement without validating again"""
+
+    validate_initialization_dict(lambda field, value: original_field(MOVEMENT_GROUPS, field, value), 'Movement', movement_module.FIELDS, payload)
+    return Movement(payload, trusted=True)
+
+def original_session(payload: dict) -> Session:
+    """Validates with the original checks, then builds the Session without validating again"""
+
+    validate_initialization_dict(lambda field, value: original_field(SESSION_GROUPS, field, value), 'Session', session_module.FIELDS, payload)
+    return Session(payload, trusted=True)
+
+def main() -> None:
+    """Runs the benchmark and prints the results"""
+
+    cases = [
+        ('Movement', [movement_payload(i) for i in range(COUNT)], original_movement, Movement),
+        ('Session', [session_payload(i) for i in range(COUNT)], original_session, Session)
+    ]
+
+    for name, payloads, original, model in cases:
+        print(f'{name} ({COUNT} objects)')
+        for label, build in [('list-based validation', original),
+                             ('compiled validation', model),
+                             ('trusted', lambda payload, model=model: model(payload, trusted=True))]:
+            print(f'  {label:<22} {rate(build, payloads):12.0f} objects/s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Measures the time taken by filtered fetch_movements queries on a LocalStore.
+Run from the project root with: python -m benchmarks.local_store_benchmark"""
+
+import os
+import random
+import tempfile
+from time import perf_counter
+
+from src.python_rebase.local_store import LocalStore
+from src.python_rebase.movement import Movement
+
+MOVEMENTS = 10000
+FRAMES = 30
+ARTICULATIONS = [f'articulation{i}' for i in range(20)]
+QUERIES = {
+    'professional': { 'professional_id': 'professional7' },
+    'patient': { 'patient_id': 'patient123' },
+    'professional + label': { 'professional_id': 'professional7', 'movement_label': 'label3' },
+    'articulations': { 'articulations': ARTICULATIONS[:3] },
+    'professional + articulations': { 'professional_id': 'professional7', 'articulations': ARTICULATIONS[:3] },
+    'page of 50': { 'per': 50, 'page': 20 },
+}
+
+def movements() -> list:
+    """Builds Movements with random metadata and articulation subsets"""
+
+    rng = random.Random(0)
+    for i in range(MOVEMENTS):
+        articulations = rng.sample(ARTICULATIONS, 8)
+        registers = [{ art: [rng.uniform(-180, 180) for _ in range(3)] for art in articulations } for _ in range(FRAMES)]
+        yield Movement({ 'id': f'{i:024x}', 'label': f'label{rng.randrange(10)}', 'professionalId': f'professional{rng.randrange(50)}',
+                         'patientId': f'patient{rng.randrange(500)}', 'fps': 30, 'registers': registers })
+
+def elapsed(function) -> float:
+    """Returns the time taken by function, in seconds"""
+
+    start = perf_counter()
+    function()
+    return perf_counter() - start
+
+def main() -> None:
+    """Runs the benchmark and prints the results"""
+
+    with tempfile.TemporaryDirectory() as directory, LocalStore(os.path.join(directory, 'store.db')) as store:
+        insert = elapsed(lambda: store.put_movements(movements()))
+        print(f'{MOVEMENTS} Movements x {FRAMES} frames, inserted in {insert:.2f}s')
+
+        for name, filters in QUERIES.items():
+            response = store.fetch_movements(**filters)
+            count = len(response.get_data('movements'))
+            query = min(elapsed(lambda filters=filters: store.fetch_movements(**filters)) for _ in range(5))
+            first = elapsed(lambda response=response: response.get_data('movements')[0].registers[0])
+            print(f'  {name:<30} {count:5} Movements   query {query * 1000:6.2f} ms   first Register {first * 1000:5.2f} ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Measures the memory used per frame by the Register representations for typical motion
+capture sizes. Run from the project root with: python -m benchmarks.memory_benchmark"""
+
+import tracemalloc
+
+from src.python_rebase.movement import Movement
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SIZES = [(1000, 20), (1000, 33), (10000, 20)]
+
+class DictRotation: # pylint: disable=too-few-public-methods
+    """Rotation with a per-instance __dict__, as the original class"""
+
+    def __init__(self, x, y, z):
+        self.x = x
+        self.y = y
+        self.z = z
+
+class DictRegister: # pylint: disable=too-few-public-methods
+    """Register that keeps its own dictionary keyed by articulation, as the original class"""
+
+    def __init__(self, articulations: dict):
+        self._articulations = { art: DictRotation(*value) for art, value in articulations.items() }
+
+def payload(frames: int, articulations: list) -> list:
+    """Builds a register payload as decoded from the server"""
+
+    return [{ art: [i * 0.1, i * 0.2, i * 0.3] for art in articulations } for i in range(frames)]
+
+def measure(build) -> int:
+    """Returns the bytes still allocated by the object returned from build"""
+
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+def slotted_registers(data: list) -> list:
+    """Decodes every frame into the slotted Register and Rotation classes"""
+
+    movement = Movement({ 'registers': data })
+    return list(movement.registers)
+
+def main() -> None:
+    """Runs the benchmark and prints the results"""
+
+    for frames, count in SIZES:
+        articulations = [f'articulation{i}' for i in range(count)]
+        data = payload(frames, articulations)
+
+        results = {
+            'dict-based classes': measure(lambda data=data: [DictRegister(frame) for frame in data]),
+            'slotted classes': measure(lambda data=data: slotted_registers(data)),
+        }
+        if np is not None:
+            results['numpy array'] = measure(lambda data=data, articulations=articulations: Movement.from_numpy(np.array([[frame[art] for art in articulations] for frame in data]), articulations))
+
+        print(f'{frames} frames x {count} articulations')
+        for name, size in results.items():
+            print(f'  {name:<20} {size / frames:10.1f} bytes/frame')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Compares opening a large Movement from a binary movement file, mapped and fully read, with
+loading it from its json. Run from the project root with: python -m benchmarks.movement_file_benchmark"""
+
+from json import loads
+import os
+import tempfile
+from time import perf_counter
+
+import numpy as np
+
+from src.python_rebase.movement import Movement
+
+FRAMES = 100000
+ARTICULATIONS = [f'articulation{i}' for i in range(33)]
+
+def elapsed(function) -> float:
+    """Returns the time taken by function, in seconds"""
+
+    start = perf_counter()
+    function()
+    return perf_counter() - start
+
+def main() -> None:
+    """Runs the benchmark and prints the results"""
+
+    frames = np.random.default_rng(0).uniform(-180, 180, (FRAMES, len(ARTICULATIONS), 3))
+    movement = Movement.from_numpy(frames, ARTICULATIONS, { 'label': 'benchmark', 'fps': 30 })
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'movement.rbm')
+        save = elapsed(lambda: movement.save(path))
+        print(f'{FRAMES} frames x {len(ARTICULATIONS)} articulations, {os.path.getsize(path) / 2 ** 20:.0f} MB')
+        print(f'  save                 {save * 1000:8.1f} ms')
+        print(f'  load (mmap)          {elapsed(lambda: Movement.load(path)) * 1000:8.1f} ms')
+        print(f'  load (mmap) + frame  {elapsed(lambda: Movement.load(path).registers[FRAMES // 2]) * 1000:8.1f} ms')
+        print(f'  load (read)          {elapsed(lambda: Movement.load(path, mmap=False)) * 1000:8.1f} ms')
+
+    body = movement.to_json()
+    print(f'  json ({len(body) / 2 ** 20:.0f} MB)           {elapsed(lambda: Movement(loads(body)["movement"], trusted=True)) * 1000:8.1f} ms')
+
+if __name__ == '__main__':
+    main()
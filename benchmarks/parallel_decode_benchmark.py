@@ -0,0 +1,66 @@
+"""Compares decoding a large deep fetch_sessions response in the calling process with decoding it in
+process pools of increasing size. The speedup depends on the number of available cores.
+Run from the project root with: python -m benchmarks.parallel_decode_benchmark"""
+
+from concurrent.futures import ProcessPoolExecutor
+from json import dumps, loads
+import os
+import random
+from time import perf_counter, process_time
+
+from src.python_rebase.parallel_decode import decode_parallel
+from src.python_rebase.session import Session
+
+SESSIONS = 8
+MOVEMENTS = 5
+FRAMES = 1000
+ARTICULATIONS = [f'articulation{i}' for i in range(33)]
+PROCESSES = [1, 2, 4, 8]
+
+def response_body() -> bytes:
+    """Builds a deep fetch_sessions response"""
+
+    rng = random.Random(0)
+    def movement(i: int) -> dict:
+        registers = [{ art: [round(rng.uniform(-180, 180), 4) for _ in range(3)] for art in ARTICULATIONS } for _ in range(FRAMES)]
+        return { 'id': f'{i:024x}', 'label': 'benchmark', 'fps': 30, 'articulations': ARTICULATIONS, 'registers': registers }
+
+    sessions = [{ 'id': f'{i:024x}', 'title': 'benchmark', 'movements': [movement(j) for j in range(MOVEMENTS)] } for i in range(SESSIONS)]
+    return dumps({ 'status': 0, 'sessions': sessions }).encode('utf-8')
+
+def sequential(body: bytes) -> list:
+    """Decodes the body as the client does without processes, reading every Register"""
+
+    sessions = [Session(session, trusted=True) for session in loads(body)['sessions']]
+    for session in sessions:
+        for movement in session.movements: list(movement.registers)
+    return sessions
+
+def elapsed(function) -> float:
+    """Returns the time taken by function, in seconds"""
+
+    start = perf_counter()
+    function()
+    return perf_counter() - start
+
+def main() -> None:
+    """Runs the benchmark and prints the results"""
+
+    body = response_body()
+    print(f'{SESSIONS} sessions x {MOVEMENTS} movements x {FRAMES} frames, {len(body) / 2 ** 20:.1f} MB, {os.cpu_count()} cores')
+
+    baseline = elapsed(lambda: sequential(body))
+    print(f'  sequential      {baseline:6.2f}s')
+
+    for processes in PROCESSES:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            # Os processos são iniciados antes da medição, como em um cliente já em uso
+            list(executor.map(abs, range(processes)))
+            cpu = process_time()
+            parallel = elapsed(lambda executor=executor, processes=processes: decode_parallel(body, 'sessions', executor, 4 * processes))
+            cpu = process_time() - cpu
+        # O tempo de CPU do processo principal limita o ganho possível com mais núcleos
+        print(f'  {processes} processes     {parallel:6.2f}s   ({baseline / parallel:.2f}x)   calling process CPU {cpu:5.2f}s (limit {baseline / cpu:.1f}x)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Measures the pickled size and the pickling time of Movements, and compares sending a large Movement
+to a worker process by pickling it with sending a SharedMovement handle.
+Run from the project root with: python -m benchmarks.pickle_benchmark"""
+
+from concurrent.futures import ProcessPoolExecutor
+import pickle
+import random
+from time import perf_counter
+
+import numpy as np
+
+from src.python_rebase.movement import Movement
+from src.python_rebase.shared_movement import SharedMovement
+
+FRAMES = 1000
+SHARED_FRAMES = 20000
+ARTICULATIONS = [f'articulation{i}' for i in range(33)]
+
+def registers(frames: int) -> list:
+    """Builds the Registers of a captured Movement, as received from the server"""
+
+    rng = random.Random(frames)
+    return [{ art: [rng.uniform(-180, 180) for _ in range(3)] for art in ARTICULATIONS } for _ in range(frames)]
+
+def elapsed(function) -> float:
+    """Returns the time taken by function, in seconds"""
+
+    start = perf_counter()
+    function()
+    return perf_counter() - start
+
+def frames_sum(movement: Movement) -> float:
+    """Work done by the worker process on a pickled Movement"""
+
+    return float(movement.to_numpy().sum())
+
+def shared_frames_sum(handle: SharedMovement) -> float:
+    """Work done by the worker process on a SharedMovement"""
+
+    movement = handle.movement()
+    total = float(movement.to_numpy().sum())
+    del movement
+    handle.close()
+    return total
+
+def main() -> None:
+    """Runs the benchmark and prints the results"""
+
+    data = registers(FRAMES)
+    built = Movement({ 'label': 'benchmark', 'registers': data })
+    list(built.registers)
+    movements = {
+        'raw registers': Movement({ 'label': 'benchmark', 'registers': data }),
+        'built registers': built,
+        'numpy registers': Movement.from_numpy(built.to_numpy(), ARTICULATIONS, { 'label': 'benchmark' }),
+        'to_dict()': built.to_dict(),
+    }
+
+    print(f'{FRAMES} frames x {len(ARTICULATIONS)} articulations')
+    for name, movement in movements.items():
+        body = pickle.dumps(movement, pickle.HIGHEST_PROTOCOL)
+        dumps = elapsed(lambda movement=movement: pickle.dumps(movement, pickle.HIGHEST_PROTOCOL))
+        loads = elapsed(lambda body=body: pickle.loads(body))
+        print(f'  {name:<16} {len(body) / 2 ** 20:6.2f} MB   dumps {dumps * 1000:6.1f} ms   loads {loads * 1000:6.1f} ms')
+
+    large = Movement.from_numpy(np.random.default_rng(0).uniform(-180, 180, (SHARED_FRAMES, len(ARTICULATIONS), 3)), ARTICULATIONS)
+    print(f'{SHARED_FRAMES} frames sent to a worker process ({large.to_numpy().nbytes / 2 ** 20:.0f} MB)')
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        executor.submit(abs, 0).result()
+        pickled = elapsed(lambda: executor.submit(frames_sum, large).result())
+        with SharedMovement(large) as handle:
+            shared = elapsed(lambda: executor.submit(shared_frames_sum, handle).result())
+    print(f'  pickled Movement {pickled * 1000:6.1f} ms   SharedMovement {shared * 1000:6.1f} ms')
+
+if __name__ == '__main__':
+    main()
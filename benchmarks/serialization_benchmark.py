@@ -0,0 +1,56 @@
+"""Measures the time to serialize a long Movement with the original dictionary-based to_json and with
+the direct serializer. Run from the project root with: python -m benchmarks.serialization_benchmark"""
+
+from json import dumps
+from time import perf_counter
+
+from src.python_rebase.movement import Movement
+from src.python_rebase.serializer import MOVEMENT_INSERT_EXCLUDE, movement_to_json
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+FRAMES = 10000
+ARTICULATIONS = [f'articulation{i}' for i in range(33)]
+
+def dict_based(movement: Movement) -> str:
+    """The original to_json: a full nested dictionary, then json.dumps"""
+
+    return dumps({ 'movement': movement.to_dict(exclude=list(MOVEMENT_INSERT_EXCLUDE)) })
+
+def elapsed(serialize, movement: Movement) -> float:
+    """Returns the best of three serialization times, in seconds"""
+
+    times = []
+    for _ in range(3):
+        start = perf_counter()
+        serialize(movement)
+        times.append(perf_counter() - start)
+    return min(times)
+
+def movements() -> dict:
+    """Builds the same Movement with raw, decoded and array-backed Registers"""
+
+    data = [{ art: [i * 0.1, i * 0.2, i * 0.3] for art in ARTICULATIONS } for i in range(FRAMES)]
+    decoded = Movement({ 'label': 'benchmark', 'fps': 30, 'registers': data })
+    list(decoded.registers)
+
+    cases = { 'raw registers': Movement({ 'label': 'benchmark', 'fps': 30, 'registers': data }),
+              'decoded registers': decoded }
+    if np is not None:
+        array = np.array([[frame[art] for art in ARTICULATIONS] for frame in data])
+        cases['numpy array'] = Movement.from_numpy(array, ARTICULATIONS, { 'label': 'benchmark', 'fps': 30 })
+    return cases
+
+def main() -> None:
+    """Runs the benchmark and prints the results"""
+
+    print(f'{FRAMES} frames x {len(ARTICULATIONS)} articulations')
+    for name, movement in movements().items():
+        before, after = elapsed(dict_based, movement), elapsed(movement_to_json, movement)
+        print(f'  {name:<18} dict-based {before:7.3f}s   direct {after:7.3f}s   ({before / after:.1f}x)')
+
+if __name__ == '__main__':
+    main()
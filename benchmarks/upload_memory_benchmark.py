@@ -0,0 +1,45 @@
+"""Measures the peak memory allocated while inserting Movements of increasing length, with the whole
+json built in memory and with chunked uploads. Run from the project root with:
+python -m benchmarks.upload_memory_benchmark"""
+
+import tracemalloc
+
+from src.python_rebase.movement import Movement
+from src.python_rebase.rebase_client import ReBaseClient
+from tests.stub_server import StubServer
+
+FRAMES = [1000, 10000, 50000]
+ARTICULATIONS = [f'articulation{i}' for i in range(33)]
+
+def long_movement(frames: int) -> Movement:
+    """Builds a Movement with frames raw Registers"""
+
+    registers = [{ art: [i * 0.1, i * 0.2, i * 0.3] for art in ARTICULATIONS } for i in range(frames)]
+    return Movement({ 'label': 'benchmark', 'fps': 30, 'registers': registers })
+
+def peak_memory(client: ReBaseClient, movement: Movement) -> int:
+    """Returns the peak of the memory allocated during the insert, in bytes"""
+
+    tracemalloc.start()
+    response = client.insert_movement(movement)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    if not response.success:
+        raise RuntimeError(str(response))
+    return peak
+
+def main() -> None:
+    """Runs the benchmark and prints the results"""
+
+    with StubServer(lambda request: (201, { 'status': 0 }), keep_bodies=False) as server:
+        with ReBaseClient('bench@rebase.com', 'token', server_url=server.url) as plain, \
+                ReBaseClient('bench@rebase.com', 'token', server_url=server.url, chunked_uploads=True) as chunked:
+            for frames in FRAMES:
+                movement = long_movement(frames)
+                print(f'{frames} frames x {len(ARTICULATIONS)} articulations')
+                print(f'  in-memory body {peak_memory(plain, movement) / 2 ** 20:10.1f} MB peak')
+                print(f'  chunked body   {peak_memory(chunked, movement) / 2 ** 20:10.1f} MB peak')
+
+if __name__ == '__main__':
+    main()
@@ -18,6 +18,7 @@
 # along with Python ReBase.  If not, see <https://www.gnu.org/licenses/>
 
 from enum import Enum
+from .lazy_sequence import LazySequence
 from .movement import Movement
 from .session import Session
 
@@ -59,10 +60,18 @@ class APIResponse:
     success = property(__get_success)
 
     def get_data(self, key: str = None):
-        """Returns the data associated with the given key, or None if the key is not found"""
+        """Returns the data associated with the given key, or None if the key is not found.
+        Movements and Sessions are built from the response only when they are first accessed"""
         if key is None:
             return None
-        return self._data.get(key)
+
+        value = self._data.get(key)
+        if key == 'movement' and isinstance(value, dict):
+            value = self._data[key] = self.__force_movement(value)
+        elif key == 'session' and isinstance(value, dict):
+            value = self._data[key] = self.__force_session(value)
+
+        return value
 
     def has_data(self, key: str = None) -> bool:
         """Returns true if the response has data associated with the given key, false otherwise"""
@@ -105,15 +114,18 @@ class APIResponse:
 
     human_response_type = property(__get_human_response_type)
 
+    # As listas são convertidas em LazySequences: cada Movimento ou Sessão só é construído no primeiro acesso
     def __ensure_objects(self):
-        if self.has_data('movement'):
-            self._data['movement'] = Movement(self._data['movement'])
-        if self.has_data('movements'):
-            self._data['movements'] = [Movement(movement) for movement in self._data['movements']]
-        if self.has_data('session'):
-            self._data['session'] = Session(self._data['session'])
-        if self.has_data('sessions'):
-            self._data['sessions'] = [Session(movement) for movement in self._data['sessions']]
+        if self.has_data('movements') and not isinstance(self._data['movements'], LazySequence):
+            self._data['movements'] = LazySequence(self._data['movements'], self.__force_movement)
+        if self.has_data('sessions') and not isinstance(self._data['sessions'], LazySequence):
+            self._data['sessions'] = LazySequence(self._data['sessions'], self.__force_session)
+
+    def __force_movement(self, obj) -> Movement:
+        return obj if isinstance(obj, Movement) else Movement(obj, trusted=True)
+
+    def __force_session(self, obj) -> Session:
+        return obj if isinstance(obj, Session) else Session(obj, trusted=True)
 
     def __str_data(self):
-        return { k: str(self._data[k]) for k in self._data }
+        return { k: str(self.get_data(k)) for k in self._data }
@@ -0,0 +1,74 @@
+"""This module contains the ArticulationSchema class, an interned and immutable list of articulations"""
+
+# Copyright © 2023-2024 Tiago Trotta
+
+# This file is part of Python ReBase.
+
+# Python ReBase is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Python ReBase is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Python ReBase.  If not, see <https://www.gnu.org/licenses/>
+
+from threading import Lock
+from typing import Iterable
+from weakref import WeakValueDictionary
+
+from .repeated_articulation_error import RepeatedArticulationError
+
+class ArticulationSchema:
+    """Immutable, ordered list of articulations shared by every Register that has the same articulations.
+    Schemas must be created with ArticulationSchema.intern, so that equal schemas are the same object"""
+
+    __slots__ = ('names', 'indexes', '__weakref__')
+
+    __interned = WeakValueDictionary()
+    __lock = Lock()
+
+    def __init__(self, names: tuple):
+        indexes = {}
+        for i, name in enumerate(names):
+            if name in indexes:
+                raise RepeatedArticulationError(name, list(names))
+            indexes[name] = i
+
+        self.names = names
+        self.indexes = indexes
+
+    @classmethod
+    def intern(cls, names: Iterable[str]) -> 'ArticulationSchema':
+        """Returns the shared schema for the given articulations, creating it if needed"""
+
+        names = tuple(names)
+        schema = cls.__interned.get(names)
+        if schema is not None:
+            return schema
+
+        with cls.__lock:
+            schema = cls.__interned.get(names)
+            if schema is None:
+                schema = cls.__interned[names] = cls(names)
+            return schema
+
+    def extended(self, name: str) -> 'ArticulationSchema':
+        """Returns the shared schema with the given articulation appended"""
+
+        return ArticulationSchema.intern(self.names + (name,))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __str__(self) -> str:
+        return str(list(self.names))
+
+    def __reduce__(self):
+        return (ArticulationSchema.intern, (self.names,))
+
+EMPTY_SCHEMA = ArticulationSchema.intern(())
@@ -0,0 +1,210 @@
+"""Module that provides coroutines for sending requests to the ReBase Server"""
+
+# Copyright © 2023-2024 Tiago Trotta
+
+# This file is part of Python ReBase.
+
+# Python ReBase is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Python ReBase is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Python ReBase.  If not, see <https://www.gnu.org/licenses/>
+
+from asyncio import Semaphore, ensure_future, gather, get_running_loop
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Iterable
+
+from .rebase_client import ReBaseClient, _SERVER_URL
+from .api_response import APIResponse
+from .compression import CompressionStats
+from .missing_attribute_error import MissingAttributeError
+from .response_cache import ResponseCache
+from .movement import Movement
+from .session import Session
+
+class AsyncReBaseClient:
+    """Class that provides coroutines for sending requests to the ReBaseRS.
+    Mirrors the ReBaseClient API and keeps at most max_concurrency requests in flight"""
+
+    def __init__(self, user_email: str, user_token: str, max_concurrency: int = 10,
+                 server_url: str = _SERVER_URL, timeout: float = 30, chunked_uploads: bool = False,
+                 compression: str = None, compression_threshold: int = 1024, cache_entries: int = 0,
+                 cache_bytes: int = 64 * 2 ** 20, cache_ttl: float = 60, coalesce_requests: bool = True,
+                 decode_processes: int = 0, decode_threshold: int = 8 * 2 ** 20):
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be greater than zero')
+
+        self.max_concurrency = max_concurrency
+        self._client = ReBaseClient(user_email, user_token, server_url=server_url, pool_maxsize=max_concurrency, timeout=timeout,
+                                    chunked_uploads=chunked_uploads, compression=compression,
+                                    compression_threshold=compression_threshold, cache_entries=cache_entries,
+                                    cache_bytes=cache_bytes, cache_ttl=cache_ttl, coalesce_requests=coalesce_requests,
+                                    decode_processes=decode_processes, decode_threshold=decode_threshold)
+        self.__semaphore = Semaphore(max_concurrency)
+        self.__executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='rebase')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self) -> None:
+        """Waits for the pending requests and closes every pooled connection"""
+
+        await get_running_loop().run_in_executor(None, self.__executor.shutdown)
+        self._client.close()
+
+    def __get_user_email(self) -> str:
+        return self._client.user_email
+
+    def __get_user_token(self) -> str:
+        return self._client.user_token
+
+    def __get_compression_stats(self) -> CompressionStats:
+        return self._client.compression_stats
+
+    def __get_cache(self) -> ResponseCache:
+        return self._client.cache
+
+    def __get_coalesced_requests(self) -> int:
+        return self._client.coalesced_requests
+
+    user_email = property(__get_user_email)
+    user_token = property(__get_user_token)
+    compression_stats = property(__get_compression_stats, doc='The CompressionStats of the wrapped ReBaseClient')
+    cache = property(__get_cache, doc='The ResponseCache of the wrapped ReBaseClient, or None if caching is disabled')
+    coalesced_requests = property(__get_coalesced_requests, doc='The number of requests that shared the result of an identical request in progress')
+
+    async def authenticate(self) -> APIResponse:
+        """"Authenticates the user with the user_email and user_token provided in the constructor"""
+
+        return await self.__run(self._client.authenticate)
+
+    async def fetch_movements(self, professional_id: str = '', patient_id: str = '', movement_label: str = '', articulations: list = None, legacy: bool = False, page: int = 0, per: int = 0, previous_id: str = '') -> APIResponse:
+        """Gets a list of Movements. Accepts the same filters as ReBaseClient.fetch_movements"""
+
+        return await self.__run(self._client.fetch_movements, professional_id, patient_id, movement_label, articulations, legacy, page, per, previous_id)
+
+    async def find_movement(self, movement_id: str, legacy: bool = False) -> APIResponse:
+        """Finds a specific Movement by ID"""
+
+        return await self.__run(self._client.find_movement, movement_id, legacy)
+
+    async def find_movements(self, movement_ids: Iterable[str], legacy: bool = False, width: int = None) -> dict[str, APIResponse]:
+        """Finds many Movements by ID, with up to width requests at the same time. Repeated IDs are requested once.
+        Returns a dictionary that maps each ID to its APIResponse. width defaults to max_concurrency"""
+
+        return await self.__find_many(self._client.find_movement, movement_ids, 'movement id', width, legacy)
+
+    async def insert_movement(self, movement: Movement) -> APIResponse:
+        """Creates a new Movement"""
+
+        return await self.__run(self._client.insert_movement, movement)
+
+    async def insert_movements(self, movements: Iterable[Movement], max_in_flight: int = None) -> list[APIResponse]:
+        """Creates many Movements concurrently, returning one APIResponse per Movement in input order.
+        max_in_flight defaults to max_concurrency"""
+
+        return await self.__insert_many(self._client.insert_movement, movements, max_in_flight)
+
+    async def update_movement(self, movement: Movement) -> APIResponse:
+        """Updates an existing Movement"""
+
+        return await self.__run(self._client.update_movement, movement)
+
+    async def delete_movement(self, movement_id: str) -> APIResponse:
+        """Deletes a Movement by ID"""
+
+        return await self.__run(self._client.delete_movement, movement_id)
+
+    async def fetch_sessions(self, professional_id: str = "", patient_id: str = "", movement_label: str = "", articulations: list = None, legacy: bool = False, deep: bool = False, page: int = 0, per: int = 0, previous_id: str = '') -> APIResponse:
+        """Gets a list of Sessions. Accepts the same filters as ReBaseClient.fetch_sessions"""
+
+        return await self.__run(self._client.fetch_sessions, professional_id, patient_id, movement_label, articulations, legacy, deep, page, per, previous_id)
+
+    async def find_session(self, session_id: str, legacy: bool = False, deep: bool = False) -> APIResponse:
+        """Finds a specific Session by ID"""
+
+        return await self.__run(self._client.find_session, session_id, legacy, deep)
+
+    async def find_sessions(self, session_ids: Iterable[str], legacy: bool = False, deep: bool = False, width: int = None) -> dict[str, APIResponse]:
+        """Finds many Sessions by ID, in the same way as find_movements"""
+
+        return await self.__find_many(self._client.find_session, session_ids, 'session id', width, legacy, deep)
+
+    async def insert_session(self, session: Session) -> APIResponse:
+        """Creates a new Session"""
+
+        return await self.__run(self._client.insert_session, session)
+
+    async def insert_sessions(self, sessions: Iterable[Session], max_in_flight: int = None) -> list[APIResponse]:
+        """Creates many Sessions concurrently, returning one APIResponse per Session in input order.
+        max_in_flight defaults to max_concurrency"""
+
+        return await self.__insert_many(self._client.insert_session, sessions, max_in_flight)
+
+    async def update_session(self, session: Session) -> APIResponse:
+        """Updates an existing Session"""
+
+        return await self.__run(self._client.update_session, session)
+
+    async def delete_session(self, session_id: str, deep: bool = False) -> APIResponse:
+        """Deletes a Session by ID"""
+
+        return await self.__run(self._client.delete_session, session_id, deep)
+
+    # As requisições bloqueantes do ReBaseClient são executadas em threads, limitadas pelo semáforo
+    async def __run(self, method, *args):
+        async with self.__semaphore:
+            return await get_running_loop().run_in_executor(self.__executor, partial(method, *args))
+
+    async def __find_many(self, find_method, resource_ids: Iterable[str], attribute_name: str, width: int, *args) -> dict[str, APIResponse]:
+        if width is None: width = self.max_concurrency
+        if width < 1:
+            raise ValueError('width must be greater than zero')
+
+        unique_ids = list(dict.fromkeys(resource_ids))
+        if any(resource_id is None or resource_id == '' for resource_id in unique_ids):
+            raise MissingAttributeError(attribute_name)
+        semaphore = Semaphore(width)
+
+        async def find(resource_id: str) -> APIResponse:
+            async with semaphore:
+                return await self.__run(find_method, resource_id, *args)
+
+        return dict(zip(unique_ids, await gather(*(find(resource_id) for resource_id in unique_ids))))
+
+    # Lê no máximo max_in_flight itens à frente do último resultado entregue
+    async def __insert_many(self, insert_method, resources: Iterable, max_in_flight: int = None) -> list[APIResponse]:
+        if max_in_flight is None: max_in_flight = self.max_concurrency
+        if max_in_flight < 1:
+            raise ValueError('max_in_flight must be greater than zero')
+
+        pending = deque()
+        responses = []
+
+        for resource in resources:
+            if len(pending) >= max_in_flight:
+                responses.append(await pending.popleft())
+            pending.append(ensure_future(self.__insert_safely(insert_method, resource)))
+
+        while pending:
+            responses.append(await pending.popleft())
+
+        return responses
+
+    async def __insert_safely(self, insert_method, resource) -> APIResponse:
+        try:
+            return await self.__run(insert_method, resource)
+        except (TypeError, ValueError, AttributeError) as e:
+            return APIResponse(response_type=APIResponse.ResponseType.API_ERROR, data={ 'HTMLError': str(e) })
@@ -0,0 +1,178 @@
+"""This module contains the BulkExporter class, which exports Movements to JSON Lines or NumPy files with bounded memory"""
+
+# Copyright © 2023-2024 Tiago Trotta
+
+# This file is part of Python ReBase.
+
+# Python ReBase is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Python ReBase is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Python ReBase.  If not, see <https://www.gnu.org/licenses/>
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+from json import dumps, loads
+import os
+from time import perf_counter
+from typing import Callable
+
+from .movement import Movement
+from .register_array import np, require_numpy
+from .serializer import movement_dict_json
+
+FORMATS = ('jsonl', 'npz')
+JSONL_FILE = 'movements.jsonl'
+CHECKPOINT_FILE = 'export-checkpoint.json'
+
+class ExportReport: # pylint: disable=too-few-public-methods
+    """Progress and result of an export"""
+
+    def __init__(self, resumed: bool = False):
+        self.resumed = resumed
+        self.exported = 0
+        self.bytes_written = 0
+        self.elapsed = 0.0
+
+    def __str__(self):
+        return f'{self.exported} Movements exported, {self.bytes_written / 2 ** 20:.1f} MB ' + \
+            f'in {self.elapsed:.2f}s ({self.records_per_second:.0f} records/s)'
+
+    def __get_records_per_second(self) -> float:
+        return self.exported / self.elapsed if self.elapsed > 0 else 0.0
+
+    records_per_second = property(__get_records_per_second, doc='The number of Movements exported per second')
+
+class BulkExporter: # pylint: disable=too-few-public-methods
+    """Exports every Movement that matches the filters to a directory, streaming the listing one
+    page at a time with the previous_id cursor, so only a page (and the next one, when prefetching)
+    is kept in memory. With format 'jsonl', each Movement is written as a line of movements.jsonl;
+    with 'npz', each one is written to <id>.npz, with its frames (an array of shape
+    (frames, articulations, 3)), its articulations and its other properties as json (metadata).
+    A checkpoint is saved after every page, so running an interrupted export again resumes it"""
+
+    def __init__(self, client, directory: str | os.PathLike, export_format: str = 'jsonl', professional_id: str = '', patient_id: str = '',
+                 movement_label: str = '', articulations: list = None, per: int = 100, writers: int = 4, compress: bool = False,
+                 prefetch: bool = True, progress: Callable[[ExportReport], None] = None):
+        """Creates an exporter that lists the Movements with client (a ReBaseClient). npz files are written
+        by up to writers threads, and compress applies to them; json lines are written in the calling thread. progress, if given, is called after every page.
+        The npz format requires NumPy"""
+
+        if export_format not in FORMATS:
+            raise ValueError(f'export_format must be one of {FORMATS}')
+        if per < 1 or writers < 1:
+            raise ValueError('per and writers must be greater than zero')
+        if export_format == 'npz': require_numpy()
+
+        self.client = client
+        self.directory = directory
+        self.export_format = export_format
+        self.filters = { 'professional_id': professional_id, 'patient_id': patient_id,
+                         'movement_label': movement_label, 'articulations': articulations or [] }
+        self.per = per
+        self.writers = writers
+        self.compress = compress
+        self.prefetch = prefetch
+        self.progress = progress
+
+    def run(self) -> ExportReport:
+        """Exports the Movements, resuming an interrupted export of the same format and filters
+        from its checkpoint, which is removed at the end. Raises FailedRequestError if a page fails"""
+
+        os.makedirs(self.directory, exist_ok=True)
+        checkpoint = self.__load_checkpoint()
+        cursor = checkpoint['cursor'] if checkpoint is not None else ''
+        offset = checkpoint['offset'] if checkpoint is not None else 0
+
+        report = ExportReport(resumed=checkpoint is not None)
+        start = perf_counter()
+
+        items = self.client.iter_movements(**self.filters, per=self.per, previous_id=cursor, prefetch=self.prefetch)
+        try:
+            with ThreadPoolExecutor(max_workers=self.writers) as executor, self.__open_output(offset) as output:
+                while True:
+                    page = list(islice(items, self.per))
+                    if len(page) == 0: break
+
+                    report.bytes_written += self.__write_page(page, executor, output)
+                    report.exported += len(page)
+                    report.elapsed = perf_counter() - start
+
+                    self.__save_checkpoint(page[-1].id, output.tell() if output is not None else 0)
+                    if self.progress is not None: self.progress(report)
+                    if len(page) < self.per: break
+        finally:
+            items.close()
+
+        # Uma listagem vazia termina antes do primeiro checkpoint
+        if os.path.exists(self.__path(CHECKPOINT_FILE)): os.remove(self.__path(CHECKPOINT_FILE))
+        return report
+
+    def __path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def __load_checkpoint(self) -> dict | None:
+        try:
+            with open(self.__path(CHECKPOINT_FILE), encoding='utf-8') as file:
+                checkpoint = loads(file.read())
+        except FileNotFoundError:
+            return None
+
+        if checkpoint['format'] != self.export_format or checkpoint['filters'] != self.filters:
+            raise ValueError(f'{self.directory} has an unfinished export with another format or other filters')
+
+        # Uma saída removida ou menor que o checkpoint perdeu linhas já exportadas, então a exportação recomeça
+        if self.export_format == 'jsonl' and checkpoint['offset'] > self.__output_size(): return None
+        return checkpoint
+
+    def __output_size(self) -> int:
+        try:
+            return os.path.getsize(self.__path(JSONL_FILE))
+        except FileNotFoundError:
+            return 0
+
+    # O checkpoint é substituído de uma só vez, para que uma interrupção nunca deixe um arquivo incompleto
+    def __save_checkpoint(self, cursor: str, offset: int) -> None:
+        temporary = self.__path(CHECKPOINT_FILE + '.tmp')
+        with open(temporary, 'w', encoding='utf-8') as file:
+            file.write(dumps({ 'format': self.export_format, 'filters': self.filters, 'cursor': cursor, 'offset': offset }))
+        os.replace(temporary, self.__path(CHECKPOINT_FILE))
+
+    # Linhas escritas depois do último checkpoint são descartadas ao continuar a exportação
+    def __open_output(self, offset: int):
+        if self.export_format != 'jsonl': return nullcontext()
+
+        path = self.__path(JSONL_FILE)
+        output = open(path, 'r+b' if offset > 0 else 'wb') # pylint: disable=consider-using-with
+        output.seek(offset)
+        output.truncate()
+        return output
+
+    def __write_page(self, page: list, executor: ThreadPoolExecutor, output) -> int:
+        if self.export_format == 'npz':
+            return sum(executor.map(self.__write_npz, page))
+
+        # O json é gerado em Python puro, então threads não o aceleram por causa do GIL
+        lines = [(movement_dict_json(movement) + '\n').encode('utf-8') for movement in page]
+        output.writelines(lines)
+        output.flush()
+        os.fsync(output.fileno())
+        return sum(map(len, lines))
+
+    def __write_npz(self, movement: Movement) -> int:
+        path = self.__path(f'{movement.id}.npz')
+        temporary = path + '.tmp'
+        save = np.savez_compressed if self.compress else np.savez
+        with open(temporary, 'wb') as file:
+            save(file, frames=movement.to_numpy(np.float64), articulations=np.array(movement.articulations or [], dtype=str),
+                 metadata=np.array(dumps(movement.to_dict(exclude=['registers']))))
+        os.replace(temporary, path)
+        return os.path.getsize(path)
@@ -0,0 +1,125 @@
+"""Module that compresses request bodies and keeps statistics about the compression"""
+
+# Copyright © 2023-2024 Tiago Trotta
+
+# This file is part of Python ReBase.
+
+# Python ReBase is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Python ReBase is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Python ReBase.  If not, see <https://www.gnu.org/licenses/>
+
+from threading import Lock
+from time import perf_counter
+from typing import Iterable, Iterator
+import zlib
+
+ENCODINGS = ('gzip', 'deflate')
+
+# O wbits define o formato: 31 gera o formato gzip e 15 o formato zlib, que é o esperado pelo "deflate" do HTTP
+_WBITS = { 'gzip': 31, 'deflate': 15 }
+_LEVEL = 6
+
+class CompressionStats:
+    """Accumulated statistics of the compressed request bodies and responses of a client"""
+
+    def __init__(self):
+        self.__lock = Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clears every statistic"""
+
+        with self.__lock:
+            self.compressed_requests = 0
+            self.uncompressed_requests = 0
+            self.original_bytes = 0
+            self.compressed_bytes = 0
+            self.compression_time = 0.0
+            self.compressed_responses = 0
+            self.response_bytes = 0
+            self.response_wire_bytes = 0
+
+    def record_request(self, original_size: int, compressed_size: int, seconds: float) -> None:
+        """Records a compressed request body"""
+
+        with self.__lock:
+            self.compressed_requests += 1
+            self.original_bytes += original_size
+            self.compressed_bytes += compressed_size
+            self.compression_time += seconds
+
+    def record_uncompressed_request(self) -> None:
+        """Records a request body that was below the compression threshold"""
+
+        with self.__lock:
+            self.uncompressed_requests += 1
+
+    def record_response(self, decoded_size: int, wire_size: int) -> None:
+        """Records a compressed response"""
+
+        with self.__lock:
+            self.compressed_responses += 1
+            self.response_bytes += decoded_size
+            self.response_wire_bytes += wire_size
+
+    def __get_ratio(self) -> float:
+        return self.original_bytes / self.compressed_bytes if self.compressed_bytes > 0 else None
+
+    def __get_response_ratio(self) -> float:
+        return self.response_bytes / self.response_wire_bytes if self.response_wire_bytes > 0 else None
+
+    ratio = property(__get_ratio, doc='Original size divided by compressed size of the request bodies, or None if nothing was compressed')
+    response_ratio = property(__get_response_ratio, doc='Decoded size divided by received size of the compressed responses, or None if none was received')
+
+    def __str__(self) -> str:
+        return str({ 'compressed_requests': self.compressed_requests, 'uncompressed_requests': self.uncompressed_requests,
+                     'original_bytes': self.original_bytes, 'compressed_bytes': self.compressed_bytes,
+                     'ratio': self.ratio, 'compression_time': self.compression_time,
+                     'compressed_responses': self.compressed_responses, 'response_ratio': self.response_ratio })
+
+def compress_body(body: bytes, encoding: str, stats: CompressionStats = None) -> bytes:
+    """Compresses a complete request body with the given encoding ('gzip' or 'deflate')"""
+
+    start = perf_counter()
+    compressor = zlib.compressobj(_LEVEL, zlib.DEFLATED, _WBITS[encoding])
+    compressed = compressor.compress(body) + compressor.flush()
+
+    if stats is not None: stats.record_request(len(body), len(compressed), perf_counter() - start)
+    return compressed
+
+def iter_compressed(chunks: Iterable[bytes], encoding: str, stats: CompressionStats = None) -> Iterator[bytes]:
+    """Compresses a request body while it is generated, yielding the compressed chunks.
+    The statistics are recorded when the body ends"""
+
+    compressor = zlib.compressobj(_LEVEL, zlib.DEFLATED, _WBITS[encoding])
+    original_size = 0
+    compressed_size = 0
+    seconds = 0.0
+
+    for chunk in chunks:
+        start = perf_counter()
+        compressed = compressor.compress(chunk)
+        seconds += perf_counter() - start
+        original_size += len(chunk)
+
+        # Um bloco vazio encerraria o corpo na codificação chunked
+        if compressed:
+            compressed_size += len(compressed)
+            yield compressed
+
+    start = perf_counter()
+    compressed = compressor.flush()
+    seconds += perf_counter() - start
+    compressed_size += len(compressed)
+
+    if stats is not None: stats.record_request(original_size, compressed_size, seconds)
+    yield compressed
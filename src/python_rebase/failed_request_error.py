@@ -0,0 +1,28 @@
+"""Module that provides the FailedRequestError class"""
+
+# Copyright © 2023-2024 Tiago Trotta
+
+# This file is part of Python ReBase.
+
+# Python ReBase is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Python ReBase is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Python ReBase.  If not, see <https://www.gnu.org/licenses/>
+
+class FailedRequestError(Exception):
+    """Error thrown when a request fails in a context that can't return an APIResponse, such as an iterator"""
+
+    def __init__(self, response, *args):
+        super().__init__(args)
+        self.response = response
+
+    def __str__(self):
+        return f'Request failed with code {self.response.code}: {self.response.get_data("error") or self.response.get_data("HTMLError")}'
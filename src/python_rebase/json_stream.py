@@ -0,0 +1,131 @@
+"""Module that provides incremental decoding of large json documents"""
+
+# Copyright © 2023-2024 Tiago Trotta
+
+# This file is part of Python ReBase.
+
+# Python ReBase is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Python ReBase is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Python ReBase.  If not, see <https://www.gnu.org/licenses/>
+
+from codecs import getincrementaldecoder
+from json import JSONDecoder, JSONDecodeError
+from typing import Iterable, Iterator
+
+_DECODER = JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+class _Buffer:
+    """Text accumulated from the chunks that has not been decoded yet"""
+
+    def __init__(self, chunks: Iterable[bytes | str]):
+        self.text = ''
+        self.pos = 0
+        self.__chunks = iter(chunks)
+        self.__decoder = getincrementaldecoder('utf-8')()
+        self.__exhausted = False
+
+    def read_more(self, min_size: int = 0) -> bool:
+        """Appends at least min_size characters (or the next chunk) to the buffer, discarding
+        the consumed text. Returns False if the input had already ended"""
+
+        if self.__exhausted:
+            return False
+
+        pieces = [self.text[self.pos:]]
+        size = 0
+        while size == 0 or size < min_size:
+            chunk = next(self.__chunks, None)
+            if chunk is None:
+                self.__exhausted = True
+                pieces.append(self.__decoder.decode(b'', final=True))
+                break
+
+            if isinstance(chunk, bytes): chunk = self.__decoder.decode(chunk)
+            pieces.append(chunk)
+            size += len(chunk)
+
+        self.text = ''.join(pieces)
+        self.pos = 0
+        return True
+
+    def next_char(self) -> str:
+        """Skips whitespace and returns the next character without consuming it, or None at the end of the input"""
+
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.read_more():
+                return None
+
+    def expect(self, char: str) -> None:
+        """Consumes the next character, which must be char"""
+
+        if self.next_char() != char:
+            raise ValueError(f"Invalid json: expected '{char}' at position {self.pos}")
+        self.pos += 1
+
+    def read_value(self):
+        """Consumes and decodes a complete json value"""
+
+        self.next_char()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.text, self.pos)
+                # Um valor que termina junto com o buffer pode estar incompleto (e.g. um número cortado)
+                if end < len(self.text) or self.__exhausted:
+                    self.pos = end
+                    return value
+            except JSONDecodeError as e:
+                if self.__exhausted:
+                    raise ValueError(f'Invalid json: {e}') from e
+
+            # Lê ao menos o que já está no buffer, para que o custo das novas tentativas cresça linearmente
+            if not self.read_more(len(self.text) - self.pos):
+                raise ValueError('Invalid json: unexpected end of document')
+
+def iter_array_items(chunks: Iterable[bytes | str], key: str) -> Iterator:
+    """Decodes a json object incrementally from an iterable of chunks, yielding each element
+    of the array stored in its top-level attribute key as soon as the element is complete.
+    Only one element is kept decoded at a time. Yields nothing if the attribute is missing"""
+
+    buffer = _Buffer(chunks)
+    buffer.expect('{')
+
+    while True:
+        char = buffer.next_char()
+        if char in ('}', None):
+            return
+        if char == ',':
+            buffer.pos += 1
+            continue
+
+        attribute = buffer.read_value()
+        buffer.expect(':')
+        if attribute != key:
+            buffer.read_value()
+            continue
+
+        buffer.expect('[')
+        while True:
+            char = buffer.next_char()
+            if char == ']':
+                return
+            if char == ',':
+                buffer.pos += 1
+                continue
+            if char is None:
+                raise ValueError('Invalid json: unexpected end of document')
+
+            yield buffer.read_value()
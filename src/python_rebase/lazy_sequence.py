@@ -0,0 +1,152 @@
+"""This module contains the LazySequence class, a list that builds its items on first access"""
+
+# Copyright © 2023-2024 Tiago Trotta
+
+# This file is part of Python ReBase.
+
+# Python ReBase is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Python ReBase is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Python ReBase.  If not, see <https://www.gnu.org/licenses/>
+
+from collections.abc import MutableSequence, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable
+
+class LazySequence(MutableSequence):
+    """List whose items are stored in their raw form and converted by a factory function
+    only when they are first accessed. Converted items are kept, so each one is built once.
+    The factory must also accept items that are already built"""
+
+    def __init__(self, raw_items: Iterable = None, factory: Callable = None):
+        self._items = list(raw_items) if raw_items is not None else []
+        self._built = bytearray(len(self._items))
+        self._factory = factory or (lambda item: item)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index: int | slice):
+        if isinstance(index, slice):
+            return [self.__build(i) for i in range(*index.indices(len(self._items)))]
+
+        if index < 0: index += len(self._items)
+        if index < 0 or index >= len(self._items):
+            raise IndexError('LazySequence index out of range')
+
+        return self.__build(index)
+
+    def __setitem__(self, index: int | slice, value) -> None:
+        if isinstance(index, slice):
+            self.__replace(index, list(value))
+            return
+
+        self._items[index] = value
+        self._built[index] = 0
+
+    def __delitem__(self, index: int | slice) -> None:
+        del self._items[index]
+        del self._built[index]
+
+    def __iter__(self):
+        for i in range(len(self._items)):
+            yield self.__build(i)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, (str, bytes)) or len(self) != len(other):
+            return False
+        return all(a == b for a, b in zip(self, other))
+
+    def __str__(self) -> str:
+        return str(list(self))
+
+    __repr__ = __str__
+
+    def insert(self, index: int, value) -> None:
+        self._items.insert(index, value)
+        self._built.insert(index, 0)
+
+    def extend(self, values: Iterable) -> None:
+        # Outra LazySequence é concatenada sem que seus itens sejam construídos
+        if isinstance(values, LazySequence):
+            self._items.extend(values._items) # pylint: disable=protected-access
+            self._built.extend(values._built) # pylint: disable=protected-access
+            return
+
+        for value in values:
+            self.append(value)
+
+    def is_built(self, index: int) -> bool:
+        """Returns true if the item at the given index was already built, false otherwise"""
+
+        return self._built[index] == 1
+
+    def raw_item(self, index: int):
+        """Returns the item at the given index as it is stored, without building it"""
+
+        return self._items[index]
+
+    def __get_built_count(self) -> int:
+        return self._built.count(1)
+
+    built_count = property(__get_built_count, doc='The number of items that were already built')
+
+    def __build(self, index: int):
+        if not self._built[index]:
+            self._items[index] = self._factory(self._items[index])
+            self._built[index] = 1
+        return self._items[index]
+
+    def __replace(self, index: slice, values: list) -> None:
+        self._items[index] = values
+        built = list(self._built)
+        built[index] = [0] * len(values)
+        self._built = bytearray(built)
+
+
+class RemoteSequence(LazySequence):
+    """LazySequence whose raw items are IDs of remote resources, fetched by the find function
+    on their first access. While iterating, up to prefetch of the next items are fetched in
+    background so that the following accesses don't wait for the server"""
+
+    def __init__(self, ids: Iterable = None, find: Callable = None, prefetch: int = 0):
+        if prefetch < 0:
+            raise ValueError('prefetch must not be negative')
+
+        super().__init__(ids, find)
+        self.prefetch = prefetch
+
+    def __iter__(self):
+        if self.prefetch == 0:
+            yield from super().__iter__()
+            return
+
+        executor = ThreadPoolExecutor(max_workers=self.prefetch)
+        pending = {}
+        try:
+            for i in range(len(self._items)): # pylint: disable=consider-using-enumerate
+                for j in range(i + 1, min(i + 1 + self.prefetch, len(self._items))):
+                    if not self._built[j] and j not in pending:
+                        pending[j] = executor.submit(self._factory, self._items[j])
+
+                future = pending.pop(i, None)
+                if future is not None and not self._built[i]:
+                    self._items[i] = future.result()
+                    self._built[i] = 1
+                yield self[i]
+        finally:
+            # Ao interromper a iteração, as buscas que ainda não começaram são canceladas
+            # e os resultados das que já terminaram são mantidos
+            executor.shutdown(wait=True, cancel_futures=True)
+            for j, future in pending.items():
+                if not future.cancelled() and future.exception() is None and not self._built[j]:
+                    self._items[j] = future.result()
+                    self._built[j] = 1
@@ -0,0 +1,344 @@
+"""This module contains the LocalStore class, a local SQLite mirror of Movements and Sessions"""
+
+# Copyright © 2023-2024 Tiago Trotta
+
+# This file is part of Python ReBase.
+
+# Python ReBase is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Python ReBase is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Python ReBase.  If not, see <https://www.gnu.org/licenses/>
+
+from json import dumps, loads
+import os
+import sqlite3
+from threading import Lock
+from typing import Iterable
+
+from .api_response import APIResponse
+from .lazy_sequence import LazySequence, RemoteSequence
+from .missing_attribute_error import MissingAttributeError
+from .movement import Movement
+from .movement_file import typecode_of
+from .session import Session
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS movements (
+    id TEXT PRIMARY KEY,
+    professional_id TEXT,
+    patient_id TEXT,
+    label TEXT,
+    session_id TEXT,
+    update_date TEXT,
+    properties TEXT NOT NULL,
+    dtype TEXT NOT NULL,
+    registers BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS movements_professional_id ON movements (professional_id, id);
+CREATE INDEX IF NOT EXISTS movements_patient_id ON movements (patient_id, id);
+CREATE INDEX IF NOT EXISTS movements_label ON movements (label, id);
+CREATE INDEX IF NOT EXISTS movements_session_id ON movements (session_id, id);
+CREATE TABLE IF NOT EXISTS movement_articulations (
+    articulation TEXT NOT NULL,
+    movement_id TEXT NOT NULL,
+    PRIMARY KEY (articulation, movement_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS movement_articulations_movement_id ON movement_articulations (movement_id);
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    professional_id TEXT,
+    patient_id TEXT,
+    update_date TEXT,
+    properties TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_professional_id ON sessions (professional_id, id);
+CREATE INDEX IF NOT EXISTS sessions_patient_id ON sessions (patient_id, id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+'''
+
+class LocalStore:
+    """Thread-safe local mirror of Movements and Sessions in a SQLite database. The metadata is
+    indexed by professional, patient, label, Session and articulations, and the Registers are
+    stored as blocks of floats (see Movement.to_bytes). fetch_movements and fetch_sessions accept
+    the filters of ReBaseClient and answer them locally. Registers are read only when a Movement
+    of a result is first accessed"""
+
+    def __init__(self, path: str | os.PathLike = ':memory:', dtype: str = 'float64'):
+        """Opens (or creates) the database at path. Registers are stored with the given dtype,
+        'float64' or 'float32', which halves their size at the cost of precision"""
+
+        typecode_of(dtype)
+
+        self.path = path
+        self.dtype = dtype
+        self.__lock = Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        with self.__lock, self.__connection:
+            self.__connection.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self) -> None:
+        """Closes the database. Before closing, SQLite updates the statistics used to choose indexes"""
+
+        with self.__lock:
+            self.__connection.execute('PRAGMA optimize')
+            self.__connection.close()
+
+    def put_movement(self, movement: Movement) -> None:
+        """Inserts the Movement, or replaces the stored Movement with the same ID"""
+
+        self.put_movements([movement])
+
+    def put_movements(self, movements: Iterable[Movement]) -> None:
+        """Inserts or replaces many Movements in a single transaction"""
+
+        rows = [self.__movement_row(movement) for movement in movements]
+        with self.__lock, self.__connection:
+            self.__write_movements(rows)
+
+    def put_session(self, session: Session) -> None:
+        """Inserts the Session, or replaces the stored Session with the same ID"""
+
+        self.put_sessions([session])
+
+    def put_sessions(self, sessions: Iterable[Session]) -> None:
+        """Inserts or replaces many Sessions in a single transaction. The Movements already
+        present in each Session (as in deep fetches) are stored too, without fetching the
+        ones that a Session would request from the server"""
+
+        session_rows = []
+        movement_rows = []
+        for session in sessions:
+            if session.id is None: raise MissingAttributeError('session id')
+
+            movements = self.__loaded_movements(session)
+            properties = session.to_dict(exclude=['movements'])
+            if 'movementIds' not in properties and len(movements) > 0:
+                properties['movementIds'] = [movement.id for movement in movements]
+
+            session_rows.append((session.id, session.professional_id, session.patient_id, session.update_date, dumps(properties)))
+            movement_rows.extend(self.__movement_row(movement, session.id) for movement in movements)
+
+        with self.__lock, self.__connection:
+            self.__connection.executemany('INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?)', session_rows)
+            self.__write_movements(movement_rows)
+
+    def get_movement(self, movement_id: str) -> Movement | None:
+        """Returns the stored Movement with the given ID, or None if there is none"""
+
+        with self.__lock:
+            row = self.__connection.execute('SELECT properties, dtype, registers FROM movements WHERE id = ?', (movement_id,)).fetchone()
+        return Movement.from_bytes(row[2], loads(row[0]), row[1], trusted=True) if row is not None else None
+
+    def get_session(self, session_id: str, deep: bool = False) -> Session | None:
+        """Returns the stored Session with the given ID, or None if there is none. With deep=True,
+        its stored Movements are included"""
+
+        with self.__lock:
+            row = self.__connection.execute('SELECT id, properties FROM sessions WHERE id = ?', (session_id,)).fetchone()
+        return self.__build_session(row, deep, '', None) if row is not None else None
+
+    def delete_movement(self, movement_id: str) -> None:
+        """Removes the Movement with the given ID, if it is stored"""
+
+        self.delete_movements([movement_id])
+
+    def delete_movements(self, movement_ids: Iterable[str]) -> None:
+        """Removes the Movements with the given IDs in a single transaction"""
+
+        rows = [(movement_id,) for movement_id in movement_ids]
+        with self.__lock, self.__connection:
+            self.__connection.executemany('DELETE FROM movements WHERE id = ?', rows)
+            self.__connection.executemany('DELETE FROM movement_articulations WHERE movement_id = ?', rows)
+
+    def delete_session(self, session_id: str) -> None:
+        """Removes the Session with the given ID, if it is stored. Its Movements are kept"""
+
+        self.delete_sessions([session_id])
+
+    def delete_sessions(self, session_ids: Iterable[str]) -> None:
+        """Removes the Sessions with the given IDs in a single transaction. Their Movements are kept"""
+
+        with self.__lock, self.__connection:
+            self.__connection.executemany('DELETE FROM sessions WHERE id = ?', [(session_id,) for session_id in session_ids])
+
+    def movement_ids(self, professional_id: str = '', patient_id: str = '', previous_id: str = '', last_id: str = None) -> list[str]:
+        """Returns the IDs of the stored Movements that match the filters, in order. Only IDs greater
+        than previous_id and, if last_id is given, not greater than last_id are returned"""
+
+        return [row[0] for row in self.__ids('movements', professional_id, patient_id, previous_id, last_id)]
+
+    def session_ids(self, professional_id: str = '', patient_id: str = '', previous_id: str = '', last_id: str = None) -> list[str]:
+        """Returns the IDs of the stored Sessions that match the filters, like movement_ids"""
+
+        return [row[0] for row in self.__ids('sessions', professional_id, patient_id, previous_id, last_id)]
+
+    def movement_update_dates(self, professional_id: str = '', patient_id: str = '', previous_id: str = '', last_id: str = None) -> dict[str, str]:
+        """Returns a dictionary that maps the ID of each stored Movement that matches the filters,
+        as in movement_ids, to its updateDate"""
+
+        return dict(self.__ids('movements', professional_id, patient_id, previous_id, last_id, 'id, update_date'))
+
+    def session_update_dates(self, professional_id: str = '', patient_id: str = '', previous_id: str = '', last_id: str = None) -> dict[str, str]:
+        """Returns a dictionary that maps the ID of each stored Session that matches the filters,
+        as in session_ids, to its updateDate"""
+
+        return dict(self.__ids('sessions', professional_id, patient_id, previous_id, last_id, 'id, update_date'))
+
+    def get_sync_state(self, key: str) -> dict | None:
+        """Returns the state stored by set_sync_state with the given key, or None"""
+
+        with self.__lock:
+            row = self.__connection.execute('SELECT state FROM sync_state WHERE key = ?', (key,)).fetchone()
+        return loads(row[0]) if row is not None else None
+
+    def set_sync_state(self, key: str, state: dict) -> None:
+        """Stores a json serializable state with the given key, such as the progress of a
+        synchronization (see sync_engine). A None state removes the key"""
+
+        with self.__lock, self.__connection:
+            if state is None:
+                self.__connection.execute('DELETE FROM sync_state WHERE key = ?', (key,))
+            else:
+                self.__connection.execute('INSERT OR REPLACE INTO sync_state VALUES (?, ?)', (key, dumps(state)))
+
+    def fetch_movements(self, professional_id: str = '', patient_id: str = '', movement_label: str = '', articulations: list = None, legacy: bool = False, page: int = 0, per: int = 0, previous_id: str = '') -> APIResponse:
+        """Gets the stored Movements that match the filters, with the same parameters and pagination
+        as ReBaseClient.fetch_movements. A Movement matches the articulations filter if it has
+        every articulation in the list. The legacy format is not stored, so legacy must be False"""
+
+        self.__reject_legacy(legacy)
+        conditions, params = self.__movement_filters(articulations, professional_id=professional_id, patient_id=patient_id, label=movement_label)
+        rows, meta = self.__select_page('movements', 'id, properties', conditions, params, page, per, previous_id)
+        movements = LazySequence(rows, self.__build_movement)
+        return APIResponse(APIResponse.ResponseType.FETCH_MOVEMENTS, data={ 'movements': movements }, meta=meta)
+
+    def fetch_sessions(self, professional_id: str = '', patient_id: str = '', movement_label: str = '', articulations: list = None, legacy: bool = False, deep: bool = False, page: int = 0, per: int = 0, previous_id: str = '') -> APIResponse:
+        """Gets the stored Sessions that match the filters, with the same parameters and pagination
+        as ReBaseClient.fetch_sessions. With deep=True, each Session includes its stored Movements
+        that match movement_label and articulations. The legacy format is not stored, so legacy must be False"""
+
+        self.__reject_legacy(legacy)
+        conditions, params = self.__equality_filters(professional_id=professional_id, patient_id=patient_id)
+        rows, meta = self.__select_page('sessions', 'id, properties', conditions, params, page, per, previous_id)
+        sessions = LazySequence(rows, lambda row: self.__build_session(row, deep, movement_label, articulations))
+        return APIResponse(APIResponse.ResponseType.FETCH_SESSIONS, data={ 'sessions': sessions }, meta=meta)
+
+    def __reject_legacy(self, legacy: bool) -> None:
+        if legacy:
+            raise ValueError('Local stores keep Movements and Sessions only in the current format')
+
+    # Filtros vazios são ignorados, como nos parâmetros enviados ao servidor
+    def __equality_filters(self, **columns) -> tuple:
+        columns = { column: value for column, value in columns.items() if value }
+        return [f'{column} = ?' for column in columns], list(columns.values())
+
+    def __movement_filters(self, articulations: list, **columns) -> tuple:
+        conditions, params = self.__equality_filters(**columns)
+        if not articulations: return conditions, params
+
+        # O Movimento precisa ter todas as articulações do filtro. Com outros filtros, que usam os
+        # índices das colunas, cada Movimento encontrado é verificado; sem eles, os Movimentos são
+        # agrupados a partir do índice de articulações
+        articulations = list(dict.fromkeys(articulations))
+        if len(conditions) > 0:
+            conditions.extend(['EXISTS (SELECT 1 FROM movement_articulations WHERE articulation = ? AND movement_id = movements.id)'] * len(articulations))
+        else:
+            conditions.append('id IN (SELECT movement_id FROM movement_articulations WHERE articulation IN '
+                              f'({", ".join("?" * len(articulations))}) GROUP BY movement_id HAVING COUNT(*) = {len(articulations)})')
+        params.extend(articulations)
+        return conditions, params
+
+    # Como no servidor, as listagens são ordenadas pelos IDs, e previous_id é o último ID da página anterior.
+    # total_count conta todos os itens que satisfazem os filtros
+    def __select_page(self, table: str, columns: str, conditions: list, params: list, page: int, per: int, previous_id: str) -> tuple:
+        page_conditions = conditions + ['id > ?'] if previous_id else conditions
+        page_params = params + [previous_id] if previous_id else params
+
+        query = f'SELECT {columns} FROM {table}{self.__where(page_conditions)} ORDER BY id'
+        if per > 0:
+            query += ' LIMIT ? OFFSET ?'
+            page_params = page_params + [per, (page - 1) * per if page > 0 and not previous_id else 0]
+
+        with self.__lock:
+            rows = self.__connection.execute(query, page_params).fetchall()
+            if per > 0 or previous_id:
+                total_count = self.__connection.execute(f'SELECT COUNT(*) FROM {table}{self.__where(conditions)}', params).fetchone()[0]
+            else:
+                total_count = len(rows)
+
+        meta = { 'total_count': total_count }
+        if per > 0:
+            meta['current_page'] = page if page > 0 else 1
+            meta['total_page_count'] = -(-total_count // per)
+        return rows, meta
+
+    def __ids(self, table: str, professional_id: str, patient_id: str, previous_id: str, last_id: str, columns: str = 'id') -> list[tuple]:
+        conditions, params = self.__equality_filters(professional_id=professional_id, patient_id=patient_id)
+        if previous_id:
+            conditions.append('id > ?')
+            params.append(previous_id)
+        if last_id is not None:
+            conditions.append('id <= ?')
+            params.append(last_id)
+
+        with self.__lock:
+            return self.__connection.execute(f'SELECT {columns} FROM {table}{self.__where(conditions)} ORDER BY id', params).fetchall()
+
+    def __where(self, conditions: list) -> str:
+        return f' WHERE {" AND ".join(conditions)}' if len(conditions) > 0 else ''
+
+    # Os Registros de cada Movimento só são lidos do banco quando ele é construído
+    def __build_movement(self, row: tuple) -> Movement:
+        movement_id, properties = row
+        with self.__lock:
+            stored = self.__connection.execute('SELECT dtype, registers FROM movements WHERE id = ?', (movement_id,)).fetchone()
+        if stored is None: return Movement(loads(properties), trusted=True)
+        return Movement.from_bytes(stored[1], loads(properties), stored[0], trusted=True)
+
+    def __build_session(self, row: tuple, deep: bool, movement_label: str, articulations: list) -> Session:
+        session_id, properties = row
+        session = Session(loads(properties), trusted=True)
+        if not deep: return session
+
+        conditions, params = self.__movement_filters(articulations, session_id=session_id, label=movement_label)
+        with self.__lock:
+            rows = self.__connection.execute(f'SELECT id, properties FROM movements{self.__where(conditions)} ORDER BY id', params).fetchall()
+        session.movements = LazySequence(rows, self.__build_movement)
+        return session
+
+    # Movimentos ainda não buscados de uma Sessão com cliente (RemoteSequence) não são buscados
+    def __loaded_movements(self, session: Session) -> list:
+        movements = session.movements
+        if isinstance(movements, RemoteSequence):
+            return [movements.raw_item(i) for i in range(len(movements)) if movements.is_built(i)]
+        return [movement for movement in movements if isinstance(movement, Movement)]
+
+    def __movement_row(self, movement: Movement, session_id: str = None) -> tuple:
+        if movement.id is None: raise MissingAttributeError('movement id')
+
+        properties = movement.to_dict(exclude=['registers'])
+        return (movement.id, movement.professional_id, movement.patient_id, movement.label, movement.session_id or session_id,
+                movement.update_date, dumps(properties), self.dtype, movement.to_bytes(self.dtype), movement.articulations or [])
+
+    def __write_movements(self, rows: list) -> None:
+        self.__connection.executemany('INSERT OR REPLACE INTO movements VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', [row[:-1] for row in rows])
+        self.__connection.executemany('DELETE FROM movement_articulations WHERE movement_id = ?', [(row[0],) for row in rows])
+        self.__connection.executemany('INSERT OR IGNORE INTO movement_articulations VALUES (?, ?)',
+                                      [(articulation, row[0]) for row in rows for articulation in row[-1]])
@@ -17,11 +17,18 @@
 # You should have received a copy of the GNU General Public License
 # along with Python ReBase.  If not, see <https://www.gnu.org/licenses/>
 
-from json import dumps
-
-from .register import Register
-from .util import is_valid_movement_field, exclude_keys_from_dict, validate_initialization_dict
+from array import array
+import sys
+
+from .articulation_schema import ArticulationSchema
+from .lazy_sequence import LazySequence
+from .register import Register, pack_values
+from .register_array import RegisterArray, np, require_numpy
+from .rotation import Rotation
+from .serializer import movement_to_json, register_dict, register_values
+from .util import MOVEMENT_FIELD_VALIDATORS, exclude_keys_from_dict, compile_field_rules, validate_compiled_dict
 from .mismatched_articulations_error import MismatchedArticulationsError
+from .movement_file import frame_rows, read_frame_rows, read_movement_header, typecode_of, write_movement_file
 
 FIELDS = { 'id': None, '_id': None, 'label': None, 'description': None, 'device': None,
           'articulations': None, 'fps': None, 'duration': None, 'numberOfRegisters': None,
@@ -29,12 +36,25 @@ FIELDS = { 'id': None, '_id': None, 'label': None, 'description': None, 'device'
           'patientId': None, 'appCode': None, 'appData': None, 'registers': None,
           'app': { 'code': None, 'data': None } }
 
+_COMPILED_FIELDS = compile_field_rules(FIELDS, MOVEMENT_FIELD_VALIDATORS)
+_FRAMES_PER_BLOCK = 4096
+
+# Mesma regra do Register: uma Rotation, ou uma lista cujos três primeiros valores são números (None vale 0)
+def _validate_rotation(value) -> None:
+    if value is None or isinstance(value, Rotation): return
+    if isinstance(value, list) and len(value) >= 3 and all(v is None or isinstance(v, (int, float)) for v in value[:3]): return
+    raise TypeError(f'Invalid object to be used as rotation (expected Rotation or list of 3 numbers): {value}')
+
 class Movement:
     """Represents a ReBase Movement"""
 
-    def __init__(self, properties_dict: dict = None):
+    def __init__(self, properties_dict: dict = None, trusted: bool = False):
+        """Creates a Movement from a dictionary. Use trusted=True only for dictionaries known to be
+        valid, such as the ones sent by the ReBase Server, to skip the field validation. The articulations
+        of the Registers are checked either way"""
+
         if properties_dict is None: properties_dict = {}
-        self.__validate_movement_dict(properties_dict)
+        if not trusted: self.__validate_movement_dict(properties_dict)
 
         self.id = properties_dict.get('id') or properties_dict.get('_id')
         self.label = properties_dict.get('label')
@@ -53,16 +73,43 @@ class Movement:
         self.app_data = properties_dict.get('appData') or properties_dict.get('app', {}).get('data')
 
         if 'registers' in properties_dict:
-            self._registers = self.__force_registers(properties_dict['registers'])
+            self._registers = self.__force_registers(properties_dict['registers'], trusted)
             if self.number_of_registers is None:
                 self.__update_data(len(self._registers))
         else:
-            self._registers = []
+            self._registers = LazySequence(factory=self.__force_register)
 
     def __str__(self):
         return str(self.to_dict())
 
-    def __get_registers(self):
+    def __getstate__(self) -> dict:
+        """Returns the state used by pickle, in which the Registers are packed in a single buffer"""
+
+        state = { key: value for key, value in self.__dict__.items() if key != '_registers' }
+        state['_registers'] = self.__pack_registers()
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        state = dict(state)
+        kind, data = state.pop('_registers')
+        self.__dict__.update(state)
+
+        if kind == 'array':
+            self._registers = RegisterArray(data, self.articulations)
+            return
+
+        # Os Registros voltam à forma bruta e só são construídos quando acessados
+        if kind in ('floats', 'values'):
+            width = 3 * len(self._schema)
+            rows = (data[i:i + width] for i in range(0, len(data), width))
+            if kind == 'values':
+                names = self._schema.names
+                rows = (dict(zip(names, (row[j:j + 3] for j in range(0, width, 3)))) for row in rows)
+            data = list(rows)
+
+        self._registers = LazySequence(data, self.__force_register)
+
+    def __get_registers(self) -> LazySequence | RegisterArray:
         return self._registers
 
     def __set_registers(self, data: list):
@@ -73,20 +120,120 @@ class Movement:
 
     registers = property(__get_registers, __set_registers)
 
+    def __get_articulations(self) -> list:
+        return list(self._schema.names) if self._schema is not None else None
+
+    def __set_articulations(self, articulations: list) -> None:
+        self._schema = ArticulationSchema.intern(articulations) if articulations is not None else None
+
+    articulations = property(__get_articulations, __set_articulations)
+
+    def __get_schema(self) -> ArticulationSchema:
+        return self._schema
+
+    schema = property(__get_schema, doc='The shared ArticulationSchema of the Movement, or None if it has no articulations')
+
     def add_register(self, register: Register) -> None:
         """Adds a Register to the register list (registers)"""
 
         if not isinstance(register, Register): register = Register(register)
 
-        if self.articulations is None and (self.number_of_registers is None or self.number_of_registers == 0):
-            self.articulations = register.articulations
+        if self._schema is None and (self.number_of_registers is None or self.number_of_registers == 0):
+            self._schema = register.schema
 
         else:
-            self.__validate_articulations(register.articulations)
+            self.__validate_schema(register.schema)
 
         self._registers.append(register)
         self.__update_data(self.number_of_registers + 1 if self.number_of_registers is not None else 1)
 
+    @classmethod
+    def from_numpy(cls, array, articulations: list, properties_dict: dict = None, trusted: bool = False) -> 'Movement': # pylint: disable=redefined-outer-name
+        """Creates a Movement whose Registers are stored in a float array of shape
+        (frames, articulations, 3), without creating Register or Rotation objects.
+        The Registers are exposed as views over the array. Requires NumPy"""
+
+        movement = cls({ **(properties_dict or {}), 'articulations': list(articulations) }, trusted)
+        movement._registers = RegisterArray(array, movement.articulations)
+        movement.__update_data(len(movement._registers))
+        return movement
+
+    def to_numpy(self, dtype=None):
+        """Returns the Registers as an array of shape (frames, articulations, 3). For Movements
+        created with from_numpy, returns the array that stores the Registers. Requires NumPy"""
+
+        require_numpy()
+        if isinstance(self._registers, RegisterArray):
+            frames = self._registers.array
+            return frames if dtype is None else frames.astype(dtype, copy=False)
+
+        # Cada linha é montada uma única vez, na ordem do esquema, e o array é remodelado ao final
+        articulations = self.articulations or []
+        rows = []
+        for i in range(len(self._registers)):
+            values = register_values(self._registers.raw_item(i), self._schema) if self._schema is not None else None
+            if values is None:
+                register = self.__register_to_dict(i)
+                values = [value for art in articulations for value in register[art]]
+            rows.append(values)
+        return np.array(rows, dtype=dtype or np.float64).reshape((len(rows), len(articulations), 3))
+
+    def save(self, path, dtype: str = 'float64') -> None:
+        """Saves the Movement to a binary movement file, which stores the metadata and the articulation
+        list followed by the frames as a single block of floats. dtype may be 'float64' or 'float32',
+        which halves the file size at the cost of precision"""
+
+        typecode = typecode_of(dtype)
+        write_movement_file(path, self.to_dict(exclude=['registers']), len(self._registers), self.__frame_blocks(typecode), dtype)
+
+    @classmethod
+    def load(cls, path, mmap: bool = True) -> 'Movement':
+        """Loads a Movement saved with save. With NumPy and mmap=True, the frames are mapped from
+        the file and only read when accessed, so opening even a very large file is instant. Changes
+        to the Registers are kept in memory and never written to the file. Without NumPy, the
+        frames are always read, and each Register is built when accessed"""
+
+        header = read_movement_header(path)
+        movement = cls(header.properties, trusted=True)
+        if header.nbytes == 0: return movement
+
+        if np is None:
+            movement.__attach_frames(read_frame_rows(path, header))
+            return movement
+
+        dtype = np.dtype(f'<f{header.itemsize}')
+        shape = (header.frames, len(header.articulations), 3)
+        if mmap:
+            frames = np.memmap(path, dtype, 'c', header.offset, shape)
+        else:
+            frames = np.fromfile(path, dtype, header.nbytes // header.itemsize, offset=header.offset).reshape(shape)
+        movement.__attach_frames(frames)
+        return movement
+
+    def to_bytes(self, dtype: str = 'float64') -> bytes:
+        """Returns the Registers as a single block of little-endian floats, in the layout
+        (frames, articulations, 3) used by movement files. dtype may be 'float64' or 'float32'"""
+
+        return b''.join(memoryview(block).cast('B') for block in self.__frame_blocks(typecode_of(dtype)))
+
+    @classmethod
+    def from_bytes(cls, data: bytes, properties_dict: dict, dtype: str = 'float64', trusted: bool = False) -> 'Movement':
+        """Creates a Movement from Registers returned by to_bytes and a dictionary with its other
+        properties, which must include the articulations. With NumPy, the Registers are stored in
+        a RegisterArray; without it, each Register is built when accessed"""
+
+        typecode = typecode_of(dtype)
+        movement = cls(properties_dict, trusted)
+        if len(data) == 0: return movement
+
+        articulation_count = len(movement.articulations or [])
+        if np is None:
+            movement.__attach_frames(frame_rows(data, typecode, articulation_count))
+        else:
+            frames = np.frombuffer(bytearray(data), np.dtype(typecode).newbyteorder('<'))
+            movement.__attach_frames(frames.reshape((-1, articulation_count, 3)))
+        return movement
+
     def to_dict(self, exclude: list = None) -> dict:
         """Converts the Movement to a dictionary. Receives a list of attributes to be ignored"""
 
@@ -109,8 +256,12 @@ class Movement:
         if self.app_code is not None: dictionary['app']['code'] = self.app_code
         if self.app_data is not None: dictionary['app']['data'] = self.app_data
 
-        if self.registers is not None and len(self.registers) > 0:
-            dictionary['registers'] = [register.to_dict() for register in self.registers]
+        # Os Registros só são convertidos se não forem excluídos
+        if exclude is None or 'registers' not in exclude:
+            if isinstance(self._registers, RegisterArray) and len(self._registers) > 0:
+                dictionary['registers'] = self._registers.to_dicts()
+            elif self.registers is not None and len(self.registers) > 0:
+                dictionary['registers'] = [self.__register_to_dict(i) for i in range(len(self._registers))]
 
         exclude_keys_from_dict(dictionary, exclude)
 
@@ -120,23 +271,93 @@ class Movement:
         """Converts the Movement to a json as expected by the ReBase Server.
         Receives a boolean that indicates wether the json will be used for an update"""
 
-        exclude = ['id', 'insertionDate', 'updateDate', 'professionalId', 'patientId',
-                   'articulations']
-        if update: exclude += ['numberOfRegisters', 'duration', 'registers']
+        return movement_to_json(self, update)
 
-        return dumps({ 'movement': self.to_dict(exclude=exclude) })
-
-    def __force_registers(self, data: list) -> list:
-        array = []
+    # Os Registros são mantidos na forma recebida e só são convertidos para Register quando acessados,
+    # mas as rotações de dicionários não confiáveis são verificadas aqui, como faria o Register
+    def __force_registers(self, data: list, trusted: bool = False) -> LazySequence:
         for register in data:
-            r = register if isinstance(register, Register) else Register(register)
-            if self.articulations is None:
-                self.articulations = r.articulations
-            else:
-                self.__validate_articulations(r.articulations)
-            array.append(r)
-
-        return array
+            if isinstance(register, Register):
+                if self._schema is None: self._schema = register.schema
+                else: self.__validate_schema(register.schema)
+                continue
+            # Linhas empacotadas já seguem a ordem do esquema
+            if isinstance(register, array) and self._schema is not None: continue
+
+            # Registros ainda não decodificados são comparados pelas chaves, sem criar objetos
+            names = tuple(register)
+            if self._schema is None:
+                self._schema = ArticulationSchema.intern(names)
+            elif names != self._schema.names:
+                raise MismatchedArticulationsError(self.articulations, list(names))
+
+            if not trusted and isinstance(register, dict):
+                for rotation in register.values(): _validate_rotation(rotation)
+
+        return LazySequence(data, self.__force_register)
+
+    def __force_register(self, register: Register | dict | list | array) -> Register:
+        if isinstance(register, Register):
+            return register
+        # Registros empacotados chegam como linhas planas de floats, na ordem do esquema
+        if isinstance(register, array) and self._schema is not None:
+            return Register.from_list(self._schema, register)
+        # A ordem dos valores só é confiável quando as chaves coincidem exatamente com o esquema
+        if isinstance(register, dict) and self._schema is not None and tuple(register) == self._schema.names:
+            return Register.from_rotations(self._schema, list(register.values()))
+
+        register = Register(register)
+        if self._schema is not None: self.__validate_schema(register.schema)
+        return register
+
+    def __register_to_dict(self, index: int) -> dict:
+        return register_dict(self._registers.raw_item(index), self._schema)
+
+    # Os Registros são empacotados em um único buffer quando todos seguem o esquema do Movimento
+    def __pack_registers(self) -> tuple:
+        if isinstance(self._registers, RegisterArray):
+            return 'array', self._registers.array
+
+        if self._schema is None or len(self._schema) == 0 or len(self._registers) == 0:
+            return 'items', [self._registers.raw_item(i) for i in range(len(self._registers))]
+
+        values = []
+        for i in range(len(self._registers)):
+            register = register_values(self._registers.raw_item(i), self._schema)
+            if register is None or len(register) != 3 * len(self._schema):
+                return 'items', [self._registers.raw_item(i) for i in range(len(self._registers))]
+            values.extend(register)
+
+        values = pack_values(values)
+        return 'floats' if isinstance(values, array) else 'values', values
+
+    # Os quadros são gravados em blocos de floats little-endian, sem montar uma cópia de todos os valores do Movimento
+    def __frame_blocks(self, typecode: str):
+        if isinstance(self._registers, RegisterArray):
+            frames = self._registers.array.astype(np.dtype(typecode).newbyteorder('<'), copy=False)
+            for start in range(0, len(frames), _FRAMES_PER_BLOCK):
+                yield np.ascontiguousarray(frames[start:start + _FRAMES_PER_BLOCK])
+            return
+
+        for start in range(0, len(self._registers), _FRAMES_PER_BLOCK):
+            block = array(typecode)
+            for i in range(start, min(start + _FRAMES_PER_BLOCK, len(self._registers))):
+                values = register_values(self._registers.raw_item(i), self._schema)
+                if values is None or None in values:
+                    register = self.__force_register(self._registers.raw_item(i))
+                    self.__validate_schema(register.schema)
+                    values = register.to_list()
+                block.extend(values)
+            if sys.byteorder == 'big': block.byteswap()
+            yield block
+
+    # Os quadros lidos de um arquivo ou de bytes chegam como um array NumPy ou como linhas empacotadas
+    def __attach_frames(self, frames) -> None: # pylint: disable=unused-private-member
+        if isinstance(frames, list):
+            self._registers = LazySequence(frames, self.__force_register)
+        else:
+            self._registers = RegisterArray(frames, self.articulations)
+        if self.number_of_registers is None: self.__update_data(len(self._registers))
 
     # Atualiza os valores de number_of_registers e duration
     def __update_data(self, number_of_registers: int = 0) -> None:
@@ -144,23 +365,10 @@ class Movement:
         if self.fps is not None and self.fps != 0:
             self.duration = self.number_of_registers / self.fps
 
-    def __validate_articulations(self, articulations: list) -> None:
-        if not self.__compare_articulation_lists(self.articulations, articulations):
-            raise MismatchedArticulationsError(self.articulations, articulations)
-
-    def __compare_articulation_lists(self, list_a: list, list_b: list) -> bool:
-        if (list_a is None and list_b is not None) or (list_a is not None and list_b is None):
-            return False
-
-        length = len(list_a)
-        if length != len(list_b):
-            return False
-
-        for i in range(length):
-            if list_a[i] != list_b[i]:
-                return False
-
-        return True
+    # Como os esquemas são compartilhados, basta comparar suas identidades
+    def __validate_schema(self, schema: ArticulationSchema) -> None:
+        if schema is not self._schema:
+            raise MismatchedArticulationsError(self.articulations, list(schema.names))
 
     def __validate_movement_dict(self, dictionary: dict) -> None:
-        validate_initialization_dict(is_valid_movement_field, 'Movement', FIELDS, dictionary)
+        validate_compiled_dict('Movement', _COMPILED_FIELDS, dictionary)
@@ -0,0 +1,119 @@
+"""This module reads and writes the binary movement file format used by Movement.save and Movement.load"""
+
+# Copyright © 2023-2024 Tiago Trotta
+
+# This file is part of Python ReBase.
+
+# Python ReBase is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Python ReBase is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Python ReBase.  If not, see <https://www.gnu.org/licenses/>
+
+from array import array
+from json import dumps, loads
+import os
+import struct
+import sys
+from typing import Iterable
+
+MAGIC = b'RBMV'
+VERSION = 1
+DTYPES = { 'float64': 'd', 'float32': 'f' }
+
+# Um arquivo tem um cabeçalho fixo, os metadados do Movimento (incluindo as articulações) em json e
+# um bloco com os valores x, y e z de cada articulação de cada quadro, em floats little-endian.
+# Cabeçalho: assinatura, versão, bytes por valor, reservado, tamanho dos metadados e quantidade de quadros
+_HEADER = struct.Struct('<4sBBHIQ')
+# O bloco de quadros começa em um múltiplo de 64 bytes, para que possa ser mapeado diretamente como array
+_ALIGNMENT = 64
+
+class MovementFileHeader: # pylint: disable=too-few-public-methods
+    """The header of a movement file: the Movement's metadata, the number of frames
+    and the position and layout of the frame block"""
+
+    __slots__ = ('properties', 'frames', 'itemsize', 'offset')
+
+    def __init__(self, properties: dict, frames: int, itemsize: int, offset: int):
+        self.properties = properties
+        self.frames = frames
+        self.itemsize = itemsize
+        self.offset = offset
+
+    def __get_articulations(self) -> list:
+        return self.properties.get('articulations') or []
+
+    def __get_typecode(self) -> str:
+        return 'd' if self.itemsize == 8 else 'f'
+
+    def __get_nbytes(self) -> int:
+        return self.frames * len(self.articulations) * 3 * self.itemsize
+
+    articulations = property(__get_articulations)
+    typecode = property(__get_typecode, doc='The array typecode of the values')
+    nbytes = property(__get_nbytes, doc='The size, in bytes, of the frame block')
+
+def typecode_of(dtype: str) -> str:
+    """Returns the array typecode of a dtype name ('float64' or 'float32')"""
+
+    if dtype not in DTYPES:
+        raise ValueError(f'dtype must be one of {tuple(DTYPES)}')
+    return DTYPES[dtype]
+
+def write_movement_file(path: str | os.PathLike, properties: dict, frames: int, blocks: Iterable, dtype: str = 'float64') -> None:
+    """Writes a movement file. blocks are buffers (such as arrays) with the values of consecutive
+    frames, as little-endian floats of the type given by dtype"""
+
+    typecode = typecode_of(dtype)
+    metadata = dumps(properties).encode('utf-8')
+    offset = -(-(_HEADER.size + len(metadata)) // _ALIGNMENT) * _ALIGNMENT
+
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, array(typecode).itemsize, 0, len(metadata), frames))
+        file.write(metadata)
+        file.write(b'\0' * (offset - _HEADER.size - len(metadata)))
+        for block in blocks:
+            file.write(block)
+
+def read_movement_header(path: str | os.PathLike) -> MovementFileHeader:
+    """Reads the header of a movement file, checking that the frame block is complete"""
+
+    with open(path, 'rb') as file:
+        fixed = file.read(_HEADER.size)
+        if len(fixed) < _HEADER.size or fixed[:4] != MAGIC:
+            raise ValueError(f'{path} is not a ReBase movement file')
+
+        _, version, itemsize, _, metadata_size, frames = _HEADER.unpack(fixed)
+        if version != VERSION or itemsize not in (4, 8):
+            raise ValueError(f'Unsupported movement file version {version} in {path}')
+
+        properties = loads(file.read(metadata_size).decode('utf-8'))
+
+    offset = -(-(_HEADER.size + metadata_size) // _ALIGNMENT) * _ALIGNMENT
+    header = MovementFileHeader(properties, frames, itemsize, offset)
+    if os.path.getsize(path) < offset + header.nbytes:
+        raise ValueError(f'The movement file {path} is truncated')
+    return header
+
+def read_frame_rows(path: str | os.PathLike, header: MovementFileHeader) -> list:
+    """Reads the frame block of a movement file as a list with one array of values per frame"""
+
+    with open(path, 'rb') as file:
+        file.seek(header.offset)
+        return frame_rows(file.read(header.nbytes), header.typecode, len(header.articulations))
+
+def frame_rows(data: bytes, typecode: str, articulation_count: int) -> list:
+    """Splits a block of little-endian floats into a list with one array of values per frame"""
+
+    values = array(typecode, data)
+    if sys.byteorder == 'big': values.byteswap()
+
+    width = 3 * articulation_count
+    return [values[i:i + width] for i in range(0, len(values), width)]
@@ -0,0 +1,184 @@
+"""Module that decodes large lists of Movements and Sessions in a process pool"""
+
+# Copyright © 2023-2024 Tiago Trotta
+
+# This file is part of Python ReBase.
+
+# Python ReBase is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Python ReBase is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Python ReBase.  If not, see <https://www.gnu.org/licenses/>
+
+from array import array
+from concurrent.futures import Executor
+from itertools import chain
+from json import dumps, loads
+import re
+
+from .movement import Movement
+from .register_array import np
+from .session import Session
+
+# Objetos cujos valores são apenas listas de números, como os Registros, são reconhecidos por um único token,
+# de forma que o custo da busca é proporcional ao número de Registros e não ao de valores
+_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+_FLAT_LIST = rb'\[[-+0-9.eE,\s]*\]'
+_MEMBER = _STRING + rb'\s*:\s*' + _FLAT_LIST
+_FLAT_OBJECT = rb'\{\s*' + _MEMBER + rb'(?:\s*,\s*' + _MEMBER + rb')*\s*\}'
+_TOKEN = re.compile(_FLAT_OBJECT + rb'|' + _STRING + rb'|' + _FLAT_LIST + rb'|[\[\]{}]')
+_OPENING = frozenset(b'[{')
+_SEPARATORS = b' \t\n\r,'
+
+def split_items(body: bytes, key: str) -> tuple:
+    """Finds, without decoding, the list stored in the given key of the json object body.
+    Returns the body with that list emptied and the raw json of each of its items,
+    or None if the body doesn't have a list of objects in that key"""
+
+    name = dumps(key).encode('utf-8')
+    depth = 0
+    found_key = False
+    list_start = list_depth = None
+    items = []
+    item_start = None
+
+    for match in _TOKEN.finditer(body):
+        start, end = match.span()
+        char = body[start]
+
+        if list_depth is not None and depth == list_depth:
+            # Cada item deve ser um objeto, separado do anterior apenas por espaços e vírgulas
+            gap_start = items[-1][1] if items else list_start + 1
+            if body[gap_start:start].strip(_SEPARATORS):
+                return None
+            if char == ord(']'):
+                return body[:list_start + 1] + body[start:], [body[s:e] for s, e in items]
+            if char != ord('{'):
+                return None
+            if end - start > 1:
+                items.append((start, end))
+                continue
+            item_start = start
+
+        if end - start == 1 and char in _OPENING:
+            if found_key and char == ord('[') and depth == 1:
+                list_start, list_depth = start, 2
+            depth += 1
+        elif end - start == 1:
+            depth -= 1
+            if list_depth is not None and depth == list_depth:
+                items.append((item_start, end))
+
+        found_key = list_depth is None and depth == 1 and body[start:end] == name
+
+    return None
+
+def pack_movement(dictionary: dict) -> tuple:
+    """Converts a decoded Movement dictionary to the compact (properties, frames) form, in which
+    the Registers are a flat float64 array with the x, y and z values of each articulation, in
+    schema order. frames is None if the Movement has no Registers or if they can't be packed, in
+    which case the Movement is built from the dictionary with the usual articulation checks"""
+
+    registers = dictionary.get('registers')
+    if not registers or not isinstance(registers[0], dict):
+        return dictionary, None
+
+    names = tuple(dictionary.get('articulations') or registers[0])
+    if len(names) == 0:
+        return dictionary, None
+
+    # Só são empacotados Registros com exatamente as articulações do esquema, na mesma ordem, e rotações com três valores
+    for register in registers:
+        if not isinstance(register, dict) or tuple(register) != names:
+            return dictionary, None
+        for rotation in register.values():
+            if not isinstance(rotation, list) or len(rotation) != 3:
+                return dictionary, None
+
+    try:
+        frames = array('d', chain.from_iterable(chain.from_iterable(register.values() for register in registers)))
+    except TypeError:
+        return dictionary, None
+
+    properties = { key: value for key, value in dictionary.items() if key != 'registers' }
+    properties['articulations'] = list(names)
+    return properties, frames
+
+def unpack_movement(packed: tuple) -> Movement:
+    """Builds a Movement from the form returned by pack_movement. With NumPy, the Registers are
+    stored in a RegisterArray over the packed frames, otherwise each packed row is only
+    converted to a Register when it is accessed"""
+
+    properties, frames = packed
+    if frames is None:
+        return Movement(properties, trusted=True)
+
+    articulations = properties['articulations']
+    if np is None:
+        width = 3 * len(articulations)
+        return Movement({ **properties, 'registers': [frames[i:i + width] for i in range(0, len(frames), width)] }, trusted=True)
+
+    movement = Movement.from_numpy(np.frombuffer(frames).reshape((-1, len(articulations), 3)), articulations, properties, trusted=True)
+    # Como no construtor, os valores enviados pelo servidor só são recalculados se numberOfRegisters estiver ausente
+    if properties.get('numberOfRegisters') is not None:
+        movement.number_of_registers = properties['numberOfRegisters']
+        movement.duration = properties.get('duration')
+    return movement
+
+def pack_session(dictionary: dict) -> dict:
+    """Packs each Movement of a decoded Session dictionary with pack_movement"""
+
+    movements = dictionary.get('movements')
+    if movements:
+        dictionary['movements'] = [pack_movement(movement) if isinstance(movement, dict) else movement for movement in movements]
+    return dictionary
+
+def unpack_session(packed: dict) -> Session:
+    """Builds a Session from the form returned by pack_session"""
+
+    movements = packed.get('movements')
+    if movements:
+        packed['movements'] = [unpack_movement(movement) if isinstance(movement, tuple) else movement for movement in movements]
+    return Session(packed, trusted=True)
+
+_CODECS = { 'movements': (pack_movement, unpack_movement), 'sessions': (pack_session, unpack_session) }
+
+def _decode_items(key: str, items: list) -> list:
+    pack = _CODECS[key][0]
+    return [pack(loads(item)) for item in items]
+
+def decode_parallel(body: bytes, key: str, executor: Executor, chunks: int) -> dict:
+    """Decodes a response body whose key ('movements' or 'sessions') has a list of objects. The list
+    is split in up to chunks parts, which are decoded and packed by the executor's processes and
+    built in the calling process. Returns None if the body doesn't have a list in that key"""
+
+    split = split_items(body, key)
+    if split is None:
+        return None
+
+    skeleton, items = split
+    data = loads(skeleton)
+    if len(items) == 0:
+        return data
+
+    # As partes têm tamanhos semelhantes em bytes, e não em número de itens
+    target = sum(len(item) for item in items) / chunks
+    groups, group, size = [], [], 0
+    for item in items:
+        group.append(item)
+        size += len(item)
+        if size >= target:
+            groups.append(group)
+            group, size = [], 0
+    if group: groups.append(group)
+
+    unpack = _CODECS[key][1]
+    data[key] = [unpack(packed) for result in executor.map(_decode_items, [key] * len(groups), groups) for packed in result]
+    return data
@@ -17,14 +17,28 @@
 # You should have received a copy of the GNU General Public License
 # along with Python ReBase.  If not, see <https://www.gnu.org/licenses/>
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from enum import Enum
+from itertools import chain
+from json import loads
+from threading import Event, Lock
+from typing import Iterable, Iterator
 import requests
+from requests.adapters import HTTPAdapter
 
 from .missing_attribute_error import MissingAttributeError
+from .failed_request_error import FailedRequestError
 from .unauthorized_user_error import UnauthorizedUserError
 from .api_response import APIResponse
 from .movement import Movement
 from .session import Session
+from .lazy_sequence import LazySequence
+from .util import ordered_map
+from .json_stream import iter_array_items
+from .serializer import iter_movement_json, iter_session_json
+from .compression import ENCODINGS, CompressionStats, compress_body, iter_compressed
+from .response_cache import ResponseCache
+from .parallel_decode import decode_parallel
 
 _SERVER_URL = "http://projetorastreamento.com.br:3030/"
 
@@ -39,28 +53,141 @@ class _Method(Enum):
     PUT = 2
     DELETE = 3
 
-class ReBaseClient:
-    """Class that provides methods for sending requests to the ReBaseRS"""
+class _Flight: # pylint: disable=too-few-public-methods
+    """A GET request in progress, whose result is shared by every identical request made meanwhile"""
 
-    def __init__(self, user_email: str, user_token: str, try_authenticate: bool = False):
+    __slots__ = ('done', 'result', 'generation')
+
+    def __init__(self, generation: int = None):
+        self.done = Event()
+        self.result = (None, None, 'The shared request did not complete')
+        self.generation = generation
+
+_STREAM_CHUNK_SIZE = 64 * 1024
+_JSON_HEADERS = { 'Content-Type': 'application/json' }
+_METHOD_NAMES = { _Method.GET: 'GET', _Method.POST: 'POST', _Method.PUT: 'PUT', _Method.DELETE: 'DELETE' }
+_PARALLEL_KEYS = { APIResponse.ResponseType.FETCH_MOVEMENTS: 'movements', APIResponse.ResponseType.FETCH_SESSIONS: 'sessions' }
+
+class ReBaseClient: # pylint: disable=too-many-public-methods
+    """Class that provides methods for sending requests to the ReBaseRS.
+    The client keeps a pool of persistent connections, which should be released
+    with close() or by using the client as a context manager"""
+
+    def __init__(self, user_email: str, user_token: str, try_authenticate: bool = False, # pylint: disable=too-many-locals
+                 server_url: str = _SERVER_URL, pool_connections: int = 10, pool_maxsize: int = 10,
+                 pool_block: bool = False, timeout: float = 30, chunked_uploads: bool = False,
+                 compression: str = None, compression_threshold: int = 1024, cache_entries: int = 0,
+                 cache_bytes: int = 64 * 2 ** 20, cache_ttl: float = 60, coalesce_requests: bool = True,
+                 decode_processes: int = 0, decode_threshold: int = 8 * 2 ** 20):
         if user_email is None or not isinstance(user_email, str):
             raise ValueError('user_email must be provided and be a string')
         if user_token is None or not isinstance(user_token, str):
             raise ValueError('user_token must be provided and be a string')
-
-        self.user_email = user_email
-        self.user_token = user_token
+        if pool_connections < 1 or pool_maxsize < 1:
+            raise ValueError('pool_connections and pool_maxsize must be greater than zero')
+        if compression is not None and compression not in ENCODINGS:
+            raise ValueError(f'compression must be None or one of {ENCODINGS}')
+        if decode_processes < 0:
+            raise ValueError('decode_processes must not be negative')
+
+        self.server_url = server_url if server_url.endswith('/') else server_url + '/'
+        self.timeout = timeout
+        self.chunked_uploads = chunked_uploads
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+        self.compression_stats = CompressionStats()
+        self.cache = ResponseCache(cache_entries, cache_bytes, cache_ttl) if cache_entries > 0 else None
+        self.coalesce_requests = coalesce_requests
+        self.coalesced_requests = 0
+        self.decode_processes = decode_processes
+        self.decode_threshold = decode_threshold
+        self.__decoder_lock = Lock()
+        self.__decoder = None
+        self.__flights_lock = Lock()
+        self.__flights = {}
+        self.__pool_connections = pool_connections
+        self.__pool_maxsize = pool_maxsize
+        self.__pool_block = pool_block
+        self.__session_lock = Lock()
+        self.__session = None
+
+        self.__user_email = user_email
+        self.__user_token = user_token
 
         if try_authenticate:
             response = self.authenticate()
             if not response.success:
                 raise UnauthorizedUserError(user_mail=user_email, auth_token=user_token)
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self) -> None:
+        """Closes every pooled connection and the decoding processes. The client can still
+        be used afterwards, in which case new ones are created"""
+
+        with self.__session_lock:
+            if self.__session is not None:
+                self.__session.close()
+                self.__session = None
+
+        with self.__decoder_lock:
+            if self.__decoder is not None:
+                self.__decoder.shutdown()
+                self.__decoder = None
+
     def __get_headers(self):
         return { 'rebase-user-email': self.user_email, 'rebase-user-token': self.user_token }
 
     _authentication_headers = property(fget=__get_headers, doc='The authentication headers used in the requests')
 
+    def __get_user_email(self) -> str:
+        return self.__user_email
+
+    def __set_user_email(self, user_email: str) -> None:
+        self.__user_email = user_email
+        self.__update_session_headers()
+
+    def __get_user_token(self) -> str:
+        return self.__user_token
+
+    def __set_user_token(self, user_token: str) -> None:
+        self.__user_token = user_token
+        self.__update_session_headers()
+
+    user_email = property(__get_user_email, __set_user_email)
+    user_token = property(__get_user_token, __set_user_token)
+
+    def __get_is_closed(self) -> bool:
+        return self.__session is None
+
+    is_closed = property(__get_is_closed, doc='Wether the client currently has no open connection pool')
+
+    def __get_session(self) -> requests.Session:
+        session = self.__session
+        if session is not None:
+            return session
+
+        with self.__session_lock:
+            if self.__session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.__pool_connections, pool_maxsize=self.__pool_maxsize, pool_block=self.__pool_block)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers.update(self._authentication_headers)
+                self.__session = session
+
+            return self.__session
+
+    # Os headers de autenticação são definidos uma única vez na sessão, e não a cada requisição
+    def __update_session_headers(self) -> None:
+        with self.__session_lock:
+            if self.__session is not None:
+                self.__session.headers.update(self._authentication_headers)
+
     def authenticate(self) -> APIResponse:
         """"Authenticates the user with the user_email and user_token provided in the constructor"""
 
@@ -73,18 +200,63 @@ class ReBaseClient:
 
         return self.__send_request(_Method.GET, _Resource.MOVEMENT, APIResponse.ResponseType.FETCH_MOVEMENTS, params=self.__format_params(professionalId=professional_id, patientId=patient_id, movementLabel=movement_label, articulations=articulations, page=page, per=per, previousId=previous_id, legacy=legacy))
 
+    def iter_movements(self, professional_id: str = '', patient_id: str = '', movement_label: str = '', articulations: list = None, legacy: bool = False, per: int = 100, previous_id: str = '', prefetch: bool = True) -> Iterator[Movement]:
+        """Iterates over every Movement that matches the filters, following the previous_id cursor
+        one page of size per at a time. When prefetch is True, the next page is requested in the
+        background while the current one is consumed. Raises FailedRequestError if a page fails"""
+
+        def fetch_page(cursor: str) -> APIResponse:
+            return self.fetch_movements(professional_id, patient_id, movement_label, articulations, legacy, per=per, previous_id=cursor)
+
+        return self.__iterate_pages(fetch_page, 'movements', per, previous_id, prefetch)
+
+    def fetch_movements_parallel(self, professional_id: str = '', patient_id: str = '', movement_label: str = '', articulations: list = None, legacy: bool = False, per: int = 100, first_page: int = 1, last_page: int = None, width: int = 4) -> APIResponse:
+        """Gets the pages first_page to last_page of a Movement listing, requesting up to width
+        pages at the same time, and merges them in order into a single APIResponse. When last_page
+        is None, every page is fetched, using the total informed in the meta of the first page"""
+
+        def fetch_page(page: int) -> APIResponse:
+            return self.fetch_movements(professional_id, patient_id, movement_label, articulations, legacy, page=page, per=per)
+
+        return self.__merge_pages(self.__fetch_pages_parallel(fetch_page, per, first_page, last_page, width), 'movements')
+
+    def stream_movements(self, professional_id: str = '', patient_id: str = '', movement_label: str = '', articulations: list = None, legacy: bool = False, page: int = 0, per: int = 0, previous_id: str = '') -> Iterator[Movement]:
+        """Gets a list of Movements like fetch_movements, but decodes the response body incrementally,
+        yielding each Movement as soon as it is received. Raises FailedRequestError if the request fails"""
+
+        return self.__stream_objects(_Resource.MOVEMENT, APIResponse.ResponseType.FETCH_MOVEMENTS, self.__format_params(professionalId=professional_id, patientId=patient_id, movementLabel=movement_label, articulations=articulations, page=page, per=per, previousId=previous_id, legacy=legacy), 'movements', Movement)
+
     def find_movement(self, movement_id: str, legacy: bool = False) -> APIResponse:
         """Finds a specific Movement by ID"""
 
         if (movement_id is None or movement_id == ''):
             raise MissingAttributeError('movement id')
 
-        return self.__send_request(_Method.GET, _Resource.MOVEMENT, APIResponse.ResponseType.FIND_MOVEMENT, movement_id, self.__format_params(legacy=legacy))
+        params = self.__format_params(legacy=legacy)
+        return self.__send_request(_Method.GET, _Resource.MOVEMENT, APIResponse.ResponseType.FIND_MOVEMENT, movement_id, params, cache_key=self.__cache_key(_Resource.MOVEMENT, movement_id, params))
+
+    def find_movements(self, movement_ids: Iterable[str], legacy: bool = False, width: int = 8) -> dict[str, APIResponse]:
+        """Finds many Movements by ID, sending up to width requests at the same time. Repeated IDs
+        are requested once. Returns a dictionary that maps each ID to its APIResponse, in input
+        order. Failures are reported in the respective APIResponse"""
+
+        return self.__find_many(lambda movement_id: self.find_movement(movement_id, legacy), movement_ids, 'movement id', width)
 
     def insert_movement(self, movement: Movement) -> APIResponse:
-        """Creates a new Movement"""
+        """Creates a new Movement. When chunked_uploads is enabled, the json is sent
+        with chunked transfer encoding while it is generated"""
+
+        data, headers = self.__json_body(iter_movement_json(movement), self.chunked_uploads)
+        response = self.__send_request(_Method.POST, _Resource.MOVEMENT, APIResponse.ResponseType.INSERT_MOVEMENT, data=data, headers=headers)
+        if movement.session_id is not None: self.__invalidate(('session', movement.session_id))
+        return response
+
+    def insert_movements(self, movements: Iterable[Movement], max_in_flight: int = 8) -> list[APIResponse]:
+        """Creates many Movements, sending up to max_in_flight requests at the same time.
+        Returns one APIResponse per Movement, in input order. Failures are reported
+        in the respective APIResponse instead of interrupting the remaining inserts"""
 
-        return self.__send_request(_Method.POST, _Resource.MOVEMENT, APIResponse.ResponseType.INSERT_MOVEMENT, data=movement.to_json())
+        return list(ordered_map(lambda movement: self.__insert_safely(self.insert_movement, movement), movements, max_in_flight))
 
     def update_movement(self, movement: Movement) -> APIResponse:
         """Updates an existing Movement"""
@@ -92,7 +264,10 @@ class ReBaseClient:
         if (movement.id is None or movement.id == ''):
             raise MissingAttributeError('movement id')
 
-        return self.__send_request(_Method.PUT, _Resource.MOVEMENT, APIResponse.ResponseType.UPDATE_MOVEMENT, movement.id, data=movement.to_json(True))
+        data, headers = self.__json_body(iter_movement_json(movement, True))
+        response = self.__send_request(_Method.PUT, _Resource.MOVEMENT, APIResponse.ResponseType.UPDATE_MOVEMENT, movement.id, data=data, headers=headers)
+        self.__invalidate(('movement', movement.id), ('has-movement', movement.id))
+        return response
 
     def delete_movement(self, movement_id: str) -> APIResponse:
         """Deletes a Movement by ID"""
@@ -100,7 +275,9 @@ class ReBaseClient:
         if (movement_id is None or movement_id == ''):
             raise MissingAttributeError('movement id')
 
-        return self.__send_request(_Method.DELETE, _Resource.MOVEMENT, APIResponse.ResponseType.DELETE_MOVEMENT, movement_id)
+        response = self.__send_request(_Method.DELETE, _Resource.MOVEMENT, APIResponse.ResponseType.DELETE_MOVEMENT, movement_id)
+        self.__invalidate(('movement', movement_id), ('has-movement', movement_id))
+        return response
 
     def fetch_sessions(self, professional_id: str = "", patient_id: str = "", movement_label: str = "", articulations: list = None, legacy: bool = False, deep: bool = False, page: int = 0, per: int = 0, previous_id: str = '') -> APIResponse:
         """Gets a list of Sessions. Can be filtered by professional_id and patient_id.
@@ -110,18 +287,64 @@ class ReBaseClient:
 
         return self.__send_request(_Method.GET, _Resource.SESSION, APIResponse.ResponseType.FETCH_SESSIONS, params=self.__format_params(professionalId=professional_id, patientId=patient_id, movementLabel=movement_label, articulations=articulations, page=page, per=per, previousId=previous_id, legacy=legacy, deep=deep))
 
-    def find_session(self, session_id: str, legacy: bool = False, deep: bool = False) -> APIResponse:
-        """Finds a specific Session by ID"""
+    def iter_sessions(self, professional_id: str = "", patient_id: str = "", movement_label: str = "", articulations: list = None, legacy: bool = False, deep: bool = False, per: int = 100, previous_id: str = '', prefetch: bool = True) -> Iterator[Session]:
+        """Iterates over every Session that matches the filters, following the previous_id cursor
+        one page of size per at a time. When prefetch is True, the next page is requested in the
+        background while the current one is consumed. Raises FailedRequestError if a page fails"""
+
+        def fetch_page(cursor: str) -> APIResponse:
+            return self.fetch_sessions(professional_id, patient_id, movement_label, articulations, legacy, deep, per=per, previous_id=cursor)
+
+        return self.__iterate_pages(fetch_page, 'sessions', per, previous_id, prefetch)
+
+    def fetch_sessions_parallel(self, professional_id: str = "", patient_id: str = "", movement_label: str = "", articulations: list = None, legacy: bool = False, deep: bool = False, per: int = 100, first_page: int = 1, last_page: int = None, width: int = 4) -> APIResponse:
+        """Gets the pages first_page to last_page of a Session listing, requesting up to width
+        pages at the same time, and merges them in order into a single APIResponse. When last_page
+        is None, every page is fetched, using the total informed in the meta of the first page"""
+
+        def fetch_page(page: int) -> APIResponse:
+            return self.fetch_sessions(professional_id, patient_id, movement_label, articulations, legacy, deep, page=page, per=per)
+
+        return self.__merge_pages(self.__fetch_pages_parallel(fetch_page, per, first_page, last_page, width), 'sessions')
+
+    def stream_sessions(self, professional_id: str = "", patient_id: str = "", movement_label: str = "", articulations: list = None, legacy: bool = False, deep: bool = False, page: int = 0, per: int = 0, previous_id: str = '') -> Iterator[Session]:
+        """Gets a list of Sessions like fetch_sessions, but decodes the response body incrementally,
+        yielding each Session as soon as it is received. Raises FailedRequestError if the request fails"""
+
+        return self.__stream_objects(_Resource.SESSION, APIResponse.ResponseType.FETCH_SESSIONS, self.__format_params(professionalId=professional_id, patientId=patient_id, movementLabel=movement_label, articulations=articulations, page=page, per=per, previousId=previous_id, legacy=legacy, deep=deep), 'sessions', Session)
+
+    def find_session(self, session_id: str, legacy: bool = False, deep: bool = False, lazy: bool = False) -> APIResponse:
+        """Finds a specific Session by ID. With lazy=True (and deep=False), the Session's movements
+        are fetched from its movement_ids on their first access, as in Session.attach_client"""
 
         if (session_id is None or session_id == ''):
             raise MissingAttributeError('session id')
 
-        return self.__send_request(_Method.GET, _Resource.SESSION, APIResponse.ResponseType.FIND_SESSION, session_id, self.__format_params(legacy=legacy, deep=deep))
+        params = self.__format_params(legacy=legacy, deep=deep)
+        response = self.__send_request(_Method.GET, _Resource.SESSION, APIResponse.ResponseType.FIND_SESSION, session_id, params, cache_key=self.__cache_key(_Resource.SESSION, session_id, params))
+        if lazy and not deep and response.success:
+            session = response.get_data('session')
+            if session is not None: session.attach_client(self, legacy)
+        return response
+
+    def find_sessions(self, session_ids: Iterable[str], legacy: bool = False, deep: bool = False, width: int = 8) -> dict[str, APIResponse]:
+        """Finds many Sessions by ID, in the same way as find_movements"""
+
+        return self.__find_many(lambda session_id: self.find_session(session_id, legacy, deep), session_ids, 'session id', width)
 
     def insert_session(self, session: Session) -> APIResponse:
-        """Creates a new Session"""
+        """Creates a new Session. When chunked_uploads is enabled, the json is sent
+        with chunked transfer encoding while it is generated"""
+
+        data, headers = self.__json_body(iter_session_json(session), self.chunked_uploads)
+        return self.__send_request(_Method.POST, _Resource.SESSION, APIResponse.ResponseType.INSERT_SESSION, data=data, headers=headers)
+
+    def insert_sessions(self, sessions: Iterable[Session], max_in_flight: int = 8) -> list[APIResponse]:
+        """Creates many Sessions, sending up to max_in_flight requests at the same time.
+        Returns one APIResponse per Session, in input order. Failures are reported
+        in the respective APIResponse instead of interrupting the remaining inserts"""
 
-        return self.__send_request(_Method.POST, _Resource.SESSION, APIResponse.ResponseType.INSERT_SESSION, data=session.to_json())
+        return list(ordered_map(lambda session: self.__insert_safely(self.insert_session, session), sessions, max_in_flight))
 
     def update_session(self, session: Session) -> APIResponse:
         """Updates an existing Session"""
@@ -129,18 +352,239 @@ class ReBaseClient:
         if (session.id is None or session.id == ''):
             raise MissingAttributeError('session id')
 
-        return self.__send_request(_Method.PUT, _Resource.SESSION, APIResponse.ResponseType.UPDATE_SESSION, session.id, data=session.to_json(True))
+        data, headers = self.__json_body(iter_session_json(session, True))
+        response = self.__send_request(_Method.PUT, _Resource.SESSION, APIResponse.ResponseType.UPDATE_SESSION, session.id, data=data, headers=headers)
+        self.__invalidate(('session', session.id))
+        return response
 
     def delete_session(self, session_id: str, deep: bool = False) -> APIResponse:
-        """Deletes a Session by ID"""
+        """Deletes a Session by ID. If deep is True, its Movements are also deleted"""
 
         if (session_id is None or session_id == ''):
             raise MissingAttributeError('session id')
 
-        return self.__send_request(_Method.DELETE, _Resource.SESSION, APIResponse.ResponseType.DELETE_SESSION, session_id, self.__format_params(deep=deep))
+        response = self.__send_request(_Method.DELETE, _Resource.SESSION, APIResponse.ResponseType.DELETE_SESSION, session_id, self.__format_params(deep=deep))
+        if deep and self.cache is not None:
+            # Os Movimentos da Sessão são os que apontam para ela e os listados nas Sessões em cache
+            children = [('movement', tag[1]) for tag in self.cache.related_tags(('session', session_id)) if tag[0] == 'has-movement']
+            self.__invalidate(('in-session', session_id), *children)
+        self.__invalidate(('session', session_id))
+        return response
+
+    def __find_many(self, find, resource_ids: Iterable[str], attribute_name: str, width: int) -> dict[str, APIResponse]:
+        if width < 1:
+            raise ValueError('width must be greater than zero')
+
+        unique_ids = list(dict.fromkeys(resource_ids))
+        for resource_id in unique_ids:
+            if resource_id is None or resource_id == '':
+                raise MissingAttributeError(attribute_name)
 
-    def __send_request(self, method: _Method, resource: _Resource, response_type: APIResponse.ResponseType, resource_id: str = None, params: dict = None, data: dict = None) -> APIResponse:
-        url = _SERVER_URL
+        if len(unique_ids) == 0: return {}
+
+        # Todas as buscas são enfileiradas de uma vez, de forma que uma resposta lenta não atrasa o envio das demais
+        with ThreadPoolExecutor(max_workers=min(width, len(unique_ids))) as executor:
+            return dict(zip(unique_ids, executor.map(find, unique_ids)))
+
+    # Enquanto a página atual é consumida, a próxima já está sendo buscada, mantendo no máximo duas páginas em memória
+    def __iterate_pages(self, fetch_page, key: str, per: int, previous_id: str, prefetch: bool) -> Iterator:
+        if per < 1:
+            raise ValueError('per must be greater than zero')
+
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            next_page = executor.submit(fetch_page, previous_id) if prefetch else None
+            cursor = previous_id
+
+            while True:
+                response = next_page.result() if prefetch else fetch_page(cursor)
+                if not response.success:
+                    raise FailedRequestError(response)
+
+                items = response.get_data(key) or []
+                has_next_page = len(items) >= per
+                if has_next_page:
+                    cursor = items[-1].id
+                    if prefetch: next_page = executor.submit(fetch_page, cursor)
+
+                yield from items
+
+                if not has_next_page:
+                    return
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    # A primeira página informa o total de páginas; as demais são independentes e podem ser buscadas em paralelo
+    def __fetch_pages_parallel(self, fetch_page, per: int, first_page: int, last_page: int, width: int) -> Iterator[APIResponse]:
+        if per < 1 or first_page < 1:
+            raise ValueError('per and first_page must be greater than zero')
+
+        first_response = fetch_page(first_page)
+        yield first_response
+        if not first_response.success:
+            return
+
+        if last_page is None:
+            last_page = first_response.get_meta_data('total_page_count')
+            if last_page is None and first_response.has_meta_data('total_count'):
+                last_page = -(-first_response.get_meta_data('total_count') // per)
+            if last_page is None:
+                return
+
+        yield from ordered_map(fetch_page, range(first_page + 1, last_page + 1), width)
+
+    def __merge_pages(self, pages: Iterator[APIResponse], key: str) -> APIResponse:
+        first_response = None
+        items = None
+
+        # As páginas são concatenadas sem que os seus Movimentos ou Sessões sejam construídos
+        for response in pages:
+            if not response.success:
+                return response
+
+            if first_response is None:
+                first_response = response
+                items = response.get_data(key) or LazySequence()
+            else:
+                items.extend(response.get_data(key) or [])
+
+        return APIResponse(response_type=first_response.response_type, status=first_response.status, code=first_response.code,
+                           data={ key: items }, meta=first_response._meta) # pylint: disable=protected-access
+
+    def __insert_safely(self, insert_method, resource) -> APIResponse:
+        try:
+            return insert_method(resource)
+        except (TypeError, ValueError, AttributeError) as e:
+            return self.__new_api_error_response(str(e))
+
+    # Retorna o corpo e os cabeçalhos extras da requisição. Um corpo chunked é um gerador, que o requests
+    # envia com Transfer-Encoding: chunked, de forma que o json completo nunca fica em memória
+    def __json_body(self, pieces: Iterator[str], chunked: bool = False) -> tuple:
+        if self.compression is None:
+            return (self.__encode_chunks(pieces) if chunked else ''.join(pieces)), None
+
+        if not chunked:
+            body = ''.join(pieces).encode('utf-8')
+            if len(body) < self.compression_threshold:
+                self.compression_stats.record_uncompressed_request()
+                return body, None
+            return compress_body(body, self.compression, self.compression_stats), { 'Content-Encoding': self.compression }
+
+        # O Content-Encoding precisa ser decidido antes do envio, então o início do corpo é lido até atingir o limite
+        chunks = self.__encode_chunks(pieces)
+        head = []
+        size = 0
+        for chunk in chunks:
+            head.append(chunk)
+            size += len(chunk)
+            if size >= self.compression_threshold: break
+
+        body = chain(head, chunks)
+        if size < self.compression_threshold:
+            self.compression_stats.record_uncompressed_request()
+            return body, None
+        return iter_compressed(body, self.compression, self.compression_stats), { 'Content-Encoding': self.compression }
+
+    # As partes do json são agrupadas em blocos de _STREAM_CHUNK_SIZE, evitando enviar blocos muito pequenos
+    def __encode_chunks(self, pieces: Iterator[str]) -> Iterator[bytes]:
+        buffer = []
+        size = 0
+        for piece in pieces:
+            buffer.append(piece)
+            size += len(piece)
+            if size >= _STREAM_CHUNK_SIZE:
+                yield ''.join(buffer).encode('utf-8')
+                buffer = []
+                size = 0
+
+        if buffer: yield ''.join(buffer).encode('utf-8')
+
+    def __send_request(self, method: _Method, resource: _Resource, response_type: APIResponse.ResponseType, resource_id: str = None, params: dict = None, data: dict = None, headers: dict = None, cache_key: tuple = None) -> APIResponse:
+        # Respostas em cache ou compartilhadas são decodificadas por cada chamada, que pode alterá-las livremente
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None: return self.__parse_body(cached[0], cached[1], response_type)
+
+        # A geração é lida antes da requisição para que uma invalidação feita durante ela descarte a resposta
+        generation = self.cache.generation if cache_key is not None else None
+        if method == _Method.GET and self.coalesce_requests:
+            (body, code, error), generation = self.__coalesced_exchange(resource, resource_id, params, generation)
+        else:
+            body, code, error = self.__exchange(method, resource, resource_id, params, data, headers)
+
+        if error is not None:
+            return self.__new_api_error_response(error)
+
+        api_response = self.__parse_body(body, code, response_type)
+        if cache_key is not None and api_response.success:
+            self.cache.put(cache_key, body, code, self.__cache_tags(resource, resource_id, api_response), generation)
+        return api_response
+
+    # Retorna a tupla (corpo, código, erro) da requisição
+    def __exchange(self, method: _Method, resource: _Resource, resource_id: str = None, params: dict = None, data: dict = None, headers: dict = None) -> tuple:
+        try:
+            response = self.__request(method, resource, resource_id, params, data, headers=headers)
+        except requests.exceptions.RequestException as e:
+            return None, None, str(e)
+
+        self.__record_response_compression(response)
+        return response.content, response.status_code, None
+
+    # Requisições GET idênticas feitas enquanto uma delas está em andamento aguardam e compartilham o seu resultado,
+    # junto com a geração do cache lida antes dela
+    def __coalesced_exchange(self, resource: _Resource, resource_id: str, params: dict, generation: int = None) -> tuple:
+        key = (resource, resource_id, tuple((k, tuple(v) if isinstance(v, list) else v) for k, v in sorted((params or {}).items())))
+
+        with self.__flights_lock:
+            flight = self.__flights.get(key)
+            leader = flight is None
+            if leader: flight = self.__flights[key] = _Flight(generation)
+            else: self.coalesced_requests += 1
+
+        if not leader:
+            flight.done.wait()
+            return flight.result, flight.generation
+
+        try:
+            flight.result = self.__exchange(_Method.GET, resource, resource_id, params)
+        finally:
+            with self.__flights_lock:
+                del self.__flights[key]
+            flight.done.set()
+
+        return flight.result, generation
+
+    def __cache_key(self, resource: _Resource, resource_id: str, params: dict) -> tuple:
+        if self.cache is None: return None
+        return (resource.name, resource_id, params.get('legacy', False), params.get('deep', False))
+
+    # As tags permitem invalidar uma resposta a partir dos recursos relacionados a ela
+    def __cache_tags(self, resource: _Resource, resource_id: str, response: APIResponse) -> list:
+        if resource == _Resource.MOVEMENT:
+            movement = response.get_data('movement')
+            tags = [('movement', resource_id)]
+            if movement is not None and movement.session_id is not None: tags.append(('in-session', movement.session_id))
+            return tags
+
+        session = response.get_data('session')
+        tags = [('session', resource_id)]
+        if session is not None:
+            tags += [('has-movement', movement_id) for movement_id in session.movement_ids or []]
+            tags += [('has-movement', movement.id) for movement in session.movements if movement.id is not None]
+        return tags
+
+    def __invalidate(self, *tags: tuple) -> None:
+        if self.cache is not None: self.cache.invalidate(*tags)
+
+    # Respostas comprimidas são decodificadas pelo requests, que já envia Accept-Encoding: gzip, deflate
+    def __record_response_compression(self, response: requests.Response) -> None:
+        wire_size = response.headers.get('Content-Length')
+        if response.headers.get('Content-Encoding') in ENCODINGS and wire_size is not None:
+            self.compression_stats.record_response(len(response.content), int(wire_size))
+
+    def __request(self, method: _Method, resource: _Resource, resource_id: str = None, params: dict = None, data: dict = None, stream: bool = False, headers: dict = None) -> requests.Response:
+        url = self.server_url
 
         if resource == _Resource.MOVEMENT: url += 'movement'
         elif resource == _Resource.SESSION: url += 'session'
@@ -148,25 +592,45 @@ class ReBaseClient:
 
         if resource_id is not None: url += f'/{resource_id}'
 
+        if method in (_Method.POST, _Method.PUT): headers = { **_JSON_HEADERS, **headers } if headers else _JSON_HEADERS
+
+        return self.__get_session().request(_METHOD_NAMES[method], url, headers=headers, params=params, data=data, timeout=self.timeout, stream=stream)
+
+    # Os objetos são construídos à medida que cada elemento da lista termina de ser recebido
+    def __stream_objects(self, resource: _Resource, response_type: APIResponse.ResponseType, params: dict, key: str, model: type) -> Iterator:
         try:
-            if method == _Method.GET:
-                response = requests.get(url, headers=self._authentication_headers, params=params, timeout=30)
-            elif method == _Method.POST:
-                response = requests.post(url, headers={ 'Content-Type': 'application/json', **self._authentication_headers }, params=params, data=data, timeout=30)
-            elif method == _Method.PUT:
-                response = requests.put(url, headers={ 'Content-Type': 'application/json', **self._authentication_headers }, params=params, data=data, timeout=30)
-            else: # method == _Method.DELETE
-                response = requests.delete(url, headers=self._authentication_headers, params=params, timeout=30)
+            response = self.__request(_Method.GET, resource, params=params, stream=True)
         except requests.exceptions.RequestException as e:
-            return self.__new_api_error_response(str(e))
+            raise FailedRequestError(self.__new_api_error_response(str(e))) from e
+
+        with response:
+            if response.status_code < 200 or response.status_code > 300:
+                raise FailedRequestError(self.__parse_api_response(response, response_type))
 
-        return self.__parse_api_response(response, response_type)
+            for item in iter_array_items(response.iter_content(chunk_size=_STREAM_CHUNK_SIZE), key):
+                yield model(item, trusted=True)
 
     def __parse_api_response(self, response: requests.Response, response_type: APIResponse.ResponseType) -> APIResponse:
-        if response.status_code < 200 or response.status_code > 300:
-            return self.__new_api_response(APIResponse.ResponseType.API_ERROR, response.json(), response.status_code, 1)
+        return self.__parse_body(response.content, response.status_code, response_type)
+
+    def __parse_body(self, body: bytes, code: int, response_type: APIResponse.ResponseType) -> APIResponse:
+        if code < 200 or code > 300:
+            return self.__new_api_response(APIResponse.ResponseType.API_ERROR, loads(body), code, 1)
+
+        data = self.__decode_in_processes(body, response_type)
+        return self.__new_api_response(response_type, data if data is not None else loads(body), code, 0)
+
+    # Listagens grandes são divididas entre os processos, que decodificam e empacotam os Movimentos
+    def __decode_in_processes(self, body: bytes, response_type: APIResponse.ResponseType) -> dict:
+        key = _PARALLEL_KEYS.get(response_type)
+        if key is None or self.decode_processes == 0 or len(body) < self.decode_threshold:
+            return None
+
+        with self.__decoder_lock:
+            if self.__decoder is None: self.__decoder = ProcessPoolExecutor(max_workers=self.decode_processes)
+            decoder = self.__decoder
 
-        return self.__new_api_response(response_type, response.json(), response.status_code, 0)
+        return decode_parallel(body, key, decoder, 4 * self.decode_processes)
 
     def __new_api_response(self, response_type: APIResponse.ResponseType, response: str, response_code: int, response_status: int) -> APIResponse:
         if response is None:
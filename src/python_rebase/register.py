@@ -17,29 +17,72 @@
 # You should have received a copy of the GNU General Public License
 # along with Python ReBase.  If not, see <https://www.gnu.org/licenses/>
 
+from array import array
+
 from .rotation import Rotation
-from .repeated_articulation_error import RepeatedArticulationError
+from .articulation_schema import ArticulationSchema, EMPTY_SCHEMA
+
+def pack_values(values: list) -> array | list:
+    """Returns the values in an array of doubles, which is pickled as a single buffer,
+    if they are all floats. Otherwise, returns the list itself, so that no value changes type"""
+
+    return array('d', values) if set(map(type, values)) <= { float } else values
 
 class Register:
-    """Represents a ReBase Register"""
+    """Represents a ReBase Register. The articulation names are kept in a shared ArticulationSchema,
+    so each Register only stores its Rotations"""
+
+    __slots__ = ('_schema', '_rotations')
 
     def __init__(self, articulations: list | dict = None):
-        self._articulations = {}
+        self._schema = EMPTY_SCHEMA
+        self._rotations = []
         self.__set_articulations(articulations)
 
+    @classmethod
+    def from_rotations(cls, schema: ArticulationSchema, rotations: list) -> 'Register':
+        """Creates a Register from a schema and a list with one Rotation (or one [x, y, z] list)
+        per articulation of the schema"""
+
+        register = cls.__new__(cls)
+        register._schema = schema
+        register._rotations = [register.__force_rotation(rotation) for rotation in rotations]
+        return register
+
+    @classmethod
+    def from_list(cls, schema: ArticulationSchema, values) -> 'Register':
+        """Creates a Register from a schema and a flat sequence with the x, y and z values
+        of each articulation, in schema order. It is the inverse of to_list"""
+
+        register = cls.__new__(cls)
+        register._schema = schema
+        register._rotations = [Rotation(values[i], values[i + 1], values[i + 2]) for i in range(0, 3 * len(schema), 3)]
+        return register
+
+    # As rotações são serializadas como um único buffer de floats, em vez de um objeto por articulação
+    def __reduce__(self):
+        if any(rotation is None for rotation in self._rotations):
+            return (Register.from_rotations, (self._schema, self._rotations))
+        return (Register.from_list, (self._schema, pack_values(self.to_list())))
+
     def __setitem__(self, articulation: str, rotation: Rotation | list) -> None:
-        self._articulations[articulation] = self.__force_rotation(rotation)
+        index = self._schema.indexes.get(articulation)
+        if index is None:
+            self._schema = self._schema.extended(articulation)
+            self._rotations.append(self.__force_rotation(rotation))
+        else:
+            self._rotations[index] = self.__force_rotation(rotation)
 
     def __getitem__(self, articulation: str) -> Rotation:
-        return self._articulations[articulation]
+        return self._rotations[self._schema.indexes[articulation]]
 
     def __eq__(self, other) -> bool:
         if not isinstance(other, Register):
             return False
-        if self.articulations != other.articulations:
+        if self.schema is not other.schema:
             return False
 
-        for art in self.articulations:
+        for art in self.schema.names:
             if self[art] != other[art]:
                 return False
 
@@ -51,17 +94,26 @@ class Register:
     def to_dict(self) -> dict:
         """Converts the Register to a dictionary"""
 
-        return { art: value.to_list() for art, value in self._articulations.items() }
+        return { art: value.to_list() for art, value in zip(self._schema.names, self._rotations) }
+
+    def to_list(self) -> list:
+        """Converts the Register to a flat list with the x, y and z values of each articulation, in schema order"""
+
+        return [value for rotation in self._rotations for value in (rotation.x, rotation.y, rotation.z)]
+
+    def __get_schema(self) -> ArticulationSchema:
+        return self._schema
 
     def __get_articulation_count(self) -> int:
-        return len(self._articulations)
+        return len(self.schema)
 
     def __get_articulations(self) -> list:
-        return list(self._articulations.keys())
+        return list(self.schema.names)
 
     def __get_is_empty(self) -> bool:
-        return len(self._articulations) == 0
+        return len(self.schema) == 0
 
+    schema = property(__get_schema, doc='The shared ArticulationSchema of the Register')
     articulation_count = property(__get_articulation_count)
     articulations = property(__get_articulations)
     is_empty = property(__get_is_empty)
@@ -72,15 +124,12 @@ class Register:
             return
 
         if isinstance(articulations, dict):
-            for art, value in articulations.items():
-                self._articulations[art] = self.__force_rotation(value)
+            self._schema = ArticulationSchema.intern(articulations.keys())
+            self._rotations = [self.__force_rotation(value) for value in articulations.values()]
 
         elif isinstance(articulations, list):
-            for articulation in articulations:
-                if articulation not in self._articulations:
-                    self._articulations[articulation] = Rotation()
-                else:
-                    raise RepeatedArticulationError(articulation, articulations)
+            self._schema = ArticulationSchema.intern(articulations)
+            self._rotations = [Rotation() for _ in articulations]
 
         else:
             raise TypeError(f'Invalid articulation parameter (expected dictionary or list): {articulations}')
@@ -0,0 +1,137 @@
+"""This module contains the RegisterArray class, a columnar NumPy-backed storage for a Movement's Registers"""
+
+# Copyright © 2023-2024 Tiago Trotta
+
+# This file is part of Python ReBase.
+
+# Python ReBase is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Python ReBase is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Python ReBase.  If not, see <https://www.gnu.org/licenses/>
+
+from collections.abc import Sequence
+
+try:
+    import numpy as np
+except ImportError: # pragma: no cover
+    np = None
+
+from .articulation_schema import ArticulationSchema
+from .register import Register, pack_values
+from .rotation import Rotation, zeros_as_int
+from .mismatched_articulations_error import MismatchedArticulationsError
+
+def require_numpy() -> None:
+    """Raises an ImportError if NumPy is not installed"""
+
+    if np is None:
+        raise ImportError('NumPy is required for array-backed Movements. Install it with: pip install numpy')
+
+class RegisterView(Register):
+    """A Register whose rotations are read from and written to a row of a RegisterArray"""
+
+    __slots__ = ('_row',)
+
+    def __init__(self, row, schema: ArticulationSchema): # pylint: disable=super-init-not-called
+        self._row = row
+        self._schema = schema
+
+    def __setitem__(self, articulation: str, rotation: Rotation | list) -> None:
+        if articulation not in self._schema.indexes:
+            raise MismatchedArticulationsError(list(self._schema.names), list(self._schema.names) + [articulation])
+
+        self._row[self._schema.indexes[articulation]] = rotation.to_list() if isinstance(rotation, Rotation) else rotation[:3]
+
+    def __getitem__(self, articulation: str) -> Rotation:
+        return Rotation(*self._row[self._schema.indexes[articulation]].tolist())
+
+    def to_dict(self) -> dict:
+        """Converts the Register to a dictionary"""
+
+        return dict(zip(self._schema.names, map(zeros_as_int, self._row.tolist())))
+
+    def to_list(self) -> list:
+        """Converts the Register to a flat list with the x, y and z values of each articulation, in schema order"""
+
+        return self._row.ravel().tolist()
+
+    # Uma visão é serializada como um Register independente, já que o array não acompanha a linha
+    def __reduce__(self):
+        return (Register.from_list, (self._schema, pack_values(self.to_list())))
+
+class RegisterArray(Sequence):
+    """Stores the Registers of a Movement in a contiguous float array of shape
+    (frames, articulations, 3). Items are RegisterViews over the rows of the array"""
+
+    def __init__(self, array, articulations: list):
+        require_numpy()
+
+        array = np.asarray(array)
+        if array.dtype.kind != 'f': array = array.astype(np.float64)
+        array = np.ascontiguousarray(array)
+
+        if array.ndim != 3 or array.shape[2] != 3:
+            raise ValueError(f'Register arrays must have shape (frames, articulations, 3), got {array.shape}')
+        if array.shape[1] != len(articulations):
+            raise MismatchedArticulationsError(list(articulations), [f'<{array.shape[1]} array columns>'])
+
+        self.articulations = list(articulations)
+        self.schema = ArticulationSchema.intern(self.articulations)
+        self._buffer = array
+        self._length = array.shape[0]
+
+    def __get_array(self):
+        return self._buffer[:self._length]
+
+    array = property(__get_array, doc='The (frames, articulations, 3) array that stores the Registers')
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int | slice) -> RegisterView | list:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+
+        if index < 0: index += self._length
+        if index < 0 or index >= self._length:
+            raise IndexError('RegisterArray index out of range')
+
+        return RegisterView(self._buffer[index], self.schema)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, RegisterArray):
+            return self.articulations == other.articulations and np.array_equal(self.array, other.array)
+        if not isinstance(other, Sequence) or isinstance(other, (str, bytes)) or len(self) != len(other):
+            return False
+        return all(a == b for a, b in zip(self, other))
+
+    def __str__(self) -> str:
+        return str(self.to_dicts())
+
+    def append(self, register: Register) -> None:
+        """Appends a Register, which must have the same articulations as the array"""
+
+        if register.schema is not self.schema:
+            raise MismatchedArticulationsError(self.articulations, register.articulations)
+
+        # A capacidade do buffer dobra quando está cheio, para que inserções sucessivas custem O(1) amortizado
+        if self._length == self._buffer.shape[0]:
+            buffer = np.empty((max(8, self._length * 2), *self._buffer.shape[1:]), dtype=self._buffer.dtype)
+            buffer[:self._length] = self._buffer[:self._length]
+            self._buffer = buffer
+
+        self._buffer[self._length] = [register[art].to_list() for art in self.articulations]
+        self._length += 1
+
+    def to_dicts(self) -> list:
+        """Converts every Register to a dictionary, without building Register objects"""
+
+        return [dict(zip(self.articulations, map(zeros_as_int, row))) for row in self.array.tolist()]
@@ -0,0 +1,177 @@
+"""This module contains the ResponseCache class, a bounded LRU cache of server responses"""
+
+# Copyright © 2023-2024 Tiago Trotta
+
+# This file is part of Python ReBase.
+
+# Python ReBase is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Python ReBase is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Python ReBase.  If not, see <https://www.gnu.org/licenses/>
+
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Callable, Hashable, Iterable
+
+class _Entry: # pylint: disable=too-few-public-methods
+    """A cached response body with its expiration time and invalidation tags"""
+
+    __slots__ = ('body', 'code', 'expires_at', 'tags')
+
+    def __init__(self, body: bytes, code: int, expires_at: float, tags: frozenset):
+        self.body = body
+        self.code = code
+        self.expires_at = expires_at
+        self.tags = tags
+
+class ResponseCache:
+    """Thread-safe LRU cache of raw response bodies, bounded by max_entries and max_bytes.
+    Entries expire ttl seconds after being stored. Each entry has a set of tags, and
+    invalidating a tag removes every entry that has it. A response read while one of its
+    tags is invalidated is not stored if put receives the generation read before the request"""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 2 ** 20, ttl: float = 60, clock: Callable[[], float] = monotonic):
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError('max_entries and max_bytes must be greater than zero')
+        if ttl <= 0:
+            raise ValueError('ttl must be greater than zero')
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.__clock = clock
+        self.__lock = Lock()
+        self.__entries = OrderedDict()
+        self.__tags = {}
+        self.__size = 0
+        self.__generation = 0
+        self.__tag_generations = {}
+        self.__generation_floor = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_puts = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            return entry is not None and entry.expires_at > self.__clock()
+
+    def __get_size(self) -> int:
+        return self.__size
+
+    def __get_generation(self) -> int:
+        return self.__generation
+
+    def __get_hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else None
+
+    size = property(__get_size, doc='The total size, in bytes, of the cached bodies')
+    generation = property(__get_generation, doc='A counter increased by every invalidation')
+    hit_ratio = property(__get_hit_ratio, doc='The fraction of lookups that were hits, or None if there was no lookup')
+
+    def get(self, key: Hashable) -> tuple:
+        """Returns the (body, code) cached for key, or None if it is missing or expired"""
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry.expires_at <= self.__clock():
+                self.__remove(key)
+                self.expirations += 1
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return entry.body, entry.code
+
+    def put(self, key: Hashable, body: bytes, code: int = 200, tags: Iterable[Hashable] = (), generation: int = None) -> None:
+        """Stores a response body. Bodies larger than max_bytes are not stored. If generation, the value of
+        the generation property read before the request, is given, the body is not stored when any of its
+        tags was invalidated since then"""
+
+        if len(body) > self.max_bytes:
+            return
+
+        tags = frozenset(tags)
+        with self.__lock:
+            if generation is not None and self.__is_stale(tags, generation):
+                self.stale_puts += 1
+                return
+            if key in self.__entries: self.__remove(key)
+
+            entry = _Entry(body, code, self.__clock() + self.ttl, tags)
+            self.__entries[key] = entry
+            self.__size += len(body)
+            for tag in entry.tags:
+                self.__tags.setdefault(tag, set()).add(key)
+
+            # As entradas usadas há mais tempo são descartadas até que os limites sejam respeitados
+            while len(self.__entries) > self.max_entries or self.__size > self.max_bytes:
+                self.__remove(next(iter(self.__entries)))
+                self.evictions += 1
+
+    def invalidate(self, *tags: Hashable) -> int:
+        """Removes every entry that has any of the given tags. Returns the number of removed entries"""
+
+        with self.__lock:
+            self.__generation += 1
+            # Só as gerações mais recentes são mantidas; respostas lidas antes da mais antiga delas são descartadas
+            if len(self.__tag_generations) + len(tags) > 4 * self.max_entries:
+                self.__tag_generations.clear()
+                self.__generation_floor = self.__generation
+
+            keys = set()
+            for tag in tags:
+                self.__tag_generations[tag] = self.__generation
+                keys |= self.__tags.get(tag, set())
+            for key in keys:
+                self.__remove(key)
+
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def related_tags(self, tag: Hashable) -> set:
+        """Returns the union of the tags of every entry that has the given tag"""
+
+        with self.__lock:
+            return { related for key in self.__tags.get(tag, ()) for related in self.__entries[key].tags }
+
+    def clear(self) -> None:
+        """Removes every entry, keeping the statistics"""
+
+        with self.__lock:
+            self.__entries.clear()
+            self.__tags.clear()
+            self.__size = 0
+
+    def __is_stale(self, tags: frozenset, generation: int) -> bool:
+        if generation < self.__generation_floor: return True
+        return any(self.__tag_generations.get(tag, 0) > generation for tag in tags)
+
+    def __remove(self, key: Hashable) -> None:
+        entry = self.__entries.pop(key)
+        self.__size -= len(entry.body)
+        for tag in entry.tags:
+            keys = self.__tags[tag]
+            keys.discard(key)
+            if not keys: del self.__tags[tag]
@@ -17,14 +17,24 @@
 # You should have received a copy of the GNU General Public License
 # along with Python ReBase.  If not, see <https://www.gnu.org/licenses/>
 
+def zeros_as_int(values: list) -> list:
+    """Writes the null values (0.0 and -0.0) of a list of rotation values as 0, as a Rotation does"""
+
+    return [value or 0 for value in values] if 0 in values else values
+
 class Rotation:
     """Represents a three-dimensional Rotation"""
 
+    __slots__ = ('x', 'y', 'z')
+
     def __init__(self, x: int | float = None, y: int | float = None, z: int | float = None):
         self.x = x or 0
         self.y = y or 0
         self.z = z or 0
 
+    def __reduce__(self):
+        return (Rotation, (self.x, self.y, self.z))
+
     def __eq__(self, other):
         return isinstance(other, Rotation) and self.x == other.x and self.y == other.y and self.z == other.z
 
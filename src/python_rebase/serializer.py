@@ -0,0 +1,213 @@
+"""Module that writes Movements and Sessions directly in the json format expected by the ReBase Server"""
+
+# Copyright © 2023-2024 Tiago Trotta
+
+# This file is part of Python ReBase.
+
+# Python ReBase is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Python ReBase is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Python ReBase.  If not, see <https://www.gnu.org/licenses/>
+
+from array import array
+from json import JSONEncoder
+from math import isfinite
+from typing import Iterator
+
+from .articulation_schema import ArticulationSchema
+from .register import Register
+from .register_array import RegisterArray, np
+from .rotation import Rotation, zeros_as_int
+
+# Mesmo formato de saída do json.dumps padrão
+_ENCODE = JSONEncoder().encode
+_BATCH_SIZE = 512
+# Apenas int e float são escritos pelo modelo; subclasses como bool têm outra representação em json
+_PLAIN_NUMBERS = frozenset((int, float))
+
+# Campos na mesma ordem de Movement.to_dict e Session.to_dict. Campos com sub-campos geram um objeto aninhado
+_MOVEMENT_FIELDS = (
+    ('id', 'id'), ('label', 'label'), ('description', 'description'), ('device', 'device'),
+    ('articulations', 'articulations'), ('fps', 'fps'), ('duration', 'duration'),
+    ('numberOfRegisters', 'number_of_registers'), ('insertionDate', 'insertion_date'),
+    ('updateDate', 'update_date'), ('sessionId', 'session_id'), ('professionalId', 'professional_id'),
+    ('patientId', 'patient_id'), ('app', (('code', 'app_code'), ('data', 'app_data')))
+)
+
+_SESSION_FIELDS = (
+    ('id', 'id'), ('title', 'title'), ('description', 'description'), ('professionalId', 'professional_id'),
+    ('patientSessionNumber', 'patient_session_number'), ('insertionDate', 'insertion_date'),
+    ('updateDate', 'update_date'),
+    ('patient', (('id', 'patient_id'), ('age', 'patient_age'), ('height', 'patient_height'), ('weight', 'patient_weight'))),
+    ('medicalData', (('mainComplaint', 'main_complaint'), ('historyOfCurrentDisease', 'history_of_current_disease'),
+                     ('historyOfPastDisease', 'history_of_past_disease'), ('diagnosis', 'diagnosis'),
+                     ('relatedDiseases', 'related_diseases'), ('medications', 'medications'),
+                     ('physicalEvaluation', 'physical_evaluation'))),
+    ('numberOfMovements', 'number_of_movements')
+)
+
+MOVEMENT_INSERT_EXCLUDE = frozenset(('id', 'insertionDate', 'updateDate', 'professionalId', 'patientId', 'articulations'))
+MOVEMENT_UPDATE_EXCLUDE = MOVEMENT_INSERT_EXCLUDE | { 'numberOfRegisters', 'duration', 'registers' }
+SESSION_INSERT_EXCLUDE = frozenset(('id', 'insertionDate', 'updateDate', 'movementIds'))
+SESSION_UPDATE_EXCLUDE = SESSION_INSERT_EXCLUDE | { 'movements', 'numberOfMovements' }
+
+class _Layout: # pylint: disable=too-few-public-methods
+    """The members written for a resource, with the exclusions and the member prefixes resolved beforehand"""
+
+    def __init__(self, fields: tuple, exclude: frozenset, list_key: str):
+        self.members = self.__compile(fields, exclude)
+        self.list_prefix = f'{_ENCODE(list_key)}: [' if list_key not in exclude else None
+
+    def __compile(self, fields: tuple, exclude: frozenset) -> tuple:
+        return tuple((f'{_ENCODE(key)}: ', self.__compile(attribute, frozenset()) if isinstance(attribute, tuple) else attribute)
+                     for key, attribute in fields if key not in exclude)
+
+_MOVEMENT_LAYOUTS = { False: _Layout(_MOVEMENT_FIELDS, MOVEMENT_INSERT_EXCLUDE, 'registers'),
+                      True: _Layout(_MOVEMENT_FIELDS, MOVEMENT_UPDATE_EXCLUDE, 'registers') }
+_MOVEMENT_DICT_LAYOUT = _Layout(_MOVEMENT_FIELDS, frozenset(), 'registers')
+_SESSION_LAYOUTS = { False: _Layout(_SESSION_FIELDS, SESSION_INSERT_EXCLUDE, 'movements'),
+                     True: _Layout(_SESSION_FIELDS, SESSION_UPDATE_EXCLUDE, 'movements') }
+
+def movement_to_json(movement, update: bool = False) -> str:
+    """Converts a Movement to the json expected by the ReBase Server, with the same output as
+    json.dumps({ 'movement': movement.to_dict(exclude) }) but without building any dictionary"""
+
+    return ''.join(iter_movement_json(movement, update))
+
+def movement_dict_json(movement) -> str:
+    """Converts every field of a Movement to a json object, with the same output as
+    json.dumps(movement.to_dict()) but without building any dictionary"""
+
+    return ''.join(_iter_movement_object(movement, _MOVEMENT_DICT_LAYOUT))
+
+def session_to_json(session, update: bool = False) -> str:
+    """Converts a Session to the json expected by the ReBase Server, with the same output as
+    json.dumps({ 'session': session.to_dict(exclude, movement_exclude) }) but without building any dictionary"""
+
+    return ''.join(iter_session_json(session, update))
+
+def iter_movement_json(movement, update: bool = False) -> Iterator[str]:
+    """Yields the json of a Movement in pieces of at most a few hundred Registers each"""
+
+    yield '{"movement": '
+    yield from _iter_movement_object(movement, _MOVEMENT_LAYOUTS[update])
+    yield '}'
+
+def iter_session_json(session, update: bool = False) -> Iterator[str]:
+    """Yields the json of a Session in pieces of at most a few hundred Registers each"""
+
+    layout = _SESSION_LAYOUTS[update]
+    movement_layout = _MOVEMENT_LAYOUTS[update]
+    members = _members(session, layout.members)
+
+    if layout.list_prefix is None or session.movements is None or len(session.movements) == 0:
+        yield '{"session": {' + ', '.join(members) + '}}'
+        return
+
+    members.append(layout.list_prefix)
+    yield '{"session": {' + ', '.join(members)
+    for i, movement in enumerate(session.movements):
+        if i > 0: yield ', '
+        yield from _iter_movement_object(movement, movement_layout)
+    yield ']}}'
+
+def _members(resource, members: tuple) -> list:
+    encoded = []
+    for prefix, attribute in members:
+        if isinstance(attribute, tuple):
+            nested = _members(resource, attribute)
+            if len(nested) > 0: encoded.append(prefix + '{' + ', '.join(nested) + '}')
+            continue
+
+        value = getattr(resource, attribute)
+        if value is not None: encoded.append(prefix + _ENCODE(value))
+
+    return encoded
+
+def _iter_movement_object(movement, layout: _Layout) -> Iterator[str]:
+    members = _members(movement, layout.members)
+    registers = movement.registers
+
+    if layout.list_prefix is None or registers is None or len(registers) == 0:
+        yield '{' + ', '.join(members) + '}'
+        return
+
+    members.append(layout.list_prefix)
+    yield '{' + ', '.join(members)
+    if isinstance(registers, RegisterArray):
+        yield from _iter_array_batches(registers)
+    else:
+        yield from _iter_register_batches(registers, movement.schema)
+    yield ']}'
+
+# Cada Registro é escrito preenchendo um modelo com os nomes das articulações já codificados
+def _register_template(schema: ArticulationSchema) -> str:
+    return '{' + ', '.join(f"{_ENCODE(name).replace('%', '%%')}: [%s, %s, %s]" for name in schema.names) + '}'
+
+def _iter_array_batches(registers: RegisterArray) -> Iterator[str]:
+    template = _register_template(registers.schema)
+    frames = registers.array
+
+    for start in range(0, len(frames), _BATCH_SIZE):
+        block = frames[start:start + _BATCH_SIZE]
+        if np.isfinite(block).all():
+            batch = ', '.join([template % tuple(zeros_as_int(row)) for row in block.reshape(len(block), -1).tolist()])
+        else:
+            batch = ', '.join([_ENCODE(dict(zip(registers.articulations, map(zeros_as_int, row)))) for row in block.tolist()])
+        yield batch if start == 0 else ', ' + batch
+
+def _iter_register_batches(registers, schema: ArticulationSchema) -> Iterator[str]:
+    template = _register_template(schema)
+
+    for start in range(0, len(registers), _BATCH_SIZE):
+        stop = min(start + _BATCH_SIZE, len(registers))
+        batch = ', '.join([_encode_register(registers.raw_item(i), schema, template) for i in range(start, stop)])
+        yield batch if start == 0 else ', ' + batch
+
+def register_values(register, schema: ArticulationSchema) -> list:
+    """Returns the x, y and z values of each articulation of a Register, built or in one of its raw forms
+    (dictionary or packed row), in schema order. Returns None if the Register has other articulations or
+    if a raw rotation is not a list of three values other than None, which only Register normalizes"""
+
+    if isinstance(register, dict) and tuple(register) == schema.names:
+        values = []
+        for rotation in register.values():
+            if isinstance(rotation, Rotation): values.extend(rotation.to_list())
+            elif isinstance(rotation, list) and len(rotation) == 3: values.extend(rotation)
+            else: return None
+        return values if None not in values else None
+    if isinstance(register, Register) and register.schema is schema:
+        return register.to_list()
+    if isinstance(register, array) and len(register) == 3 * len(schema):
+        return register.tolist()
+    return None
+
+def register_dict(register, schema: ArticulationSchema) -> dict:
+    """Converts a Register, built or in one of its raw forms, to the same dictionary as Register.to_dict.
+    Raw Registers are only built when their values need the normalization done by Register"""
+
+    values = register_values(register, schema) if schema is not None else None
+    if values is None or not _PLAIN_NUMBERS.issuperset(map(type, values)):
+        if not isinstance(register, Register): register = Register(register)
+        return register.to_dict()
+
+    values = zeros_as_int(values)
+    return dict(zip(schema.names, (values[i:i + 3] for i in range(0, len(values), 3))))
+
+def _encode_register(register, schema: ArticulationSchema, template: str) -> str:
+    values = register_values(register, schema)
+    # Valores não finitos ou não numéricos são escritos pelo encoder, como no json.dumps, e os
+    # Registros que não cabem no modelo são normalizados pelo Register, como quando construídos
+    if values is not None and _PLAIN_NUMBERS.issuperset(map(type, values)) and isfinite(sum(values)):
+        return template % tuple(zeros_as_int(values))
+
+    if not isinstance(register, Register): register = Register(register)
+    return _ENCODE(register.to_dict())
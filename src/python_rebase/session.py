@@ -17,10 +17,11 @@
 # You should have received a copy of the GNU General Public License
 # along with Python ReBase.  If not, see <https://www.gnu.org/licenses/>
 
-from json import dumps
-
+from .failed_request_error import FailedRequestError
+from .lazy_sequence import RemoteSequence
 from .movement import Movement
-from .util import is_valid_session_field, exclude_keys_from_dict, validate_initialization_dict
+from .serializer import session_to_json
+from .util import SESSION_FIELD_VALIDATORS, exclude_keys_from_dict, compile_field_rules, validate_compiled_dict
 
 FIELDS = { 'id': None, '_id': None, 'title': None, 'description': None, 'professionalId': None,
             'patientSessionNumber': None, 'insertionDate': None, 'updateDate': None,
@@ -39,12 +40,17 @@ FIELDS = { 'id': None, '_id': None, 'title': None, 'description': None, 'profess
             }
         }
 
+_COMPILED_FIELDS = compile_field_rules(FIELDS, SESSION_FIELD_VALIDATORS)
+
 class Session:
     """Represents a ReBase Session"""
 
-    def __init__(self, properties_dict: dict = None):
+    def __init__(self, properties_dict: dict = None, trusted: bool = False):
+        """Creates a Session from a dictionary. Use trusted=True only for dictionaries known to be
+        valid, such as the ones sent by the ReBase Server, to skip every validation"""
+
         if properties_dict is None: properties_dict = {}
-        self.__validate_session_dict(properties_dict)
+        if not trusted: self.__validate_session_dict(properties_dict)
 
         self.id = properties_dict.get('id') or properties_dict.get('_id')
         self.title = properties_dict.get('title')
@@ -67,10 +73,19 @@ class Session:
         self.medications = properties_dict.get('medications') or properties_dict.get('medicalData', {}).get('medications')
         self.physical_evaluation = properties_dict.get('physicalEvaluation') or properties_dict.get('medicalData', {}).get('physicalEvaluation')
 
-        self.movements = self.__force_movements(properties_dict['movements']) if 'movements' in properties_dict else []
+        self.movements = self.__force_movements(properties_dict['movements'], trusted) if 'movements' in properties_dict else []
         self.movement_ids = properties_dict['movementIds'] if 'movementIds' in properties_dict else []
         self.number_of_movements = properties_dict.get('numberOfMovements')
 
+    def __getstate__(self) -> dict:
+        """Returns the state used by pickle. As the client is not pickled, Movements fetched on demand
+        (see attach_client) are kept only if all of them were already fetched"""
+
+        state = dict(self.__dict__)
+        if isinstance(self.movements, RemoteSequence):
+            state['movements'] = self.movements[:] if self.movements.built_count == len(self.movements) else []
+        return state
+
     def __get_duration(self):
         duration = 0
         for movement in self.movements:
@@ -79,6 +94,22 @@ class Session:
 
     duration = property(__get_duration)
 
+    def attach_client(self, client, legacy: bool = False, prefetch: int = 2) -> None:
+        """Replaces movements with a RemoteSequence backed by movement_ids: each Movement is fetched
+        with the client's find_movement on its first access, and iterating prefetches the next
+        prefetch Movements. A failed fetch raises a FailedRequestError"""
+
+        def find(movement):
+            # Itens já construídos ou atribuídos pelo usuário são mantidos
+            if isinstance(movement, Movement): return movement
+
+            response = client.find_movement(movement, legacy)
+            if not response.success:
+                raise FailedRequestError(response)
+            return response.get_data('movement')
+
+        self.movements = RemoteSequence(self.movement_ids, find, prefetch)
+
     def to_dict(self, exclude: list = None, movement_exclude: list = None) -> dict: # pylint: disable=too-many-statements
         """Converts the Session to a dictionary. Receives a list of attributes to be ignored
         for the Session and a list of attributes to be ignored for it's Movements"""
@@ -110,7 +141,8 @@ class Session:
         if len(medical_data) > 0: dictionary['medicalData'] = medical_data
 
         if self.number_of_movements is not None: dictionary['numberOfMovements'] = self.number_of_movements
-        if self.movements is not None and len(self.movements) > 0:
+        # Os Movimentos só são convertidos (e, com um cliente, buscados) se não forem excluídos
+        if (exclude is None or 'movements' not in exclude) and self.movements is not None and len(self.movements) > 0:
             dictionary['movements'] = [movement.to_dict(exclude=movement_exclude) for movement in self.movements]
         if self.movement_ids is not None and len(self.movement_ids) > 0: dictionary['movementIds'] = self.movement_ids
 
@@ -122,20 +154,13 @@ class Session:
         """Converts the Session to a json as expected by the ReBase Server.
         Receives a boolean that indicates wether the json will be used for an update"""
 
-        exclude = ['id', 'insertionDate', 'updateDate', 'movementIds']
-        movement_exclude = ['id', 'insertionDate', 'updateDate', 'professionalId', 'patientId',
-                            'articulations']
-        if update:
-            exclude += ['movements', 'numberOfMovements']
-            movement_exclude += ['numberOfRegisters', 'duration', 'registers']
-
-        return dumps({ 'session': self.to_dict(exclude=exclude, movement_exclude=movement_exclude) })
+        return session_to_json(self, update)
 
     def __str__(self):
         return str(self.to_dict())
 
     def __validate_session_dict(self, dictionary: dict) -> None:
-        validate_initialization_dict(is_valid_session_field, 'Session', FIELDS, dictionary)
+        validate_compiled_dict('Session', _COMPILED_FIELDS, dictionary)
 
-    def __force_movements(self, data: list) -> list:
-        return [m if isinstance(m, Movement) else Movement(m) for m in data]
+    def __force_movements(self, data: list, trusted: bool = False) -> list:
+        return [m if isinstance(m, Movement) else Movement(m, trusted) for m in data]
@@ -0,0 +1,126 @@
+"""This module contains the SharedMovement class, which hands large Movements to other processes through shared memory"""
+
+# Copyright © 2023-2024 Tiago Trotta
+
+# This file is part of Python ReBase.
+
+# Python ReBase is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Python ReBase is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Python ReBase.  If not, see <https://www.gnu.org/licenses/>
+
+from math import prod
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+import sys
+from threading import Lock, get_ident
+
+from .movement import Movement
+from .parallel_decode import unpack_movement
+from .register_array import np, require_numpy
+
+_TRACKER_LOCK = Lock()
+
+def _attach(name: str) -> SharedMemory:
+    # O parâmetro track só existe a partir do Python 3.13
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name, track=False) # pylint: disable=unexpected-keyword-arg
+
+    # Antes do Python 3.13, o processo que apenas se conecta ao bloco também o registra, e o bloco
+    # seria destruído quando esse processo terminasse. O registro é evitado, e não desfeito, pois
+    # processos criados com fork compartilham o rastreador com o processo que criou o bloco.
+    # Apenas o registro deste bloco por esta thread é ignorado; os das demais threads continuam
+    thread = get_ident()
+    with _TRACKER_LOCK:
+        register = resource_tracker.register
+
+        def skip_block(resource: str, rtype: str) -> None:
+            if rtype == 'shared_memory' and resource.lstrip('/') == name.lstrip('/') and get_ident() == thread: return
+            register(resource, rtype)
+
+        resource_tracker.register = skip_block
+        try:
+            return SharedMemory(name)
+        finally:
+            resource_tracker.register = register
+
+class SharedMovement:
+    """Handle to a Movement whose frames are stored in a shared memory block. Pickling the handle
+    sends only the metadata and the name of the block, so the process that unpickles it reads the
+    frames from the block instead of copying them. Requires NumPy"""
+
+    def __init__(self, movement: Movement):
+        """Copies the frames of the Movement to a new shared memory block, owned by this handle"""
+
+        require_numpy()
+        frames = movement.to_numpy(np.float64)
+
+        self.properties = movement.to_dict(exclude=['registers'])
+        self.shape = frames.shape
+        self.__owner = True
+        self.__memory = SharedMemory(create=True, size=max(1, frames.nbytes))
+        self.__movement = None
+        np.ndarray(frames.shape, np.float64, self.__memory.buf)[...] = frames
+
+    # O nome não pode ser privado, pois o pickle busca o método pelo nome
+    @classmethod
+    def _attached(cls, name: str, shape: tuple, properties: dict) -> 'SharedMovement':
+        # pylint: disable=unused-private-member
+        handle = cls.__new__(cls)
+        handle.properties = properties
+        handle.shape = shape
+        handle.__owner = False
+        handle.__memory = _attach(name)
+        handle.__movement = None
+        return handle
+
+    def __reduce__(self):
+        return (SharedMovement._attached, (self.name, self.shape, self.properties))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        if self.__owner: self.unlink()
+
+    def __get_name(self) -> str:
+        return self.__memory.name
+
+    def __get_nbytes(self) -> int:
+        return 8 * prod(self.shape)
+
+    name = property(__get_name, doc='The name of the shared memory block')
+    nbytes = property(__get_nbytes, doc='The size, in bytes, of the frames')
+
+    def movement(self) -> Movement:
+        """Returns the Movement, whose Registers are views over the shared block. Changes to
+        the Registers are seen by every process. The Movement is created once per handle"""
+
+        require_numpy()
+        if self.__movement is None:
+            if self.nbytes == 0:
+                self.__movement = Movement(self.properties, trusted=True)
+            else:
+                self.__movement = unpack_movement((self.properties, self.__memory.buf[:self.nbytes]))
+        return self.__movement
+
+    def close(self) -> None:
+        """Releases the block in this process. Every reference to the Movement (or to its
+        Registers) must be discarded before, as they read from the block"""
+
+        self.__movement = None
+        self.__memory.close()
+
+    def unlink(self) -> None:
+        """Destroys the block. Must be called once, by the owner, after every process closed it"""
+
+        self.__memory.unlink()
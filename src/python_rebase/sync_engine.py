@@ -0,0 +1,137 @@
+"""This module contains the SyncEngine class, which incrementally synchronizes a LocalStore with the ReBase Server"""
+
+# Copyright © 2023-2024 Tiago Trotta
+
+# This file is part of Python ReBase.
+
+# Python ReBase is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Python ReBase is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Python ReBase.  If not, see <https://www.gnu.org/licenses/>
+
+from itertools import islice
+from time import perf_counter
+from typing import Callable
+
+from .local_store import LocalStore
+
+class SyncReport: # pylint: disable=too-few-public-methods
+    """Progress and result of a synchronization pass of Movements or Sessions"""
+
+    def __init__(self, resource: str, resumed: bool = False):
+        self.resource = resource
+        self.resumed = resumed
+        self.received = 0
+        self.upserted = 0
+        self.deleted = 0
+        self.elapsed = 0.0
+        self.high_water = None
+
+    def __str__(self):
+        return f'{self.resource}: {self.received} received, {self.upserted} upserted, {self.deleted} deleted ' + \
+            f'in {self.elapsed:.2f}s ({self.records_per_second:.0f} records/s)'
+
+    def __get_records_per_second(self) -> float:
+        return self.received / self.elapsed if self.elapsed > 0 else 0.0
+
+    records_per_second = property(__get_records_per_second, doc='The number of records received per second')
+
+class SyncEngine:
+    """Keeps a LocalStore in sync with the Movements and Sessions of a professional and/or patient.
+    Each pass walks the listing one page at a time with the previous_id cursor, storing only the
+    records that are new or whose updateDate differs from the stored one, and removing the stored records that the server no longer lists. The cursor
+    is saved in the store after every page, so an interrupted pass resumes where it stopped"""
+
+    def __init__(self, client, store: LocalStore, professional_id: str = '', patient_id: str = '', per: int = 100,
+                 prefetch: bool = True, progress: Callable[[SyncReport], None] = None):
+        """Creates an engine that synchronizes store using client (a ReBaseClient). progress, if
+        given, is called with the SyncReport of the current pass after every page"""
+
+        if per < 1:
+            raise ValueError('per must be greater than zero')
+
+        self.client = client
+        self.store = store
+        self.professional_id = professional_id
+        self.patient_id = patient_id
+        self.per = per
+        self.prefetch = prefetch
+        self.progress = progress
+
+    def sync(self) -> list[SyncReport]:
+        """Synchronizes the Sessions and then the Movements. Returns the report of each pass"""
+
+        return [self.sync_sessions(), self.sync_movements()]
+
+    def sync_movements(self) -> SyncReport:
+        """Synchronizes the Movements. Raises FailedRequestError if a page fails; calling it again
+        resumes the pass from the last stored page"""
+
+        return self.__sync('movements', self.client.iter_movements, self.store.movement_update_dates, self.store.put_movements, self.store.delete_movements)
+
+    def sync_sessions(self) -> SyncReport:
+        """Synchronizes the Sessions, without their Movements, like sync_movements"""
+
+        return self.__sync('sessions', self.client.iter_sessions, self.store.session_update_dates, self.store.put_sessions, self.store.delete_sessions)
+
+    def __get_key(self) -> str:
+        return f'{self.professional_id}|{self.patient_id}'
+
+    key = property(__get_key, doc='The key that identifies the filters of the engine in the sync state of the store')
+
+    def __sync(self, resource: str, iterate, stored_dates, put, delete) -> SyncReport: # pylint: disable=too-many-locals
+        key = f'{resource}|{self.key}'
+        state = self.store.get_sync_state(key) or {}
+        cursor = state.get('cursor', '')
+
+        report = SyncReport(resource, resumed=cursor != '')
+        report.high_water = state.get('high_water')
+        start = perf_counter()
+
+        items = iterate(self.professional_id, self.patient_id, per=self.per, previous_id=cursor, prefetch=self.prefetch)
+        try:
+            while True:
+                page = list(islice(items, self.per))
+                # Como a listagem é ordenada pelos IDs, os IDs armazenados no intervalo da página que não
+                # estão nela foram removidos do servidor. Após a última página, o intervalo não tem fim
+                last_id = page[-1].id if len(page) == self.per else None
+                stored = stored_dates(self.professional_id, self.patient_id, cursor, last_id)
+
+                # Cada registro é comparado com a sua própria data armazenada, e não com uma marca global, para que
+                # registros alterados durante uma passagem, depois de já terem sido lidos, sejam gravados na próxima
+                changed = [item for item in page if item.id not in stored or item.update_date != stored[item.id]]
+                removed = set(stored).difference(item.id for item in page)
+                if len(changed) > 0: put(changed)
+                if len(removed) > 0: delete(removed)
+
+                report.received += len(page)
+                report.upserted += len(changed)
+                report.deleted += len(removed)
+                for item in page:
+                    if self.__is_newer(item.update_date, report.high_water): report.high_water = item.update_date
+                report.elapsed = perf_counter() - start
+
+                if last_id is None: break
+
+                cursor = last_id
+                self.store.set_sync_state(key, { 'high_water': report.high_water, 'cursor': cursor })
+                if self.progress is not None: self.progress(report)
+        finally:
+            items.close()
+
+        self.store.set_sync_state(key, { 'high_water': report.high_water })
+        if self.progress is not None: self.progress(report)
+        return report
+
+    # As datas são strings ISO 8601 no mesmo formato, então podem ser comparadas diretamente
+    def __is_newer(self, update_date: str, high_water: str) -> bool:
+        if high_water is None: return True
+        return update_date is not None and update_date >= high_water
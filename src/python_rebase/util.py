@@ -17,7 +17,9 @@
 # You should have received a copy of the GNU General Public License
 # along with Python ReBase.  If not, see <https://www.gnu.org/licenses/>
 
-from typing import Callable
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator
 
 def is_valid_str(value) -> bool:
     """Checks wether a given string is valid"""
@@ -35,38 +37,54 @@ def is_valid_id(value) -> bool:
     # pylint: disable=unidiomatic-typecheck
     return (is_valid_str(value) and value != '') or (type(value) == int and value > 0)
 
+def is_valid_list(value) -> bool:
+    """Checks wether a given list is valid"""
+
+    return isinstance(value, list)
+
+def _accept_any(_) -> bool:
+    return True
+
+def _reject_all(_) -> bool:
+    return False
+
+def _field_table(*groups: tuple) -> dict:
+    return { field: validator for fields, validator in groups for field in fields }
+
+# Tabelas de validação por campo, montadas uma única vez na importação do módulo
+MOVEMENT_FIELD_VALIDATORS = _field_table(
+    (('id', '_id', 'sessionId', 'professionalId', 'patientId', 'appCode', 'app.code'), is_valid_id),
+    (('label', 'description', 'device', 'insertionDate', 'updateDate'), is_valid_str),
+    (('fps', 'duration', 'numberOfRegisters'), is_valid_number),
+    (('articulations', 'registers'), is_valid_list),
+    (('appData', 'app.data'), _accept_any)
+)
+
+SESSION_FIELD_VALIDATORS = _field_table(
+    (('id', '_id', 'professionalId', 'patientId', 'patient.id'), is_valid_id),
+    (('title', 'description', 'insertionDate', 'updateDate', 'mainComplaint',
+      'historyOfCurrentDisease', 'historyOfPastDisease', 'diagnosis',
+      'relatedDiseases', 'medications', 'physicalEvaluation',
+      'medicalData.mainComplaint', 'medicalData.historyOfCurrentDisease',
+      'medicalData.historyOfPastDisease', 'medicalData.diagnosis',
+      'medicalData.relatedDiseases', 'medicalData.medications',
+      'medicalData.physicalEvaluation'), is_valid_str),
+    (('patientSessionNumber', 'patientAge', 'patientHeight', 'patientWeight',
+      'numberOfMovements', 'patient.age', 'patient.height', 'patient.weight'), is_valid_number),
+    (('movements', 'movementIds'), is_valid_list)
+)
+
 def is_valid_movement_field(field: str, value: any) -> bool:
     """Checks wether a given field-value pair is valid for a Movement object"""
 
-    if field in ['id', '_id', 'sessionId', 'professionalId', 'patientId', 'appCode', 'app.code']:
-        return is_valid_id(value)
-    if field in ['label', 'description', 'device', 'insertionDate', 'updateDate']:
-        return is_valid_str(value)
-    if field in ['fps', 'duration', 'numberOfRegisters']:
-        return is_valid_number(value)
-    if field in ['articulations', 'registers']:
-        return isinstance(value, list)
-    return field in ['appData', 'app.data']
+    validator = MOVEMENT_FIELD_VALIDATORS.get(field)
+    return validator is not None and validator(value)
 
 def is_valid_session_field(field: str, value: any) -> bool:
     """Checks wether a given field-value pair is valid for a Session object"""
 
-    if field in ['id', '_id', 'professionalId', 'patientId', 'patient.id']:
-        return is_valid_id(value)
-    if field in ['title', 'description', 'insertionDate', 'updateDate', 'mainComplaint',
-                 'historyOfCurrentDisease', 'historyOfPastDisease', 'diagnosis',
-                 'relatedDiseases', 'medications', 'physicalEvaluation',
-                 'medicalData.mainComplaint', 'medicalData.historyOfCurrentDisease',
-                 'medicalData.historyOfPastDisease', 'medicalData.diagnosis',
-                 'medicalData.relatedDiseases', 'medicalData.medications',
-                 'medicalData.physicalEvaluation']:
-        return is_valid_str(value)
-    if field in ['patientSessionNumber', 'patientAge', 'patientHeight', 'patientWeight',
-                 'numberOfMovements', 'patient.age', 'patient.height', 'patient.weight']:
-        return is_valid_number(value)
-    if field in ['movements', 'movementIds']:
-        return isinstance(value, list)
-    return False
+    validator = SESSION_FIELD_VALIDATORS.get(field)
+    return validator is not None and validator(value)
 
 def exclude_keys_from_dict(dictionary: dict, keys: list) -> None:
     """Excludes a given list of keys from a dictionary"""
@@ -100,3 +118,60 @@ def validate_initialization_dict(validation_function: Callable[[str, any], bool]
                 value = dictionary[key][sub_key]
                 if not validation_function(f'{key}.{sub_key}', value):
                     raise ValueError(f"Inappropriate value for attribute '{key}.{sub_key}' in {resource_name} object: {type(value)} {value}")
+
+def compile_field_rules(field_rules: dict, field_validators: dict) -> dict:
+    """Compiles a resource's field rules into a table that maps each field to its validator.
+    Fields with nested rules map to a table of their own sub-fields"""
+
+    compiled = {}
+    for key, rule in field_rules.items():
+        if rule is None:
+            compiled[key] = field_validators.get(key, _reject_all)
+        else:
+            compiled[key] = { sub_key: field_validators.get(f'{key}.{sub_key}', _reject_all) for sub_key in rule }
+
+    return compiled
+
+def validate_compiled_dict(resource_name: str, compiled_rules: dict, dictionary: dict) -> None:
+    """Validates a dictionary used to initialize a resource with rules compiled by compile_field_rules"""
+
+    for key, value in dictionary.items():
+        rule = compiled_rules.get(key)
+        if rule is None:
+            raise ValueError(f"Invalid attribute in {resource_name} object: '{key}'")
+
+        if not isinstance(rule, dict):
+            if not rule(value):
+                raise ValueError(f"Inappropriate value for attribute '{key}' in {resource_name} object: {type(value)} {value}")
+            continue
+
+        if not isinstance(value, dict):
+            raise ValueError(f"Inappropriate value for attribute '{key}' in {resource_name} object: {type(value)} {value}")
+
+        for sub_key, sub_value in value.items():
+            sub_rule = rule.get(sub_key)
+            if sub_rule is None:
+                raise ValueError(f"Invalid attribute in {resource_name} object: '{key}.{sub_key}'")
+            if not sub_rule(sub_value):
+                raise ValueError(f"Inappropriate value for attribute '{key}.{sub_key}' in {resource_name} object: {type(sub_value)} {sub_value}")
+
+def ordered_map(function: Callable, iterable: Iterable, max_in_flight: int) -> Iterator:
+    """Applies function to every item of iterable on a pool of max_in_flight threads, yielding
+    the results in input order. At most max_in_flight items are read ahead from iterable"""
+
+    if max_in_flight < 1:
+        raise ValueError('max_in_flight must be greater than zero')
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        pending = deque()
+        try:
+            for item in iterable:
+                if len(pending) >= max_in_flight:
+                    yield pending.popleft().result()
+                pending.append(executor.submit(function, item))
+
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,40 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring, missing-function-docstring
+
+from src.python_rebase.api_response import APIResponse
+from src.python_rebase.movement import Movement
+from src.python_rebase.session import Session
+
+class TestAPIResponse:
+    def test_init(self):
+        response = APIResponse(APIResponse.ResponseType.FIND_MOVEMENT, data={ 'movement': { 'id': '1' } }, meta={ 'total_count': 1 })
+
+        assert response.success
+        assert response.human_response_type == 'Find Movement'
+        assert response.has_data('movement')
+        assert not response.has_data('session')
+        assert response.get_meta_data('total_count') == 1
+        assert isinstance(response.get_data('movement'), Movement)
+        assert response.get_data('movement') is response.get_data('movement')
+
+    def test_lazy_objects(self):
+        movements = [{ 'id': '1' }, { 'id': '2' }, { 'invalid': 'key' }]
+        response = APIResponse(APIResponse.ResponseType.FETCH_MOVEMENTS, data={ 'movements': movements, 'session': { 'id': 's' } })
+
+        assert response.success
+        assert len(response.get_data('movements')) == 3
+        assert response.get_data('movements').built_count == 0
+
+        assert response.get_data('movements')[1].id == '2'
+        assert response.get_data('movements').built_count == 1
+        assert isinstance(response.get_data('session'), Session)
+
+        # Os dados vindos do servidor são confiáveis, então não são validados
+        assert isinstance(response.get_data('movements')[2], Movement)
+
+    def test_built_objects(self):
+        movement = Movement({ 'id': '1' })
+        response = APIResponse(APIResponse.ResponseType.FETCH_MOVEMENTS, data={ 'movements': [movement] })
+
+        assert response.get_data('movements')[0] is movement
+
+# pylint: enable=missing-module-docstring, missing-class-docstring, missing-function-docstring
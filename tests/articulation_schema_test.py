@@ -0,0 +1,32 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring, missing-function-docstring
+
+from pickle import dumps, loads
+import pytest
+
+from src.python_rebase.articulation_schema import ArticulationSchema
+from src.python_rebase.repeated_articulation_error import RepeatedArticulationError
+
+class TestArticulationSchema:
+    def test_intern(self):
+        schema = ArticulationSchema.intern(['a1', 'a2'])
+
+        assert schema is ArticulationSchema.intern(('a1', 'a2'))
+        assert schema is not ArticulationSchema.intern(['a2', 'a1'])
+        assert schema.names == ('a1', 'a2')
+        assert schema.indexes == { 'a1': 0, 'a2': 1 }
+        assert len(schema) == 2
+        assert str(schema) == "['a1', 'a2']"
+
+    def test_extended(self):
+        schema = ArticulationSchema.intern(['a1'])
+        assert schema.extended('a2') is ArticulationSchema.intern(['a1', 'a2'])
+
+    def test_repeated(self):
+        with pytest.raises(RepeatedArticulationError):
+            ArticulationSchema.intern(['a1', 'a1'])
+
+    def test_pickle(self):
+        schema = ArticulationSchema.intern(['a1', 'a2'])
+        assert loads(dumps(schema)) is schema
+
+# pylint: enable=missing-module-docstring, missing-class-docstring, missing-function-docstring
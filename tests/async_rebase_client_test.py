@@ -0,0 +1,121 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring, missing-function-docstring
+
+import asyncio
+from json import loads
+from threading import Lock
+from time import sleep
+import pytest
+
+from src.python_rebase.async_rebase_client import AsyncReBaseClient
+from src.python_rebase.api_response import APIResponse
+from src.python_rebase.movement import Movement
+from src.python_rebase.missing_attribute_error import MissingAttributeError
+from tests.stub_server import StubServer
+
+class ConcurrencyCounter: # pylint: disable=too-few-public-methods
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self.lock = Lock()
+
+    def __call__(self, request):
+        with self.lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+        sleep(0.05)
+        with self.lock:
+            self.current -= 1
+        return 200, { 'status': 0, 'movement': { 'id': request.path.split('/')[-1] } }
+
+class TestAsyncReBaseClient:
+    def test_init(self):
+        client = AsyncReBaseClient('test@gmail.com', 'authtoken')
+
+        assert client.user_email == 'test@gmail.com'
+        assert client.user_token == 'authtoken'
+
+        with pytest.raises(ValueError):
+            AsyncReBaseClient('test@gmail.com', 'authtoken', max_concurrency=0)
+        with pytest.raises(ValueError):
+            AsyncReBaseClient(None, 'authtoken')
+
+    def test_requests(self):
+        async def run(url):
+            async with AsyncReBaseClient('test@gmail.com', 'authtoken', server_url=url) as client:
+                find = await client.find_movement('42')
+                insert = await client.insert_movement(Movement({ 'label': 'test' }))
+                with pytest.raises(MissingAttributeError):
+                    await client.find_session('')
+                return find, insert
+
+        with StubServer(lambda request: (200, { 'status': 0, 'movement': { 'id': '42' } })) as server:
+            find, insert = asyncio.run(run(server.url))
+
+            assert find.response_type == APIResponse.ResponseType.FIND_MOVEMENT
+            assert isinstance(find.get_data('movement'), Movement)
+            assert find.get_data('movement').id == '42'
+            assert insert.response_type == APIResponse.ResponseType.INSERT_MOVEMENT
+            assert server.requests[1].method == 'POST'
+
+    def test_bounded_concurrency(self):
+        async def run(url):
+            async with AsyncReBaseClient('test@gmail.com', 'authtoken', max_concurrency=4, server_url=url) as client:
+                return await asyncio.gather(*(client.find_movement(str(i)) for i in range(1, 21)))
+
+        counter = ConcurrencyCounter()
+        with StubServer(counter) as server:
+            responses = asyncio.run(run(server.url))
+
+        assert [response.get_data('movement').id for response in responses] == [str(i) for i in range(1, 21)]
+        assert 1 < counter.peak <= 4
+
+    def test_coalesced_requests(self):
+        async def run(url):
+            async with AsyncReBaseClient('test@gmail.com', 'authtoken', max_concurrency=8, server_url=url) as client:
+                responses = await asyncio.gather(*(client.find_session('s1', deep=True) for _ in range(8)))
+                return responses, client.coalesced_requests
+
+        def responder(request): # pylint: disable=unused-argument
+            sleep(0.2)
+            return 200, { 'status': 0, 'session': { 'id': 's1' } }
+
+        with StubServer(responder) as server:
+            responses, coalesced = asyncio.run(run(server.url))
+
+        assert len(server.requests) + coalesced == 8
+        assert len(server.requests) < 8
+        assert len({ id(response.get_data('session')) for response in responses }) == 8
+
+    def test_find_many(self):
+        async def run(url):
+            async with AsyncReBaseClient('test@gmail.com', 'authtoken', max_concurrency=8, server_url=url) as client:
+                movements = await client.find_movements(['1', '2', '1', '3'], width=2)
+                with pytest.raises(MissingAttributeError, match='session id'):
+                    await client.find_sessions([None])
+                with pytest.raises(ValueError):
+                    await client.find_movements(['1'], width=0)
+                return movements
+
+        counter = ConcurrencyCounter()
+        with StubServer(counter) as server:
+            movements = asyncio.run(run(server.url))
+
+        assert list(movements) == ['1', '2', '3']
+        assert [response.get_data('movement').id for response in movements.values()] == ['1', '2', '3']
+        assert len(server.requests) == 3
+        assert counter.peak <= 2
+
+    def test_insert_movements(self):
+        async def run(url):
+            async with AsyncReBaseClient('test@gmail.com', 'authtoken', max_concurrency=3, server_url=url) as client:
+                for max_in_flight in (0, -1):
+                    with pytest.raises(ValueError):
+                        await client.insert_movements([Movement()], max_in_flight)
+                return await client.insert_movements(Movement({ 'label': str(i) }) for i in range(10))
+
+        with StubServer(lambda request: (201, { 'status': 0, 'movement': { 'id': loads(request.body)['movement']['label'] } })) as server:
+            responses = asyncio.run(run(server.url))
+
+        assert [response.get_data('movement').id for response in responses] == [str(i) for i in range(10)]
+
+# pylint: enable=missing-module-docstring, missing-class-docstring, missing-function-docstring
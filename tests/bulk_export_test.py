@@ -0,0 +1,115 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring, missing-function-docstring
+
+from json import loads
+import pytest
+
+from src.python_rebase.bulk_export import BulkExporter, CHECKPOINT_FILE, JSONL_FILE
+from src.python_rebase.failed_request_error import FailedRequestError
+from src.python_rebase.rebase_client import ReBaseClient
+from tests.stub_server import StubServer
+
+def movement_dict(i: int) -> dict:
+    return { 'id': f'{i:04d}', 'label': 'test', 'fps': 2, 'articulations': ['a1', 'a2'],
+             'registers': [{ 'a1': [float(i), float(j), 3.0], 'a2': [4.0, 5.0, 6.5] } for j in range(3)] }
+
+class Responder: # pylint: disable=too-few-public-methods
+    def __init__(self, total: int):
+        self.movements = [movement_dict(i) for i in range(total)]
+        self.fail_after = None
+
+    def __call__(self, request):
+        per = int(request.query['per'][0])
+        previous_id = request.query.get('previousId', [''])[0]
+        if self.fail_after is not None and previous_id >= self.fail_after:
+            return 500, { 'status': 1, 'error': 'server error' }
+        return 200, { 'status': 0, 'movements': [m for m in self.movements if m['id'] > previous_id][:per] }
+
+class TestBulkExport:
+    def test_jsonl(self, tmp_path):
+        responder = Responder(10)
+        with StubServer(responder) as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client:
+            report = BulkExporter(client, tmp_path, per=4, writers=2).run()
+
+        assert report.exported == 10
+        assert not report.resumed
+        lines = (tmp_path / JSONL_FILE).read_text(encoding='utf-8').splitlines()
+        assert [loads(line) for line in lines] == [{ **m, 'numberOfRegisters': 3, 'duration': 1.5 } for m in responder.movements]
+        assert report.bytes_written == (tmp_path / JSONL_FILE).stat().st_size
+        assert not (tmp_path / CHECKPOINT_FILE).exists()
+
+    def test_resume(self, tmp_path):
+        responder = Responder(10)
+        reports = []
+        with StubServer(responder) as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client:
+            exporter = BulkExporter(client, tmp_path, per=3, prefetch=False, progress=lambda report: reports.append(report.exported))
+            responder.fail_after = '0005'
+            with pytest.raises(FailedRequestError):
+                exporter.run()
+            assert (tmp_path / CHECKPOINT_FILE).exists()
+
+            # Uma linha escrita pela metade depois do checkpoint é descartada
+            with open(tmp_path / JSONL_FILE, 'ab') as file:
+                file.write(b'{"id": "0006", "lab')
+
+            with pytest.raises(ValueError):
+                BulkExporter(client, tmp_path, professional_id='other').run()
+
+            responder.fail_after = None
+            report = exporter.run()
+
+        assert report.resumed
+        assert report.exported == 4
+        assert reports == [3, 6, 3, 4]
+        lines = (tmp_path / JSONL_FILE).read_text(encoding='utf-8').splitlines()
+        assert [loads(line)['id'] for line in lines] == [f'{i:04d}' for i in range(10)]
+
+    @pytest.mark.parametrize('size', [None, 10])
+    def test_resume_lost_output(self, tmp_path, size):
+        responder = Responder(10)
+        with StubServer(responder) as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client:
+            exporter = BulkExporter(client, tmp_path, per=3, prefetch=False)
+            responder.fail_after = '0005'
+            with pytest.raises(FailedRequestError):
+                exporter.run()
+
+            # A saída perdeu linhas que o checkpoint considera exportadas, então a exportação recomeça do início
+            if size is None: (tmp_path / JSONL_FILE).unlink()
+            else: (tmp_path / JSONL_FILE).write_bytes((tmp_path / JSONL_FILE).read_bytes()[:size])
+
+            responder.fail_after = None
+            report = exporter.run()
+
+        assert not report.resumed
+        assert report.exported == 10
+        content = (tmp_path / JSONL_FILE).read_bytes()
+        assert b'\0' not in content
+        assert [loads(line)['id'] for line in content.decode('utf-8').splitlines()] == [f'{i:04d}' for i in range(10)]
+
+    def test_npz(self, tmp_path):
+        np = pytest.importorskip('numpy')
+        with StubServer(Responder(5)) as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client:
+            report = BulkExporter(client, tmp_path, 'npz', per=2, compress=True).run()
+
+        assert report.exported == 5
+        with np.load(tmp_path / '0003.npz') as data:
+            assert data['frames'].shape == (3, 2, 3)
+            assert data['frames'][2].tolist() == [[3, 2, 3], [4, 5, 6.5]]
+            assert data['articulations'].tolist() == ['a1', 'a2']
+            assert loads(str(data['metadata']))['label'] == 'test'
+        assert sorted(path.name for path in tmp_path.iterdir()) == [f'{i:04d}.npz' for i in range(5)]
+
+    def test_empty(self, tmp_path):
+        with StubServer(Responder(0)) as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client:
+            report = BulkExporter(client, tmp_path, per=4).run()
+
+        assert report.exported == 0
+        assert (tmp_path / JSONL_FILE).read_bytes() == b''
+        assert not (tmp_path / CHECKPOINT_FILE).exists()
+
+    def test_errors(self, tmp_path):
+        with pytest.raises(ValueError):
+            BulkExporter(None, tmp_path, 'csv')
+        with pytest.raises(ValueError):
+            BulkExporter(None, tmp_path, writers=0)
+
+# pylint: enable=missing-module-docstring, missing-class-docstring, missing-function-docstring
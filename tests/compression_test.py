@@ -0,0 +1,44 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring, missing-function-docstring
+
+import gzip
+import zlib
+
+from src.python_rebase.compression import CompressionStats, compress_body, iter_compressed
+
+class TestCompression:
+    def test_compress_body(self):
+        body = b'{"registers": [' + b', '.join(b'[0.1, 0.2, 0.3]' for _ in range(1000)) + b']}'
+        stats = CompressionStats()
+
+        assert gzip.decompress(compress_body(body, 'gzip', stats)) == body
+        assert zlib.decompress(compress_body(body, 'deflate', stats)) == body
+        assert stats.compressed_requests == 2
+        assert stats.original_bytes == 2 * len(body)
+        assert stats.ratio > 10
+
+    def test_iter_compressed(self):
+        chunks = [f'[{i}, {i}, {i}]'.encode('utf-8') * 100 for i in range(50)]
+        stats = CompressionStats()
+        compressed = list(iter_compressed(iter(chunks), 'gzip', stats))
+
+        assert all(len(chunk) > 0 for chunk in compressed[:-1])
+        assert gzip.decompress(b''.join(compressed)) == b''.join(chunks)
+        assert stats.compressed_bytes == sum(len(chunk) for chunk in compressed)
+        assert stats.original_bytes == sum(len(chunk) for chunk in chunks)
+
+    def test_stats(self):
+        stats = CompressionStats()
+        assert stats.ratio is None
+        assert stats.response_ratio is None
+
+        stats.record_request(100, 25, 0.5)
+        stats.record_uncompressed_request()
+        stats.record_response(300, 100)
+        assert stats.ratio == 4
+        assert stats.response_ratio == 3
+        assert stats.uncompressed_requests == 1
+
+        stats.reset()
+        assert stats.compressed_requests == stats.compressed_responses == stats.original_bytes == 0
+
+# pylint: enable=missing-module-docstring, missing-class-docstring, missing-function-docstring
@@ -0,0 +1,47 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring, missing-function-docstring
+
+from json import dumps
+import pytest
+
+from src.python_rebase.json_stream import iter_array_items
+
+def chunked(text: str, size: int):
+    data = text.encode('utf-8')
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+class TestJsonStream:
+    def test_iter_array_items(self):
+        items = [{ 'id': i, 'label': f'move "{i}" [{{ ]}}', 'registers': [{ 'a1': [i, 2.5, -3e-2] }] } for i in range(5)]
+        document = dumps({ 'status': 0, 'meta': { 'note': 'movements', 'list': [1, [2]] }, 'movements': items, 'tail': 'ignored' })
+
+        for size in (1, 3, 7, 4096):
+            assert list(iter_array_items(chunked(document, size), 'movements')) == items
+
+    def test_unicode_and_strings(self):
+        items = ['ação', 'çã\\"', 12, None, True, { 'é': 'ü' }]
+        document = dumps({ 'sessions': items }, ensure_ascii=False)
+
+        assert list(iter_array_items(chunked(document, 1), 'sessions')) == items
+        assert list(iter_array_items([document], 'sessions')) == items
+
+    def test_missing_and_empty(self):
+        assert not list(iter_array_items([b'{"status": 0}'], 'movements'))
+        assert not list(iter_array_items([b'{"movements": []}'], 'movements'))
+        assert not list(iter_array_items([b'{}'], 'movements'))
+
+    def test_incremental(self):
+        def chunks():
+            yield b'{"movements": [{"id": 1}, '
+            raise AssertionError('the first item should be yielded before reading further')
+
+        items = iter_array_items(chunks(), 'movements')
+        assert next(items) == { 'id': 1 }
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            list(iter_array_items([b'[1, 2]'], 'movements'))
+
+        with pytest.raises(ValueError):
+            list(iter_array_items([b'{"movements": [{"id": 1}, {"id"'], 'movements'))
+
+# pylint: enable=missing-module-docstring, missing-class-docstring, missing-function-docstring
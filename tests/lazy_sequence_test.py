@@ -0,0 +1,76 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring, missing-function-docstring
+
+import pytest
+
+from src.python_rebase.lazy_sequence import LazySequence, RemoteSequence
+
+class TestLazySequence:
+    def test_lazy_build(self):
+        calls = []
+        def factory(item):
+            calls.append(item)
+            return item * 10
+
+        sequence = LazySequence([1, 2, 3, 4], factory)
+        assert len(sequence) == 4
+        assert sequence.built_count == 0
+
+        assert sequence[2] == 30
+        assert sequence[-1] == 40
+        assert sequence[2] == 30
+        assert calls == [3, 4]
+        assert sequence.is_built(2)
+        assert not sequence.is_built(0)
+
+        assert sequence[0:2] == [10, 20]
+        assert list(sequence) == [10, 20, 30, 40]
+        assert calls == [3, 4, 1, 2]
+
+        with pytest.raises(IndexError):
+            sequence[4] # pylint: disable=pointless-statement
+
+    def test_mutation(self):
+        sequence = LazySequence([1, 2], lambda item: item if isinstance(item, str) else str(item))
+        sequence.append(3)
+        sequence.insert(0, 0)
+        sequence[1] = 'one'
+        del sequence[2]
+
+        assert sequence == ['0', 'one', '3']
+        assert sequence != ['0', 'one']
+        assert sequence != 'one'
+        assert str(sequence) == "['0', 'one', '3']"
+
+    def test_extend(self):
+        first = LazySequence([1, 2], lambda item: item * 2)
+        second = LazySequence([3, 4], lambda item: item * 2)
+        second[0] # pylint: disable=pointless-statement
+
+        first.extend(second)
+        assert first.built_count == 1
+        assert first == [2, 4, 6, 8]
+
+        first.extend([5])
+        assert first[-1] == 10
+
+    def test_remote_sequence(self):
+        calls = []
+        def find(item):
+            calls.append(item)
+            return item.upper()
+
+        sequence = RemoteSequence(['a', 'b', 'c', 'd', 'e'], find, prefetch=2)
+        assert sequence[3] == 'D'
+        assert calls == ['d']
+
+        iterator = iter(sequence)
+        assert next(iterator) == 'A'
+        iterator.close()
+        assert sequence.is_built(1) and 'd' not in calls[1:]
+        assert list(sequence) == ['A', 'B', 'C', 'D', 'E']
+        assert sorted(calls) == ['a', 'b', 'c', 'd', 'e']
+
+        with pytest.raises(ValueError):
+            RemoteSequence([], find, prefetch=-1)
+
+# pylint: enable=missing-module-docstring, missing-class-docstring, missing-function-docstring
@@ -0,0 +1,100 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring, missing-function-docstring
+
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+
+from src.python_rebase.lazy_sequence import RemoteSequence
+from src.python_rebase.local_store import LocalStore
+from src.python_rebase.missing_attribute_error import MissingAttributeError
+from src.python_rebase.movement import Movement
+from src.python_rebase.register import Register
+from src.python_rebase.session import Session
+
+def create_movement(i: int, **properties) -> Movement:
+    articulations = ['a1', 'a2'] if i % 2 == 0 else ['a2', 'a3']
+    return Movement({ 'id': f'{i:03}', 'label': f'label{i % 3}', 'professionalId': f'prof{i % 2}', 'patientId': 'patient', 'fps': 2,
+                      'registers': [{ art: [i + 0.5, float(j), -1.0] for art in articulations } for j in range(4)], **properties })
+
+def ids(response) -> list:
+    key = 'movements' if response.has_data('movements') else 'sessions'
+    return [item.id for item in response.get_data(key)]
+
+class TestLocalStore:
+    def test_put_get(self, tmp_path):
+        movement = create_movement(1, app={ 'code': 'app', 'data': 'data' })
+        with LocalStore(tmp_path / 'store.db') as store:
+            store.put_movement(movement)
+            store.put_movement(create_movement(1, label='replaced'))
+
+        with LocalStore(tmp_path / 'store.db') as store:
+            loaded = store.get_movement('001')
+            assert loaded.label == 'replaced'
+            assert loaded.registers[3] == Register({ 'a2': [1.5, 3, -1], 'a3': [1.5, 3, -1] })
+            assert loaded.number_of_registers == 4
+            assert loaded.duration == 2
+            assert store.get_movement('002') is None
+            assert ids(store.fetch_movements(movement_label='replaced')) == ['001']
+
+            store.delete_movement('001')
+            assert store.get_movement('001') is None
+            assert ids(store.fetch_movements(articulations=['a2'])) == []
+
+            with pytest.raises(MissingAttributeError):
+                store.put_movement(Movement({ 'label': 'test' }))
+
+    def test_fetch_movements(self):
+        store = LocalStore()
+        store.put_movements(create_movement(i) for i in range(10))
+
+        assert ids(store.fetch_movements()) == [f'{i:03}' for i in range(10)]
+        assert ids(store.fetch_movements(professional_id='prof1')) == ['001', '003', '005', '007', '009']
+        assert ids(store.fetch_movements('prof0', 'patient', 'label0')) == ['000', '006']
+        assert ids(store.fetch_movements(articulations=['a1', 'a2'])) == ['000', '002', '004', '006', '008']
+        assert ids(store.fetch_movements(articulations=['a1', 'a3'])) == []
+        assert len(ids(store.fetch_movements(articulations=['a2']))) == 10
+
+        response = store.fetch_movements(professional_id='prof0', page=2, per=2)
+        assert response.success
+        assert ids(response) == ['004', '006']
+        assert response.get_meta_data('total_count') == 5
+        assert response.get_meta_data('total_page_count') == 3
+        assert ids(store.fetch_movements(per=3, previous_id='004')) == ['005', '006', '007']
+
+        # Os Registros só são lidos quando o Movimento é acessado
+        movements = store.fetch_movements().get_data('movements')
+        assert movements.built_count == 0
+        assert movements[5].to_json() == create_movement(5).to_json()
+
+        with pytest.raises(ValueError):
+            store.fetch_movements(legacy=True)
+
+    def test_sessions(self):
+        store = LocalStore(dtype='float32')
+        sessions = [Session({ 'id': f'{i}', 'professionalId': 'prof', 'patientId': f'patient{i}',
+                              'movements': [create_movement(10 * i + j).to_dict() for j in range(3)] }) for i in range(3)]
+        lazy = Session({ 'id': '3', 'movementIds': ['900', '901'] })
+        lazy.movements = RemoteSequence(lazy.movement_ids, lambda _: pytest.fail('Movements must not be fetched'))
+        store.put_sessions(sessions + [lazy])
+
+        assert ids(store.fetch_sessions(professional_id='prof')) == ['0', '1', '2']
+        assert ids(store.fetch_sessions(patient_id='patient1')) == ['1']
+
+        session = store.get_session('1')
+        assert session.movement_ids == ['010', '011', '012']
+        assert session.movements == []
+        assert store.get_session('3').movement_ids == ['900', '901']
+
+        session = store.fetch_sessions(patient_id='patient2', deep=True, articulations=['a3']).get_data('sessions')[0]
+        assert [movement.id for movement in session.movements] == ['021']
+        assert session.movements[0].registers[0].to_list() == [21.5, 0, -1] * 2
+        assert store.get_movement('012').session_id is None
+        assert ids(store.fetch_movements(professional_id='prof0', patient_id='patient')) == ['000', '002', '010', '012', '020', '022']
+
+    def test_threads(self):
+        store = LocalStore()
+        with ThreadPoolExecutor(4) as executor:
+            list(executor.map(store.put_movement, (create_movement(i) for i in range(20))))
+            movements = store.fetch_movements().get_data('movements')
+            assert list(executor.map(lambda i: movements[i].registers[0].to_list()[0], range(20))) == [i + 0.5 for i in range(20)]
+
+# pylint: enable=missing-module-docstring, missing-class-docstring, missing-function-docstring
@@ -0,0 +1,102 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring, missing-function-docstring
+
+import pytest
+
+from src.python_rebase import movement as movement_module
+from src.python_rebase.movement import Movement
+from src.python_rebase.movement_file import read_movement_header
+from src.python_rebase.register import Register
+
+def create_movement(frames: int = 5) -> Movement:
+    return Movement({ 'id': '1', 'label': 'test', 'fps': 2, 'app': { 'code': 'app', 'data': { 'a': [1] } },
+                      'registers': [{ 'a1': [i + 0.25, 2.5, 3.0], 'a2': [4.0, 5.0, -6.5] } for i in range(frames)] })
+
+class TestMovementFile:
+    def test_save_load(self, tmp_path, monkeypatch):
+        path = tmp_path / 'movement.rbm'
+        movement = create_movement()
+        movement.save(path)
+
+        header = read_movement_header(path)
+        assert header.frames == 5
+        assert header.articulations == ['a1', 'a2']
+        assert header.offset % 64 == 0
+        assert path.stat().st_size == header.offset + 5 * 2 * 3 * 8
+
+        expected = movement.to_json()
+        assert Movement.load(path, mmap=False).to_json() == expected
+
+        monkeypatch.setattr(movement_module, 'np', None)
+        loaded = Movement.load(path)
+        assert loaded.to_json() == expected
+        assert loaded.registers[4] == Register({ 'a1': [4.25, 2.5, 3], 'a2': [4, 5, -6.5] })
+        assert loaded.app_data == { 'a': [1] }
+        assert loaded.duration == 2.5
+
+        # Valores ausentes são gravados como zero, como nas Rotações
+        Movement({ 'registers': [{ 'a1': [1, None, 3] }] }).save(path)
+        assert Movement.load(path).registers[0].to_list() == [1, 0, 3]
+
+    def test_bytes(self, monkeypatch):
+        movement = create_movement()
+        data = movement.to_bytes()
+        assert len(data) == 5 * 2 * 3 * 8
+        assert len(movement.to_bytes('float32')) == len(data) // 2
+
+        properties = movement.to_dict(exclude=['registers'])
+        assert Movement.from_bytes(data, properties).to_json() == movement.to_json()
+        monkeypatch.setattr(movement_module, 'np', None)
+        assert Movement.from_bytes(data, properties).to_json() == movement.to_json()
+        assert Movement.from_bytes(movement.to_bytes('float32'), properties, 'float32').registers[2].to_list() == [2.25, 2.5, 3, 4, 5, -6.5]
+
+    def test_float32(self, tmp_path):
+        path = tmp_path / 'movement.rbm'
+        create_movement().save(path, dtype='float32')
+
+        header = read_movement_header(path)
+        assert header.itemsize == 4
+        assert Movement.load(path).registers[1].to_list() == [1.25, 2.5, 3, 4, 5, -6.5]
+
+        with pytest.raises(ValueError):
+            create_movement().save(path, dtype='int8')
+
+    def test_empty(self, tmp_path):
+        path = tmp_path / 'movement.rbm'
+        Movement({ 'label': 'empty' }).save(path)
+
+        loaded = Movement.load(path)
+        assert loaded.label == 'empty'
+        assert len(loaded.registers) == 0
+
+    def test_invalid_file(self, tmp_path):
+        path = tmp_path / 'movement.rbm'
+        path.write_bytes(b'{"label": "test"}')
+        with pytest.raises(ValueError):
+            Movement.load(path)
+
+        create_movement().save(path)
+        path.write_bytes(path.read_bytes()[:-8])
+        with pytest.raises(ValueError):
+            Movement.load(path)
+
+    def test_mmap(self, tmp_path):
+        np = pytest.importorskip('numpy')
+        path = tmp_path / 'movement.rbm'
+        frames = np.random.default_rng(0).uniform(-180, 180, (100, 3, 3))
+        Movement.from_numpy(frames, ['a1', 'a2', 'a3'], { 'fps': 10 }).save(path)
+
+        loaded = Movement.load(path)
+        base = loaded.to_numpy()
+        while base is not None and not isinstance(base, np.memmap): base = base.base
+        assert base is not None
+        assert np.array_equal(loaded.to_numpy(), frames)
+        assert loaded.duration == 10
+
+        # As alterações ficam na memória e não chegam ao arquivo
+        loaded.to_numpy()[0] = 0
+        assert np.array_equal(Movement.load(path).to_numpy(), frames)
+
+        loaded.save(tmp_path / 'copy.rbm', dtype='float32')
+        assert Movement.load(tmp_path / 'copy.rbm').to_numpy().dtype == np.float32
+
+# pylint: enable=missing-module-docstring, missing-class-docstring, missing-function-docstring
@@ -1,10 +1,14 @@
 # pylint: disable=missing-module-docstring, missing-class-docstring, missing-function-docstring
 
+from json import loads
+import pickle
 import pytest
 
 from src.python_rebase.movement import Movement
 from src.python_rebase.register import Register
+from src.python_rebase.rotation import Rotation
 from src.python_rebase.mismatched_articulations_error import MismatchedArticulationsError
+from src.python_rebase.repeated_articulation_error import RepeatedArticulationError
 
 class TestMovement:
     def test_init(self):
@@ -24,6 +28,26 @@ class TestMovement:
         with pytest.raises(ValueError):
             Movement({ 'label': [], 'device': 2 })
 
+    def test_trusted_init(self):
+        registers = [{ 'a1': [i, 0, 0], 'a2': [0, i, 0] } for i in range(10)]
+        movement = Movement({ 'label': 'test', 'fps': 10, 'articulations': ['a1', 'a2'], 'registers': registers }, trusted=True)
+
+        assert movement.label == 'test'
+        assert movement.articulations == ['a1', 'a2']
+        assert movement.registers.built_count == 0 # pylint: disable=no-member
+        assert movement.registers[3] == Register({ 'a1': [3, 0, 0], 'a2': [0, 3, 0] })
+        assert movement.schema is movement.registers[3].schema
+
+        untitled = Movement({ 'registers': registers }, trusted=True)
+        assert untitled.articulations == ['a1', 'a2']
+
+        # Dicionários confiáveis não são validados, mas as articulações dos Registros são
+        Movement({ 'label': [], 'invalid': 'key' }, trusted=True)
+        with pytest.raises(MismatchedArticulationsError):
+            Movement({ 'articulations': ['a', 'b'], 'registers': [{ 'b': [1, 2, 3], 'a': [4, 5, 6] }] }, trusted=True)
+        with pytest.raises(MismatchedArticulationsError):
+            Movement({ 'registers': [{ 'a': [1, 2, 3] }, { 'b': [4, 5, 6] }] }, trusted=True)
+
     def test_init_with_data(self):
         with pytest.raises(MismatchedArticulationsError):
             movement = Movement({ 'articulations': ['a2'], 'registers': [{ 'a1': [1, 2, 3] }] })
@@ -36,6 +60,14 @@ class TestMovement:
         assert movement.articulations == ['a1']
         assert movement.registers[0] == Register({ 'a1': [1, 2, 3] })
 
+        # As rotações são verificadas na construção, mesmo que os Registros só sejam construídos ao serem acessados
+        for rotation in ('bad', [1, 2], [1, 'x', 3], { 'x': 1 }):
+            with pytest.raises(TypeError):
+                Movement({ 'registers': [{ 'a1': [1, 2, 3] }, { 'a1': rotation }] })
+        with pytest.raises(TypeError):
+            Movement({ 'articulations': ['a1'] }).registers = [{ 'a1': 'bad' }]
+        assert Movement({ 'registers': [{ 'a1': [None, 2, 3] }, { 'a1': [1, 2, 3, 4] }] }).registers[1] == Register({ 'a1': [1, 2, 3] })
+
     def test_registers(self):
         movement_a = Movement({ 'articulations': ['a1', 'a2'] })
         movement_a.registers = [{ 'a1': [1, 2, 3], 'a2': [4, 5, 6] }]
@@ -65,6 +97,42 @@ class TestMovement:
         assert len(movement.registers) == 2
         assert movement.registers[1] == Register({ 'a1': [4, 5, 6] })
 
+    def test_lazy_registers(self):
+        registers = [{ 'a1': [i, i + 1, i + 2], 'a2': Rotation(i, 0, 0) } for i in range(100)]
+        movement = Movement({ 'fps': 10, 'articulations': ['a1', 'a2'], 'registers': registers })
+
+        assert movement.number_of_registers == 100
+        assert movement.duration == 10
+        assert movement.registers.built_count == 0 # pylint: disable=no-member
+
+        movement_json = loads(movement.to_json())
+        assert movement_json['movement']['registers'][5] == { 'a1': [5, 6, 7], 'a2': [5, 0, 0] }
+        assert movement.registers.built_count == 0 # pylint: disable=no-member
+
+        assert movement.registers[10] == Register({ 'a1': [10, 11, 12], 'a2': [10, 0, 0] })
+        assert movement.registers[-1]['a1'] == Rotation(99, 100, 101)
+        assert [register['a1'].x for register in movement.registers[20:23]] == [20, 21, 22]
+        assert movement.registers.built_count == 5 # pylint: disable=no-member
+        assert len(list(movement.registers)) == 100
+
+    def test_schema_validation(self):
+        movement = Movement({ 'articulations': ['a1', 'a2'], 'registers': [{ 'a1': [1, 2, 3], 'a2': [4, 5, 6] }] })
+        movement.add_register(Register(['a1', 'a2']))
+
+        assert movement.schema is movement.registers[0].schema is movement.registers[1].schema
+        assert movement.articulations == ['a1', 'a2']
+
+        with pytest.raises(MismatchedArticulationsError) as error:
+            movement.add_register({ 'a2': [1, 2, 3], 'a1': [4, 5, 6] })
+        assert error.value.list_1 == ['a1', 'a2']
+        assert error.value.list_2 == ['a2', 'a1']
+
+        with pytest.raises(MismatchedArticulationsError):
+            Movement({ 'articulations': ['a1'], 'registers': [{ 'a1': [1, 2, 3] }, Register({ 'a2': [1, 2, 3] })] })
+
+        with pytest.raises(RepeatedArticulationError):
+            Movement({ 'articulations': ['a1', 'a1'] })
+
     def test_conversions(self):
         original_dict = { 'label': 'test', 'fps': 30, 'articulations': ['a1'], 'registers': [Register({ 'a1': [1, 2, 3] })] }
         expected_str = "{'label': 'test', 'articulations': ['a1'], 'fps': 30, 'duration': 0.03333333333333333, 'numberOfRegisters': 1, 'registers': [{'a1': [1, 2, 3]}]}"
@@ -88,4 +156,21 @@ class TestMovement:
         assert movement.to_json(update=False) == expected_json
         assert movement.to_json(update=True) == expected_update_json
 
+    def test_pickle(self):
+        registers = [{ 'a1': [i + 0.5, 2.5, 3.5], 'a2': [4.5, 5.5, 6.5] } for i in range(10)]
+        movement = Movement({ 'label': 'test', 'fps': 2, 'registers': registers })
+        movement.registers[2]['a1'] = Rotation(7.5, 8.5, 9.5)
+
+        restored = pickle.loads(pickle.dumps(movement))
+        assert restored.to_json() == movement.to_json()
+        assert restored.registers.built_count == 0 # pylint: disable=no-member
+        assert restored.registers[2] == movement.registers[2]
+        assert restored.schema is movement.schema
+        assert b'Rotation' not in pickle.dumps(movement)
+
+        # Valores que não são floats mantêm o seu tipo
+        movement = Movement({ 'registers': [{ 'a1': [1, 2.5, None] }] })
+        assert pickle.loads(pickle.dumps(movement)).to_json() == movement.to_json()
+        assert pickle.loads(pickle.dumps(Movement())).to_dict() == {}
+
 # pylint: enable=missing-module-docstring, missing-class-docstring, missing-function-docstring
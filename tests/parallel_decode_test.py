@@ -0,0 +1,73 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring, missing-function-docstring
+
+from concurrent.futures import ThreadPoolExecutor
+from json import dumps, loads
+import pytest
+
+from src.python_rebase import parallel_decode
+from src.python_rebase.parallel_decode import split_items, pack_movement, unpack_movement, decode_parallel
+from src.python_rebase.movement import Movement
+from src.python_rebase.mismatched_articulations_error import MismatchedArticulationsError
+from src.python_rebase.register import Register
+from src.python_rebase.session import Session
+
+def movement_dict(i: int) -> dict:
+    return { 'id': str(i), 'label': f'label "[{i}]" {{', 'fps': 2, 'duration': 99,
+             'registers': [{ 'a1': [i + 0.5, 2.5, 3.0], 'a2': [4.0, 5.0, -6.25] } for _ in range(3)] }
+
+class TestParallelDecode:
+    def test_split_items(self):
+        movements = [movement_dict(i) for i in range(5)]
+        body = dumps({ 'status': 0, 'label': 'movements', 'movements': movements, 'meta': { 'a': [1, { 'b': [] }] } }).encode('utf-8')
+        skeleton, items = split_items(body, 'movements')
+
+        assert loads(skeleton) == { 'status': 0, 'label': 'movements', 'movements': [], 'meta': { 'a': [1, { 'b': [] }] } }
+        assert [loads(item) for item in items] == movements
+
+        assert split_items(b'{"movements": [{"a1": [1, 2, 3]}, {"a2": []}]}', 'movements')[1] == [b'{"a1": [1, 2, 3]}', b'{"a2": []}']
+        assert split_items(b'{"movements": []}', 'movements') is None
+        assert split_items(b'{"movements": [1, {}]}', 'movements') is None
+        assert split_items(b'{"sessions": [{}]}', 'movements') is None
+
+    def test_pack_movement(self, monkeypatch):
+        dictionary = movement_dict(1)
+        properties, frames = pack_movement(dictionary)
+        assert 'registers' not in properties
+        assert properties['articulations'] == ['a1', 'a2']
+        assert list(frames) == [1.5, 2.5, 3, 4, 5, -6.25] * 3
+
+        expected = Movement(movement_dict(1), trusted=True)
+        assert unpack_movement((properties, frames)).to_json() == expected.to_json()
+
+        monkeypatch.setattr(parallel_decode, 'np', None)
+        movement = unpack_movement((properties, frames))
+        assert movement.to_json() == expected.to_json()
+        assert movement.registers[1] == Register({ 'a1': [1.5, 2.5, 3], 'a2': [4, 5, -6.25] })
+        assert movement.duration == expected.duration == 1.5
+        assert unpack_movement(pack_movement({ **movement_dict(1), 'numberOfRegisters': 3 })).duration == 99
+
+        assert pack_movement({ 'registers': [{ 'a1': [1, None, 3] }] })[1] is None
+        assert pack_movement({ 'registers': [{ 'a1': [1, 2, 3, 4], 'a2': [5, 6] }] })[1] is None
+
+        # Registros com articulações fora de ordem ou diferentes não são empacotados e são verificados ao construir o Movimento
+        reordered = { 'articulations': ['a', 'b'], 'registers': [{ 'b': [1, 1, 1], 'a': [2, 2, 2] }] }
+        mismatched = { 'registers': [{ 'a': [1, 1, 1] }, { 'b': [2, 2, 2] }] }
+        for dictionary in (reordered, mismatched):
+            assert pack_movement(dictionary) == (dictionary, None)
+            with pytest.raises(MismatchedArticulationsError):
+                unpack_movement(pack_movement(dictionary))
+        assert pack_movement({ 'label': 'test' }) == ({ 'label': 'test' }, None)
+
+    def test_decode_parallel(self):
+        sessions = [{ 'id': str(i), 'movements': [movement_dict(j) for j in range(i)] } for i in range(6)]
+        body = dumps({ 'status': 0, 'sessions': sessions }).encode('utf-8')
+
+        with ThreadPoolExecutor(2) as executor:
+            data = decode_parallel(body, 'sessions', executor, 4)
+
+        assert [session.id for session in data['sessions']] == [str(i) for i in range(6)]
+        assert data['sessions'][5].to_json() == Session(loads(body)['sessions'][5], trusted=True).to_json()
+        assert data['sessions'][5].movements[4].id == '4'
+        assert decode_parallel(b'{"status": 0, "sessions": []}', 'sessions', None, 4) is None
+
+# pylint: enable=missing-module-docstring, missing-class-docstring, missing-function-docstring
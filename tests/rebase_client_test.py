@@ -1,10 +1,41 @@
 # pylint: disable=missing-module-docstring, missing-class-docstring, missing-function-docstring
 
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier, Event
+from json import dumps, loads
+import gzip
+import zlib
+from time import sleep
 import pytest
 
 from src.python_rebase.rebase_client import ReBaseClient
+from src.python_rebase.api_response import APIResponse
+from src.python_rebase.movement import Movement
+from src.python_rebase.session import Session
+from src.python_rebase.failed_request_error import FailedRequestError
+from src.python_rebase.missing_attribute_error import MissingAttributeError
+from tests.stub_server import StubServer
 
-class TestReBaseClient:
+def paginated_responder(key: str, total: int):
+    ids = [f'{i:04d}' for i in range(1, total + 1)]
+
+    def responder(request):
+        if request.query.get('movementLabel') == ['fail']:
+            return 500, { 'status': 1, 'error': 'server error' }
+
+        per = int(request.query.get('per', ['0'])[0]) or total
+        previous_id = request.query.get('previousId', [''])[0]
+        page = int(request.query.get('page', ['0'])[0])
+
+        if page > 0: selected = ids[(page - 1) * per:page * per]
+        else: selected = [i for i in ids if i > previous_id][:per]
+
+        meta = { 'current_page': page, 'total_count': total, 'total_page_count': -(-total // per) }
+        return 200, { 'status': 0, key: [{ 'id': i } for i in selected], 'meta': meta }
+
+    return responder
+
+class TestReBaseClient: # pylint: disable=too-many-public-methods
     def test_init(self):
         client = ReBaseClient('test@gmail.com', 'authtoken')
 
@@ -23,3 +54,424 @@ class TestReBaseClient:
             ReBaseClient('email', None)
         with pytest.raises(ValueError):
             ReBaseClient('email', 12)
+
+    def test_server_url(self):
+        client = ReBaseClient('test@gmail.com', 'authtoken', server_url='http://localhost:3030')
+        assert client.server_url == 'http://localhost:3030/'
+
+        with pytest.raises(ValueError):
+            ReBaseClient('test@gmail.com', 'authtoken', pool_maxsize=0)
+
+    def test_connection_reuse(self):
+        with StubServer() as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client:
+            for _ in range(5):
+                assert client.authenticate().success
+
+            assert len(server.requests) == 5
+            assert server.connection_count == 1
+            assert server.requests[0].path == '/auth'
+            assert server.requests[0].headers['rebase-user-email'] == 'test@gmail.com'
+            assert server.requests[0].headers['rebase-user-token'] == 'authtoken'
+
+        assert client.is_closed
+
+    def test_concurrent_requests(self):
+        with StubServer() as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url, pool_maxsize=4) as client:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                responses = list(executor.map(lambda _: client.find_movement('1'), range(40)))
+
+            assert all(response.success for response in responses)
+            assert all(response.response_type == APIResponse.ResponseType.FIND_MOVEMENT for response in responses)
+            assert server.connection_count <= 4
+
+    def test_credentials_update(self):
+        with StubServer() as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client:
+            client.authenticate()
+            client.user_token = 'newtoken'
+            client.authenticate()
+
+            assert server.requests[1].headers['rebase-user-token'] == 'newtoken'
+
+    def test_closed_client_reopens(self):
+        with StubServer() as server:
+            client = ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url)
+            client.authenticate()
+            client.close()
+            assert client.is_closed
+
+            assert client.authenticate().success
+            assert not client.is_closed
+            client.close()
+
+    def test_insert_movements(self):
+        def responder(request):
+            label = loads(request.body)['movement']['label']
+            if label == 'bad':
+                return 422, { 'status': 1, 'error': 'invalid movement' }
+            return 201, { 'status': 0, 'movement': { 'id': label } }
+
+        consumed = []
+        def movements():
+            for i in range(12):
+                consumed.append(i)
+                yield Movement({ 'label': 'bad' if i == 5 else str(i) })
+
+        with StubServer(responder) as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client:
+            responses = client.insert_movements(movements(), max_in_flight=3)
+
+        assert len(responses) == 12
+        assert not responses[5].success
+        assert responses[5].get_data('error') == 'invalid movement'
+        assert [response.get_data('movement').id for i, response in enumerate(responses) if i != 5] == [str(i) for i in range(12) if i != 5]
+        assert len(consumed) == 12
+
+    def test_insert_sessions(self):
+        with StubServer(lambda request: (201, { 'status': 0, 'session': loads(request.body)['session'] })) as server, \
+                ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client:
+            responses = client.insert_sessions((Session({ 'title': str(i) }) for i in range(6)), max_in_flight=2)
+
+        assert [response.get_data('session').title for response in responses] == [str(i) for i in range(6)]
+
+    def test_chunked_uploads(self):
+        registers = [{ f'a{j}': [i * 0.1, j, -i] for j in range(20) } for i in range(2000)]
+        movement = Movement({ 'label': 'long', 'fps': 30, 'registers': registers })
+        session = Session({ 'title': 'many', 'movements': [movement, Movement({ 'label': 'short' })] })
+
+        with StubServer(lambda request: (201, { 'status': 0 })) as server:
+            with ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url, chunked_uploads=True) as client:
+                assert client.insert_movement(movement).success
+                assert client.insert_session(session).success
+                assert client.update_movement(Movement({ 'id': '1', 'label': 'x' })).success
+            with ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client:
+                assert client.insert_movement(movement).success
+
+        chunked_movement, chunked_session, update, plain = server.requests # pylint: disable=unbalanced-tuple-unpacking
+        assert chunked_movement.headers['Transfer-Encoding'] == 'chunked'
+        assert 'Content-Length' not in chunked_movement.headers
+        assert chunked_movement.body_chunks > 1
+        assert chunked_movement.body.decode('utf-8') == plain.body.decode('utf-8') == movement.to_json()
+        assert chunked_session.body.decode('utf-8') == session.to_json()
+        assert update.headers['Content-Length'] == str(len(update.body))
+        assert plain.headers['Content-Length'] == str(len(plain.body))
+        assert movement.registers.built_count == 0 # pylint: disable=no-member
+
+    def test_compressed_uploads(self):
+        movement = Movement({ 'label': 'long', 'fps': 30, 'registers': [{ 'a1': [i * 0.1, 0.5, -i] } for i in range(3000)] })
+        small = Movement({ 'id': '1', 'label': 'small' })
+
+        with pytest.raises(ValueError):
+            ReBaseClient('test@gmail.com', 'authtoken', compression='brotli')
+
+        with StubServer(lambda request: (201, { 'status': 0 })) as server:
+            with ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url, compression='gzip') as client:
+                assert client.insert_movement(movement).success
+                assert client.update_movement(small).success
+                stats = client.compression_stats
+            with ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url, compression='deflate',
+                              chunked_uploads=True, compression_threshold=10) as client:
+                assert client.insert_movement(movement).success
+                assert client.insert_movement(small).success
+                chunked_stats = client.compression_stats
+
+        gzipped, update, deflated, chunked_small = server.requests # pylint: disable=unbalanced-tuple-unpacking
+        assert gzipped.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(gzipped.body).decode('utf-8') == movement.to_json()
+        assert 'Content-Encoding' not in update.headers
+        assert update.body.decode('utf-8') == small.to_json(True)
+        assert deflated.headers['Content-Encoding'] == 'deflate'
+        assert deflated.headers['Transfer-Encoding'] == 'chunked'
+        assert zlib.decompress(deflated.body).decode('utf-8') == movement.to_json()
+        assert zlib.decompress(chunked_small.body).decode('utf-8') == small.to_json()
+
+        assert stats.compressed_requests == 1
+        assert stats.uncompressed_requests == 1
+        assert stats.compressed_bytes == len(gzipped.body)
+        assert stats.ratio > 3
+        assert chunked_stats.compressed_requests == 2
+        assert chunked_stats.compressed_bytes == len(deflated.body) + len(chunked_small.body)
+        assert chunked_stats.compression_time > 0
+
+    def test_compressed_responses(self):
+        payload = { 'status': 0, 'movements': [{ 'id': str(i), 'label': 'compressed' } for i in range(200)] }
+        body = gzip.compress(dumps(payload).encode('utf-8'))
+
+        with StubServer(lambda request: (200, body, { 'Content-Encoding': 'gzip' })) as server, \
+                ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client:
+            response = client.fetch_movements()
+            streamed = list(client.stream_movements())
+
+            assert 'gzip' in server.requests[0].headers['Accept-Encoding']
+            assert [movement.id for movement in response.get_data('movements')] == [str(i) for i in range(200)]
+            assert [movement.id for movement in streamed] == [str(i) for i in range(200)]
+            assert client.compression_stats.compressed_responses == 1
+            assert client.compression_stats.response_wire_bytes == len(body)
+            assert client.compression_stats.response_ratio > 3
+
+    def test_response_cache(self):
+        def responder(request):
+            resource, resource_id = request.path.strip('/').split('/')
+            if request.method != 'GET':
+                return 200, { 'status': 0 }
+            if resource == 'movement':
+                return 200, { 'status': 0, 'movement': { 'id': resource_id, 'sessionId': 's1', 'label': str(len(server.requests)) } }
+            if request.query.get('deep') == ['True']:
+                return 200, { 'status': 0, 'session': { 'id': resource_id, 'movements': [{ 'id': 'm1' }, { 'id': 'm2' }] } }
+            return 200, { 'status': 0, 'session': { 'id': resource_id, 'movementIds': ['m1', 'm2'] } }
+
+        with StubServer(responder) as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url, cache_entries=10) as client:
+            first = client.find_movement('m1')
+            second = client.find_movement('m1')
+            assert len(server.requests) == 1
+            assert first.get_data('movement') is not second.get_data('movement')
+            second.get_data('movement').label = 'changed'
+            assert client.find_movement('m1').get_data('movement').label == '1'
+
+            client.find_movement('m1', legacy=True)
+            client.find_session('s1')
+            client.find_session('s1', deep=True)
+            client.find_movement('m3')
+            assert len(server.requests) == 5
+            assert (client.cache.hits, client.cache.misses) == (2, 5)
+
+            client.update_movement(Movement({ 'id': 'm1', 'label': 'x' }))
+            assert ('MOVEMENT', 'm1', False, False) not in client.cache
+            assert ('SESSION', 's1', False, True) not in client.cache
+            assert ('MOVEMENT', 'm3', False, False) in client.cache
+
+            client.find_session('s1', deep=True)
+            client.update_session(Session({ 'id': 's1', 'title': 'x' }))
+            assert len(client.cache) == 1
+
+            client.find_session('s1', deep=True)
+            client.delete_session('s1')
+            assert ('MOVEMENT', 'm3', False, False) in client.cache
+
+            client.find_session('s1', deep=True)
+            client.find_movement('m2')
+            client.delete_session('s1', deep=True)
+            assert len(client.cache) == 0
+
+            client.find_movement('m1')
+            client.delete_movement('m1')
+            assert len(client.cache) == 0
+
+        with StubServer(lambda request: (404, { 'status': 1, 'error': 'not found' })) as server, \
+                ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url, cache_entries=10) as client:
+            assert not client.find_movement('missing').success
+            assert not client.find_movement('missing').success
+            assert len(server.requests) == 2
+
+    def test_invalidated_during_request(self):
+        arrived, release = Event(), Event()
+
+        def responder(request):
+            if request.method != 'GET':
+                return 200, { 'status': 0 }
+            # A leitura só é respondida depois que a atualização termina, com o Movimento antigo
+            label = str(len(server.requests))
+            if label == '1':
+                arrived.set()
+                release.wait(5)
+            return 200, { 'status': 0, 'movement': { 'id': 'm1', 'label': label } }
+
+        with StubServer(responder) as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url, cache_entries=10) as client, \
+                ThreadPoolExecutor(max_workers=2) as executor:
+            stale = executor.submit(client.find_movement, 'm1')
+            assert arrived.wait(5)
+            client.update_movement(Movement({ 'id': 'm1', 'label': 'x' }))
+            release.set()
+
+            assert stale.result().get_data('movement').label == '1'
+            assert ('MOVEMENT', 'm1', False, False) not in client.cache
+            assert client.cache.stale_puts == 1
+            assert client.find_movement('m1').get_data('movement').label == '3'
+            assert client.find_movement('m1').get_data('movement').label == '3'
+            assert len(server.requests) == 3
+
+    def test_coalesced_requests(self):
+        def responder(request):
+            sleep(0.2)
+            if request.path.endswith('/fail'):
+                return 500, { 'status': 1, 'error': 'server error' }
+            return 200, { 'status': 0, 'session': { 'id': 's1', 'movements': [{ 'id': 'm1', 'label': 'a' }] } }
+
+        def find(session_id: str, deep: bool = True) -> APIResponse:
+            barrier.wait()
+            return client.find_session(session_id, deep=deep)
+
+        barrier = Barrier(8)
+        with StubServer(responder) as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client, \
+                ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(executor.map(find, ['s1'] * 8))
+            assert len(server.requests) == 1
+            assert client.coalesced_requests == 7
+
+            sessions = [response.get_data('session') for response in responses]
+            assert len({ id(session) for session in sessions }) == 8
+            sessions[0].movements[0].label = 'changed'
+            assert all(session.movements[0].label == 'a' for session in sessions[1:])
+
+            responses = list(executor.map(find, ['s1'] * 4 + ['fail'] * 4))
+            assert len(server.requests) == 3
+            assert [response.success for response in responses] == [True] * 4 + [False] * 4
+            assert responses[5].get_data('error') == 'server error'
+
+            responses = list(executor.map(find, ['s1'] * 8, [True, False] * 4))
+            assert len(server.requests) == 5
+
+        barrier = Barrier(4)
+        with StubServer(responder) as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url, coalesce_requests=False) as client, \
+                ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(find, ['s1'] * 4))
+            assert len(server.requests) == 4
+
+    def test_find_many(self):
+        def responder(request):
+            resource, resource_id = request.path.strip('/').split('/')
+            sleep(0.1)
+            if resource_id == 'missing':
+                return 404, { 'status': 1, 'error': 'not found' }
+            return 200, { 'status': 0, resource: { 'id': resource_id, 'title' if resource == 'session' else 'label': request.query.get('deep', ['-'])[0] } }
+
+        with StubServer(responder) as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client:
+            ids = [str(i) for i in range(16)] + ['3', 'missing', '3']
+            movements = client.find_movements(ids, width=8)
+
+            assert list(movements) == [str(i) for i in range(16)] + ['missing']
+            assert len(server.requests) == 17
+            assert all(movements[str(i)].get_data('movement').id == str(i) for i in range(16))
+            assert not movements['missing'].success
+            assert movements['missing'].get_data('error') == 'not found'
+
+            sessions = client.find_sessions(['a', 'b'], deep=True)
+            assert [session.get_data('session').title for session in sessions.values()] == ['True', 'True']
+            assert not client.find_movements([])
+
+            with pytest.raises(MissingAttributeError):
+                client.find_movements(['1', ''])
+            with pytest.raises(ValueError):
+                client.find_sessions(['1'], width=0)
+
+    def test_lazy_session(self):
+        def responder(request):
+            resource, resource_id = request.path.strip('/').split('/')
+            if resource == 'session':
+                return 200, { 'status': 0, 'session': { 'id': resource_id, 'movementIds': [str(i) for i in range(50)] } }
+            if resource_id == '49':
+                return 404, { 'status': 1, 'error': 'not found' }
+            return 200, { 'status': 0, 'movement': { 'id': resource_id, 'label': request.query.get('legacy', ['-'])[0] } }
+
+        with StubServer(responder) as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client:
+            session = client.find_session('s1', lazy=True).get_data('session')
+            assert len(session.movements) == 50
+            assert len(server.requests) == 1
+
+            assert session.movements[7].id == '7'
+            assert len(server.requests) == 2
+            assert session.movements.built_count == 1
+
+            with pytest.raises(FailedRequestError):
+                list(session.movements)
+            assert [m.id for m in session.movements[:49]] == [str(i) for i in range(49)]
+            requests = len(server.requests)
+            assert session.to_json(True) == '{"session": {}}'
+            assert len(server.requests) == requests
+
+            session = client.find_session('s2', legacy=True).get_data('session')
+            assert session.movements == []
+            session.attach_client(client, legacy=True, prefetch=0)
+            assert session.movements[0].label == 'True'
+
+    def test_parallel_decode(self):
+        movements = [{ 'id': str(i), 'label': 'test', 'registers': [{ 'a1': [i, 2, 3] }] * 50 } for i in range(20)]
+        def responder(request):
+            if request.path.startswith('/session'):
+                return 200, { 'status': 0, 'sessions': [{ 'id': 's1', 'movements': movements }] }
+            return 200, { 'status': 0, 'movements': movements, 'meta': { 'page': 1 } }
+
+        with StubServer(responder) as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url, decode_processes=2, decode_threshold=1024) as client:
+            response = client.fetch_movements()
+            assert response.success
+            assert response.get_meta_data('page') == 1
+            assert [m.id for m in response.get_data('movements')] == [str(i) for i in range(20)]
+            assert response.get_data('movements')[7].registers[49]['a1'].x == 7
+
+            session = client.fetch_sessions(deep=True).get_data('sessions')[0]
+            assert session.movements[19].to_dict() == Movement(movements[19], trusted=True).to_dict()
+
+        with pytest.raises(ValueError):
+            ReBaseClient('test@gmail.com', 'authtoken', decode_processes=-1)
+
+    def test_iter_movements(self):
+        with StubServer(paginated_responder('movements', 25)) as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client:
+            movements = list(client.iter_movements(professional_id='p1', per=10))
+            assert [m.id for m in movements] == [f'{i:04d}' for i in range(1, 26)]
+            assert len(server.requests) == 3
+            assert server.requests[1].query['previousId'] == ['0010']
+            assert server.requests[1].query['professionalId'] == ['p1']
+
+            movements = list(client.iter_movements(per=5, previous_id='0020', prefetch=False))
+            assert [m.id for m in movements] == [f'{i:04d}' for i in range(21, 26)]
+
+            with pytest.raises(FailedRequestError):
+                list(client.iter_movements(movement_label='fail'))
+
+    def test_iter_movements_prefetch(self):
+        with StubServer(paginated_responder('movements', 30)) as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client:
+            movements = client.iter_movements(per=10)
+            next(movements)
+            for _ in range(20):
+                if len(server.requests) == 2: break
+                sleep(0.01)
+            assert len(server.requests) == 2
+            movements.close()
+
+    def test_iter_sessions(self):
+        with StubServer(paginated_responder('sessions', 7)) as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client:
+            sessions = list(client.iter_sessions(deep=True, per=7))
+            assert len(sessions) == 7
+            assert all(isinstance(session, Session) for session in sessions)
+            assert len(server.requests) == 2
+            assert server.requests[0].query['deep'] == ['True']
+
+    def test_fetch_movements_parallel(self):
+        with StubServer(paginated_responder('movements', 95)) as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client:
+            response = client.fetch_movements_parallel(patient_id='p1', per=10, width=4)
+            assert response.success
+            assert response.response_type == APIResponse.ResponseType.FETCH_MOVEMENTS
+            assert [m.id for m in response.get_data('movements')] == [f'{i:04d}' for i in range(1, 96)]
+            assert response.get_meta_data('total_count') == 95
+            assert len(server.requests) == 10
+            assert all(request.query['patientId'] == ['p1'] for request in server.requests)
+
+            response = client.fetch_movements_parallel(per=10, first_page=3, last_page=4)
+            assert [m.id for m in response.get_data('movements')] == [f'{i:04d}' for i in range(21, 41)]
+
+            response = client.fetch_movements_parallel(movement_label='fail')
+            assert not response.success
+            assert response.code == 500
+
+    def test_fetch_sessions_parallel(self):
+        with StubServer(paginated_responder('sessions', 12)) as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client:
+            response = client.fetch_sessions_parallel(per=5, width=2)
+            assert [s.id for s in response.get_data('sessions')] == [f'{i:04d}' for i in range(1, 13)]
+
+    def test_stream_movements(self):
+        movements = [{ 'id': str(i), 'articulations': ['a1'], 'registers': [{ 'a1': [i, i, i] }] * 50 } for i in range(20)]
+        with StubServer(lambda request: (200, { 'status': 0, 'movements': movements, 'meta': { 'total_count': 20 } })) as server, \
+                ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client:
+            streamed = list(client.stream_movements(professional_id='p1', per=20))
+
+            assert [movement.id for movement in streamed] == [str(i) for i in range(20)]
+            assert isinstance(streamed[3], Movement)
+            assert streamed[3].number_of_registers == 50
+            assert server.requests[0].query['per'] == ['20']
+
+    def test_stream_errors(self):
+        with StubServer(lambda request: (403, { 'status': 1, 'error': 'forbidden' })) as server, \
+                ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client:
+            with pytest.raises(FailedRequestError) as error:
+                list(client.stream_sessions(deep=True))
+
+            assert error.value.response.code == 403
+            assert error.value.response.get_data('error') == 'forbidden'
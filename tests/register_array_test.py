@@ -0,0 +1,86 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring, missing-function-docstring
+
+from copy import copy, deepcopy
+from json import loads
+import pickle
+import pytest
+
+from src.python_rebase.movement import Movement
+from src.python_rebase.register import Register
+from src.python_rebase.rotation import Rotation
+from src.python_rebase.register_array import RegisterArray
+from src.python_rebase.mismatched_articulations_error import MismatchedArticulationsError
+
+np = pytest.importorskip('numpy')
+
+class TestRegisterArray:
+    def test_from_numpy(self):
+        array = np.arange(24, dtype=np.float64).reshape((4, 2, 3))
+        movement = Movement.from_numpy(array, ['a1', 'a2'], { 'label': 'test', 'fps': 2 })
+
+        assert movement.label == 'test'
+        assert movement.articulations == ['a1', 'a2']
+        assert movement.number_of_registers == 4
+        assert movement.duration == 2
+        assert isinstance(movement.registers, RegisterArray)
+        assert movement.registers[1]['a2'] == Rotation(9, 10, 11)
+        assert movement.registers[-1] == Register({ 'a1': [18, 19, 20], 'a2': [21, 22, 23] })
+        assert np.shares_memory(movement.to_numpy(), array)
+
+    def test_views(self):
+        movement = Movement.from_numpy(np.zeros((2, 2, 3)), ['a1', 'a2'])
+        movement.registers[0]['a1'] = Rotation(1, 2, 3)
+        movement.registers[1]['a2'] = [4, 5, 6]
+
+        assert movement.to_numpy()[0, 0].tolist() == [1, 2, 3]
+        assert movement.to_numpy()[1, 1].tolist() == [4, 5, 6]
+
+        with pytest.raises(MismatchedArticulationsError):
+            movement.registers[0]['a3'] = [1, 2, 3]
+
+    def test_copy_views(self):
+        array = np.arange(6, dtype=np.float64).reshape((1, 2, 3))
+        view = Movement.from_numpy(array, ['a1', 'a2']).registers[0]
+
+        for register in (pickle.loads(pickle.dumps(view)), copy(view), deepcopy(view)):
+            assert register == view
+            assert register.schema is view.schema
+            register['a1'] = [9, 9, 9]
+        assert array[0, 0].tolist() == [0, 1, 2]
+
+    def test_add_register(self):
+        movement = Movement.from_numpy(np.zeros((1, 1, 3), dtype=np.float32), ['a1'])
+        for i in range(20):
+            movement.add_register({ 'a1': [i, i, i] })
+
+        assert movement.number_of_registers == 21
+        assert movement.to_numpy().shape == (21, 1, 3)
+        assert movement.to_numpy().dtype == np.float32
+        assert movement.registers[20]['a1'] == Rotation(19, 19, 19)
+
+        with pytest.raises(MismatchedArticulationsError):
+            movement.add_register({ 'a2': [1, 2, 3] })
+
+    def test_conversions(self):
+        movement = Movement.from_numpy(np.ones((2, 1, 3)), ['a1'], { 'label': 'test' })
+        regular = Movement({ 'label': 'test', 'articulations': ['a1'], 'registers': [{ 'a1': [1, 1, 1] }] * 2 })
+
+        assert loads(movement.to_json()) == loads(regular.to_json())
+        assert movement.to_dict()['registers'] == [{ 'a1': [1.0, 1.0, 1.0] }] * 2
+        assert np.array_equal(regular.to_numpy(), movement.to_numpy())
+        assert regular.registers == movement.registers
+
+        # Registros brutos, construídos e adicionados são convertidos na ordem das articulações
+        mixed = Movement({ 'articulations': ['a1', 'a2'], 'registers': [{ 'a1': [1, 2, 3], 'a2': [4, 5, 6] }] * 2 })
+        mixed.registers[1]['a2'] = [7, 8, 9]
+        mixed.add_register({ 'a1': [0, 0, 0], 'a2': [1, 1, 1] })
+        assert mixed.to_numpy(np.float32).tolist() == [[[1, 2, 3], [4, 5, 6]], [[1, 2, 3], [7, 8, 9]], [[0, 0, 0], [1, 1, 1]]]
+
+    def test_invalid_arrays(self):
+        with pytest.raises(ValueError):
+            Movement.from_numpy(np.zeros((2, 2)), ['a1', 'a2'])
+
+        with pytest.raises(MismatchedArticulationsError):
+            Movement.from_numpy(np.zeros((2, 2, 3)), ['a1'])
+
+# pylint: enable=missing-module-docstring, missing-class-docstring, missing-function-docstring
@@ -1,5 +1,6 @@
 # pylint: disable=missing-module-docstring, missing-class-docstring, missing-function-docstring
 
+import pickle
 import pytest
 
 from src.python_rebase.register import Register
@@ -76,8 +77,39 @@ class TestRegister:
         assert register1 != array
         assert register1 != dictionary
 
+    def test_shared_schema(self):
+        register1 = Register({ 'a1': [1, 2, 3], 'a2': [4, 5, 6] })
+        register2 = Register(['a1', 'a2'])
+        register3 = Register()
+        register3['a1'] = [1, 2, 3]
+        register3['a2'] = [4, 5, 6]
+
+        assert register1.schema is register2.schema is register3.schema
+        assert register1 == register3
+        assert not hasattr(register1, '__dict__')
+
+    def test_from_rotations(self):
+        register = Register.from_rotations(Register(['a1', 'a2']).schema, [Rotation(1, 2, 3), Rotation(4, 5, 6)])
+        assert register == Register({ 'a1': [1, 2, 3], 'a2': [4, 5, 6] })
+
+    def test_from_list(self):
+        register = Register({ 'a1': [1, 2, 3], 'a2': [4, 5, 6] })
+        assert Register.from_list(register.schema, register.to_list()) == register
+
     def test_to_dict(self):
         dictionary = { 'a1': [1, 2, 3], 'a2': [4, 5, 6] }
         assert Register(dictionary).to_dict() == dictionary
 
+    def test_pickle(self):
+        register = Register({ 'a1': [1.5, 2.5, 3.5], 'a2': [4.5, 5.5, 6.5] })
+        restored = pickle.loads(pickle.dumps(register))
+        assert restored == register
+        assert restored.schema is register.schema
+
+        register = Register({ 'a1': [1, 2, 3] })
+        assert pickle.loads(pickle.dumps(register)).to_dict() == { 'a1': [1, 2, 3] }
+        register = Register(['a1', 'a2'])
+        register['a2'] = None
+        assert pickle.loads(pickle.dumps(register))['a2'] is None
+
 # pylint: enable=missing-module-docstring, missing-class-docstring, missing-function-docstring
@@ -0,0 +1,105 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring, missing-function-docstring
+
+import pytest
+
+from src.python_rebase.response_cache import ResponseCache
+
+class FakeClock: # pylint: disable=too-few-public-methods
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestResponseCache:
+    def test_init_errors(self):
+        with pytest.raises(ValueError):
+            ResponseCache(max_entries=0)
+        with pytest.raises(ValueError):
+            ResponseCache(max_bytes=0)
+        with pytest.raises(ValueError):
+            ResponseCache(ttl=0)
+
+    def test_get_put(self):
+        cache = ResponseCache()
+        assert cache.get('a') is None
+
+        cache.put('a', b'body', 201)
+        assert cache.get('a') == (b'body', 201)
+        assert 'a' in cache
+        assert cache.size == 4
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert cache.hit_ratio == 0.5
+
+        cache.put('a', b'new body')
+        assert cache.get('a') == (b'new body', 200)
+        assert len(cache) == 1
+        assert cache.size == 8
+
+    def test_lru_bounds(self):
+        cache = ResponseCache(max_entries=3, max_bytes=10)
+        for key in 'abc':
+            cache.put(key, b'xx')
+        cache.get('a')
+        cache.put('d', b'xx')
+
+        assert 'b' not in cache
+        assert all(key in cache for key in 'acd')
+
+        cache.put('e', b'x' * 8)
+        assert len(cache) == 2
+        assert cache.size == 10
+        assert cache.evictions == 3
+
+        cache.put('huge', b'x' * 11)
+        assert 'huge' not in cache
+
+    def test_ttl(self):
+        clock = FakeClock()
+        cache = ResponseCache(ttl=10, clock=clock)
+        cache.put('a', b'body')
+
+        clock.now = 9.9
+        assert cache.get('a') is not None
+        clock.now = 10
+        assert cache.get('a') is None
+        assert cache.expirations == 1
+        assert len(cache) == 0
+
+    def test_invalidate(self):
+        cache = ResponseCache()
+        cache.put('m1', b'1', tags=[('movement', '1'), ('in-session', 's')])
+        cache.put('m2', b'2', tags=[('movement', '2')])
+        cache.put('s', b's', tags=[('session', 's'), ('has-movement', '1'), ('has-movement', '2')])
+
+        assert cache.related_tags(('session', 's')) == { ('session', 's'), ('has-movement', '1'), ('has-movement', '2') }
+        assert cache.invalidate(('has-movement', '2')) == 1
+        assert 's' not in cache
+        assert cache.invalidate(('in-session', 's'), ('movement', '2')) == 2
+        assert len(cache) == 0
+        assert cache.size == 0
+        assert cache.invalidations == 3
+
+    def test_generation(self):
+        cache = ResponseCache(max_entries=2)
+        generation = cache.generation
+        cache.invalidate(('movement', '1'))
+        assert cache.generation == generation + 1
+
+        # Respostas lidas antes da invalidação de uma das suas tags não são armazenadas
+        cache.put('m1', b'1', tags=[('movement', '1')], generation=generation)
+        cache.put('m2', b'2', tags=[('movement', '2')], generation=generation)
+        cache.put('m3', b'3', tags=[('movement', '1')], generation=cache.generation)
+        assert 'm1' not in cache
+        assert 'm2' in cache and 'm3' in cache
+        assert cache.stale_puts == 1
+
+        # Quando as gerações das tags são descartadas, as respostas lidas antes disso também são
+        generation = cache.generation
+        cache.invalidate(*[('movement', str(i)) for i in range(10)])
+        cache.put('s1', b's', tags=[('session', '1')], generation=generation)
+        cache.put('s2', b's', tags=[('session', '2')], generation=cache.generation)
+        assert 's1' not in cache and 's2' in cache
+        assert cache.stale_puts == 2
+
+# pylint: enable=missing-module-docstring, missing-class-docstring, missing-function-docstring
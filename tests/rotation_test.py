@@ -1,5 +1,7 @@
 # pylint: disable=missing-module-docstring, missing-class-docstring, missing-function-docstring
 
+import pickle
+
 from src.python_rebase.rotation import Rotation
 
 class TestRotation:
@@ -35,10 +37,17 @@ class TestRotation:
         rotation = Rotation(1, 2, 3)
         assert rotation.to_tuple() == (1, 2, 3)
 
+    def test_slots(self):
+        assert not hasattr(Rotation(1, 2, 3), '__dict__')
+
     def test_eq(self):
         assert Rotation(1, 2, 3) == Rotation(1, 2, 3)
         assert Rotation(1, 2, 3) != Rotation(1, 2)
         assert Rotation(1, 2, 3) != Rotation(1, 2, 5)
         assert Rotation(1, 2, 3) != 7
 
+    def test_pickle(self):
+        rotation = Rotation(1, 2.5, -3)
+        assert pickle.loads(pickle.dumps(rotation)).to_tuple() == (1, 2.5, -3)
+
 # pylint: enable=missing-module-docstring, missing-class-docstring, missing-function-docstring
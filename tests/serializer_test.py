@@ -0,0 +1,96 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring, missing-function-docstring
+
+from json import dumps
+import pytest
+
+from src.python_rebase import serializer
+from src.python_rebase.movement import Movement
+from src.python_rebase.register import Register
+from src.python_rebase.rotation import Rotation
+from src.python_rebase.session import Session
+
+def dict_movement_json(movement: Movement, update: bool) -> str:
+    exclude = serializer.MOVEMENT_UPDATE_EXCLUDE if update else serializer.MOVEMENT_INSERT_EXCLUDE
+    return dumps({ 'movement': movement.to_dict(exclude=list(exclude)) })
+
+def dict_session_json(session: Session, update: bool) -> str:
+    exclude = serializer.SESSION_UPDATE_EXCLUDE if update else serializer.SESSION_INSERT_EXCLUDE
+    movement_exclude = serializer.MOVEMENT_UPDATE_EXCLUDE if update else serializer.MOVEMENT_INSERT_EXCLUDE
+    return dumps({ 'session': session.to_dict(exclude=list(exclude), movement_exclude=list(movement_exclude)) })
+
+def full_movement(frames: int) -> Movement:
+    registers = [{ 'a1': [i, i * 0.5, -i], 'a"2%s': Rotation(0.1, i, 3) } for i in range(frames)]
+    return Movement({ 'id': '1', 'label': 'squat', 'description': 'ã "quoted"', 'device': 'kinect', 'fps': 30,
+                      'sessionId': 's', 'professionalId': 'p', 'patientId': 'x', 'insertionDate': 'today',
+                      'app': { 'code': 2, 'data': { 'nested': [1, None] } }, 'registers': registers })
+
+class TestSerializer:
+    def test_movement(self):
+        for movement in [Movement(), Movement({ 'label': 'empty' }), full_movement(1), full_movement(1500)]:
+            for update in [False, True]:
+                assert serializer.movement_to_json(movement, update) == dict_movement_json(movement, update)
+            assert serializer.movement_dict_json(movement) == dumps(movement.to_dict())
+
+    def test_built_registers(self):
+        movement = full_movement(20)
+        movement.registers[3]['a1'] = Rotation(7, 8, 9)
+        movement.add_register(Register({ 'a1': [1, 2, 3], 'a"2%s': [4, 5, 6] }))
+
+        assert movement.registers.built_count == 1 # pylint: disable=no-member
+        assert movement.to_json() == dict_movement_json(movement, False)
+
+    def test_fallback_values(self):
+        registers = [{ 'a1': [float('nan'), 1, 2] }, { 'a1': ['x', 'y', 'z'] }, { 'a1': [float('inf'), 0, 0] }, { 'a1': [True, False, 1] }]
+        movement = Movement({ 'registers': registers }, trusted=True)
+        assert movement.to_json() == dict_movement_json(movement, False)
+
+    def test_normalized_values(self):
+        # Valores que só o Register normaliza são escritos como pelos Registros construídos
+        registers = [{ 'a1': [None, 2, 3] }, { 'a1': [1, 2, 3, 4] }, { 'a1': [0.0, -0.0, 1.5] }, { 'a1': Rotation(0.0, 1, None) }]
+        movement = Movement({ 'registers': registers })
+        expected = dumps({ 'movement': { 'numberOfRegisters': 4, 'registers': [{ 'a1': [0, 2, 3] }, { 'a1': [1, 2, 3] },
+                                                                                { 'a1': [0, 0, 1.5] }, { 'a1': [0, 1, 0] }] } })
+        assert movement.to_json() == dict_movement_json(movement, False) == expected
+        assert serializer.movement_dict_json(movement) == dumps(movement.to_dict())
+        list(movement.registers)
+        assert movement.to_json() == expected
+
+        with pytest.raises(IndexError):
+            Movement({ 'registers': [{ 'a1': [1, 2] }] }, trusted=True).to_json()
+        with pytest.raises(TypeError):
+            Movement({ 'registers': [{ 'a1': 'bad' }] }, trusted=True).to_json()
+
+    def test_numpy_registers(self):
+        np = pytest.importorskip('numpy')
+        array = np.arange(1200 * 2 * 3, dtype=np.float32).reshape(1200, 2, 3) / 7
+        movement = Movement.from_numpy(array, ['a1', 'a2'], { 'label': 'np', 'fps': 60 })
+        assert movement.to_json() == dict_movement_json(movement, False)
+
+        array[5, 1, 2] = np.nan
+        assert movement.to_json() == dict_movement_json(movement, False)
+
+        zeros = Movement.from_numpy(np.zeros((1, 1, 3)), ['a1'])
+        assert zeros.to_json() == Movement({ 'registers': [{ 'a1': [0.0, -0.0, 0.0] }] }).to_json() == Movement({ 'registers': [{ 'a1': [0, 0, 0] }] }).to_json()
+
+    def test_pieces(self):
+        movement = full_movement(2000)
+        pieces = list(serializer.iter_movement_json(movement))
+
+        assert len(pieces) > 4
+        assert ''.join(pieces) == movement.to_json()
+        assert movement.registers.built_count == 0 # pylint: disable=no-member
+
+    def test_session(self):
+        movements = [full_movement(3), full_movement(0), Movement({ 'label': 'x', 'registers': [{ 'a1': [1, 2, 3] }] })]
+        sessions = [
+            Session(),
+            Session({ 'id': '1', 'title': 'T', 'movementIds': ['a'], 'patient': { 'id': 'p', 'age': 20 }, 'diagnosis': 'ok' }),
+            Session({ 'title': 'T', 'numberOfMovements': 3, 'medicalData': { 'medications': 'none' }, 'movements': movements })
+        ]
+
+        for session in sessions:
+            for update in [False, True]:
+                assert serializer.session_to_json(session, update) == dict_session_json(session, update)
+                assert ''.join(serializer.iter_session_json(session, update)) == session.to_json(update)
+
+# pylint: enable=missing-module-docstring, missing-class-docstring, missing-function-docstring
@@ -1,6 +1,7 @@
 # pylint: disable=missing-module-docstring, missing-class-docstring, missing-function-docstring
 
 from json import loads
+import pickle
 import pytest
 
 from src.python_rebase.session import Session
@@ -38,6 +39,17 @@ class TestSession:
         with pytest.raises(ValueError):
             Session({ 'medicalData': { 'diagnosis': 'All right', 'invalid': 'key' } })
 
+    def test_trusted_init(self):
+        movements = [{ 'id': str(i), 'articulations': ['a1'], 'registers': [{ 'a1': [i, 0, 0] }] } for i in range(3)]
+        session = Session({ 'title': 'Test', 'patient': { 'age': 20 }, 'movements': movements }, trusted=True)
+
+        assert session.patient_age == 20
+        assert [movement.id for movement in session.movements] == ['0', '1', '2']
+        assert session.movements[2].registers[0]['a1'].x == 2
+
+        # Dicionários confiáveis não são validados
+        Session({ 'title': 2, 'invalid': 'key' }, trusted=True)
+
     def test_init_with_movement(self):
         movements = [
             Movement({ 'articulations': ['a1'], 'registers': [{ 'a1': [1, 2, 3] }], 'duration': 10 }),
@@ -133,4 +145,15 @@ class TestSession:
         assert session.to_json(update=False) == expected_json
         assert session.to_json(update=True) == expected_update_json
 
+    def test_pickle(self):
+        session = Session({ 'title': 'Test', 'movementIds': ['m1', 'm2'],
+                            'movements': [{ 'label': 'm1', 'registers': [{ 'a1': [1.5, 2.5, 3.5] }] }] })
+        restored = pickle.loads(pickle.dumps(session))
+        assert restored.to_json() == session.to_json()
+
+        session.attach_client(None, prefetch=0)
+        restored = pickle.loads(pickle.dumps(session))
+        assert restored.movements == []
+        assert restored.movement_ids == ['m1', 'm2']
+
 # pylint: enable=missing-module-docstring, missing-class-docstring, missing-function-docstring
@@ -0,0 +1,49 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring, missing-function-docstring
+
+from concurrent.futures import ProcessPoolExecutor
+from pickle import dumps, loads
+import pytest
+
+from src.python_rebase.movement import Movement
+from src.python_rebase.shared_movement import SharedMovement
+
+np = pytest.importorskip('numpy')
+
+def scale_frames(handle: SharedMovement) -> int:
+    movement = handle.movement()
+    movement.to_numpy()[...] *= 2
+    frames = movement.number_of_registers
+    del movement
+    handle.close()
+    return frames
+
+class TestSharedMovement:
+    def test_share(self):
+        movement = Movement({ 'label': 'test', 'fps': 2, 'registers': [{ 'a1': [i, 2.5, 3], 'a2': [4, 5, 6.5] } for i in range(10)] })
+
+        with SharedMovement(movement) as handle:
+            assert handle.nbytes == 10 * 2 * 3 * 8
+            assert len(dumps(handle)) < 500
+
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                assert list(executor.map(scale_frames, [handle])) == [10]
+
+            shared = handle.movement()
+            assert shared.label == 'test'
+            assert shared.duration == 5
+            assert shared.registers[3]['a1'].x == 6
+            assert np.array_equal(shared.to_numpy(), 2 * movement.to_numpy())
+            del shared
+
+    def test_pickle_in_process(self):
+        movement = Movement({ 'registers': [{ 'a1': [1.5, 2.5, 3.5] }] })
+        with SharedMovement(movement) as handle:
+            attached = loads(dumps(handle))
+            assert attached.name == handle.name
+            assert attached.movement().to_json() == movement.to_json()
+            attached.close()
+
+        with SharedMovement(Movement({ 'label': 'empty' })) as handle:
+            assert handle.movement().label == 'empty'
+
+# pylint: enable=missing-module-docstring, missing-class-docstring, missing-function-docstring
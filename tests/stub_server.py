@@ -0,0 +1,148 @@
+"""Minimal local HTTP server that stands in for the ReBaseRS in tests and benchmarks"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps
+from threading import Lock, Thread
+from urllib.parse import urlsplit, parse_qs
+
+class StubRequest: # pylint: disable=too-few-public-methods
+    """A request received by the StubServer"""
+
+    def __init__(self, method: str, path: str, query: dict, headers: dict, body: bytes, client_port: int,
+                 body_size: int = 0, body_chunks: int = 0):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+        self.client_port = client_port
+        self.body_size = body_size
+        self.body_chunks = body_chunks
+
+class StubServer:
+    """Threaded HTTP/1.1 server that answers every request with the result of a responder.
+    The responder receives a StubRequest and returns a (status, payload) or a (status, payload, headers)
+    tuple, where payload is either a dict (sent as json) or raw bytes. Request bodies may be sent with
+    Content-Length or chunked transfer encoding. With keep_bodies=False, bodies are read and discarded,
+    and only their size is recorded"""
+
+    def __init__(self, responder=None, keep_bodies: bool = True):
+        self.responder = responder or (lambda request: (200, { 'status': 0 }))
+        self.keep_bodies = keep_bodies
+        self.requests = []
+        self.__lock = Lock()
+        self.__server = ThreadingHTTPServer(('127.0.0.1', 0), self.__handler_class())
+        self.__server.daemon_threads = True
+        self.__thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self) -> None:
+        """Starts serving on a background thread"""
+
+        self.__thread = Thread(target=self.__server.serve_forever, kwargs={ 'poll_interval': 0.05 }, daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """Stops the server and waits for the serving thread"""
+
+        self.__server.shutdown()
+        self.__server.server_close()
+        self.__thread.join()
+
+    def __get_url(self) -> str:
+        host, port = self.__server.server_address
+        return f'http://{host}:{port}/'
+
+    def __get_connection_count(self) -> int:
+        with self.__lock:
+            return len({ request.client_port for request in self.requests })
+
+    url = property(__get_url)
+    connection_count = property(__get_connection_count, doc='Number of distinct client connections seen so far')
+
+    def record(self, request: StubRequest) -> None:
+        """Adds a request to requests. Called by the request handler for every request received"""
+
+        with self.__lock:
+            self.requests.append(request)
+
+    def __handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Answers every request with the responder of the StubServer"""
+
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args): # pylint: disable=redefined-builtin
+                pass
+
+            def do_GET(self): # pylint: disable=invalid-name
+                """Answers a GET request"""
+                self.__respond()
+
+            def do_POST(self): # pylint: disable=invalid-name
+                """Answers a POST request"""
+                self.__respond()
+
+            def do_PUT(self): # pylint: disable=invalid-name
+                """Answers a PUT request"""
+                self.__respond()
+
+            def do_DELETE(self): # pylint: disable=invalid-name
+                """Answers a DELETE request"""
+                self.__respond()
+
+            def __iter_body(self):
+                if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+                    while True:
+                        size = int(self.rfile.readline().split(b';')[0], 16)
+                        if size == 0:
+                            while self.rfile.readline() not in (b'\r\n', b'\n', b''):
+                                pass
+                            return
+                        yield self.rfile.read(size)
+                        self.rfile.readline()
+
+                length = int(self.headers.get('Content-Length') or 0)
+                while length > 0:
+                    block = self.rfile.read(min(length, 64 * 1024))
+                    length -= len(block)
+                    yield block
+
+            def __read_body(self) -> tuple:
+                pieces = []
+                size = 0
+                count = 0
+                for piece in self.__iter_body():
+                    size += len(piece)
+                    count += 1
+                    if stub.keep_bodies: pieces.append(piece)
+                return b''.join(pieces), size, count
+
+            def __respond(self):
+                parts = urlsplit(self.path)
+                body, body_size, body_chunks = self.__read_body()
+                request = StubRequest(self.command, parts.path, parse_qs(parts.query), dict(self.headers),
+                                      body, self.client_address[1], body_size, body_chunks)
+                stub.record(request)
+
+                status, payload, *headers = stub.responder(request)
+                body = payload if isinstance(payload, bytes) else dumps(payload).encode('utf-8')
+
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                for name, value in (headers[0] if headers else {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
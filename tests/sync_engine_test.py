@@ -0,0 +1,123 @@
+# pylint: disable=missing-module-docstring, missing-class-docstring, missing-function-docstring
+
+import pytest
+
+from src.python_rebase.failed_request_error import FailedRequestError
+from src.python_rebase.local_store import LocalStore
+from src.python_rebase.rebase_client import ReBaseClient
+from src.python_rebase.sync_engine import SyncEngine
+from tests.stub_server import StubServer
+
+class FakeServer:
+    def __init__(self):
+        self.records = { 'movements': {}, 'sessions': {} }
+        self.fail_after = None
+
+    def put(self, key: str, i: int, update_date: str, professional_id: str = 'prof') -> None:
+        record = { 'id': f'{i:04d}', 'professionalId': professional_id, 'updateDate': update_date }
+        if key == 'movements': record['registers'] = [{ 'a1': [float(i), 2.0, 3.0] }]
+        self.records[key][record['id']] = record
+
+    def __call__(self, request):
+        key = 'sessions' if request.path.startswith('/session') else 'movements'
+        per = int(request.query['per'][0])
+        previous_id = request.query.get('previousId', [''])[0]
+        if self.fail_after is not None and previous_id >= self.fail_after:
+            return 500, { 'status': 1, 'error': 'server error' }
+
+        professional_id = request.query.get('professionalId', [''])[0]
+        selected = [record for record_id, record in sorted(self.records[key].items())
+                    if record_id > previous_id and professional_id in ('', record['professionalId'])]
+        return 200, { 'status': 0, key: selected[:per] }
+
+def date(day: int) -> str:
+    return f'2024-01-{day:02d}T00:00:00.000Z'
+
+class TestSyncEngine:
+    def test_sync(self):
+        fake = FakeServer()
+        for i in range(10): fake.put('movements', i, date(1))
+        for i in range(3): fake.put('sessions', i, date(1))
+
+        with StubServer(fake) as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client, LocalStore() as store:
+            engine = SyncEngine(client, store, per=3)
+            sessions, movements = engine.sync()
+            assert (sessions.received, sessions.upserted, sessions.deleted) == (3, 3, 0)
+            assert (movements.received, movements.upserted, movements.deleted) == (10, 10, 0)
+            assert movements.high_water == date(1)
+            assert movements.records_per_second > 0
+            assert store.get_movement('0004').registers[0].to_list() == [4, 2, 3]
+
+            fake.put('movements', 4, date(2))
+            fake.records['movements']['0004']['registers'] = [{ 'a1': [0.0, 0.0, 0.0] }]
+            fake.put('movements', 12, date(2))
+            del fake.records['movements']['0002']
+            del fake.records['movements']['0009']
+            del fake.records['sessions']['0001']
+
+            sessions, movements = engine.sync()
+            assert (sessions.received, sessions.upserted, sessions.deleted) == (2, 0, 1)
+            assert (movements.received, movements.upserted, movements.deleted) == (9, 2, 2)
+            assert movements.high_water == date(2)
+            assert store.movement_ids() == sorted(fake.records['movements'])
+            assert store.session_ids() == ['0000', '0002']
+            assert store.get_movement('0004').registers[0].to_list() == [0, 0, 0]
+
+    def test_resume(self):
+        fake = FakeServer()
+        for i in range(10): fake.put('movements', i, date(1))
+        reports = []
+
+        with StubServer(fake) as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client, LocalStore() as store:
+            engine = SyncEngine(client, store, per=3, prefetch=False, progress=lambda report: reports.append(report.received))
+            fake.fail_after = '0005'
+            with pytest.raises(FailedRequestError):
+                engine.sync_movements()
+            assert store.movement_ids() == ['0000', '0001', '0002', '0003', '0004', '0005']
+            assert store.get_sync_state('movements||')['cursor'] == '0005'
+
+            fake.fail_after = None
+            report = engine.sync_movements()
+            assert report.resumed
+            assert (report.received, report.upserted) == (4, 4)
+            assert store.get_sync_state('movements||') == { 'high_water': date(1) }
+            assert reports == [3, 6, 3, 4]
+
+    def test_update_during_pass(self):
+        fake = FakeServer()
+        for i in range(6): fake.put('movements', i, date(1))
+
+        # Após a primeira página, 0001 (já lido) é alterado antes de 0004 (ainda não lido)
+        def update(report):
+            if report.received == 3 and fake.records['movements']['0001']['updateDate'] == date(1):
+                fake.put('movements', 1, date(2))
+                fake.records['movements']['0001']['registers'] = [{ 'a1': [9.0, 9.0, 9.0] }]
+                fake.put('movements', 4, date(3))
+
+        with StubServer(fake) as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client, LocalStore() as store:
+            SyncEngine(client, store, per=3, prefetch=False, progress=update).sync_movements()
+            assert store.get_movement('0001').registers[0].to_list() == [1, 2, 3]
+
+            report = SyncEngine(client, store, per=3).sync_movements()
+            assert report.upserted == 1
+            assert report.high_water == date(3)
+            assert store.get_movement('0001').registers[0].to_list() == [9, 9, 9]
+            assert store.movement_update_dates(previous_id='0003') == { '0004': date(3), '0005': date(1) }
+
+    def test_scope(self):
+        fake = FakeServer()
+        for i in range(6): fake.put('movements', i, date(1), f'prof{i % 2}')
+
+        with StubServer(fake) as server, ReBaseClient('test@gmail.com', 'authtoken', server_url=server.url) as client, LocalStore() as store:
+            SyncEngine(client, store).sync_movements()
+            del fake.records['movements']['0003']
+            del fake.records['movements']['0004']
+
+            report = SyncEngine(client, store, professional_id='prof1').sync_movements()
+            assert (report.received, report.deleted) == (2, 1)
+            assert store.movement_ids() == ['0000', '0001', '0002', '0004', '0005']
+
+        with pytest.raises(ValueError):
+            SyncEngine(None, None, per=0)
+
+# pylint: enable=missing-module-docstring, missing-class-docstring, missing-function-docstring
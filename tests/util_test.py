@@ -1,5 +1,6 @@
 # pylint: disable=missing-module-docstring, missing-class-docstring, missing-function-docstring
 
+from time import sleep
 import pytest
 
 from src.python_rebase import util
@@ -51,6 +52,26 @@ class TestUtil:
         util.exclude_keys_from_dict(dictionary, ['a', 'b'])
         assert dictionary == { 'c': 3 }
 
+    def test_ordered_map(self):
+        read = []
+
+        def source():
+            for i in range(20):
+                read.append(i)
+                yield i
+
+        def slow_square(value):
+            sleep(0.01 * (value % 3))
+            return value * value
+
+        results = util.ordered_map(slow_square, source(), 4)
+        assert next(results) == 0
+        assert len(read) <= 5
+        assert list(results) == [i * i for i in range(1, 20)]
+
+        with pytest.raises(ValueError):
+            list(util.ordered_map(slow_square, [1], 0))
+
     def test_validate_initialization_dict(self):
         with pytest.raises(ValueError):
             Movement({ 'invalid': { 'object': 'value' }})
@@ -58,4 +79,19 @@ class TestUtil:
         with pytest.raises(ValueError):
             Session({ 'invalid': { 'object': 'value' }})
 
+    def test_validate_compiled_dict(self):
+        rules = util.compile_field_rules({ 'id': None, 'label': None, 'app': { 'code': None, 'data': None } }, util.MOVEMENT_FIELD_VALIDATORS)
+
+        assert rules['id'] is util.is_valid_id
+        assert rules['app']['code'] is util.is_valid_id
+        util.validate_compiled_dict('Movement', rules, { 'id': '1', 'label': 'a', 'app': { 'code': 1, 'data': {} } })
+
+        invalid_dicts = [{ 'invalid': 'key' }, { 'label': 2 }, { 'app': 'x' }, { 'app': { 'invalid': 'key' } }, { 'app': { 'code': -1 } }]
+        for dictionary in invalid_dicts:
+            with pytest.raises(ValueError) as compiled_error:
+                util.validate_compiled_dict('Movement', rules, dictionary)
+            with pytest.raises(ValueError) as original_error:
+                util.validate_initialization_dict(util.is_valid_movement_field, 'Movement', rules, dictionary)
+            assert str(compiled_error.value) == str(original_error.value)
+
 # pylint: enable=missing-module-docstring, missing-class-docstring, missing-function-docstring